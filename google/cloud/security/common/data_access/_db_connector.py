@@ -14,6 +14,10 @@
 
 """Provides the database connector."""
 
+import os
+import threading
+import time
+
 import MySQLdb
 from MySQLdb import OperationalError
 
@@ -23,8 +27,308 @@ from google.cloud.security.common.util import log_util
 
 LOGGER = log_util.get_logger(__name__)
 
+# Maximum number of connections opened by one pool.
+DEFAULT_POOL_MAX_SIZE = 10
+
+# Idle connections older than this are closed and replaced.
+DEFAULT_POOL_RECYCLE_SECONDS = 3600
+
+# Connections unused for longer than this are pinged before being used.
+PING_INTERVAL_SECONDS = 60
+
+# How long to wait for a connection when the pool is exhausted.
+POOL_TIMEOUT_SECONDS = 300
+
+# Process-wide pools, keyed by the connection parameters.
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _close_quietly(conn):
+    """Close a connection, ignoring errors from dead connections.
+
+    Args:
+        conn (Connection): The MySQLdb connection to close.
+    """
+    try:
+        conn.close()
+    except (AttributeError, OperationalError, MySQLdb.ProgrammingError):
+        pass
+
+
+class _CheckedOutConnection(object):
+    """A pooled connection bound to the thread that checked it out."""
+
+    def __init__(self, pool, conn):
+        """Initialize.
+
+        Args:
+            pool (ConnectionPool): The pool the connection belongs to.
+            conn (Connection): The MySQLdb connection.
+        """
+        self.pool = pool
+        self.conn = conn
+        self.last_used = time.time()
+
+    def get(self):
+        """Get the connection, reconnecting if it has gone away.
+
+        Returns:
+            Connection: A live MySQLdb connection.
+        """
+        now = time.time()
+        if now - self.last_used > PING_INTERVAL_SECONDS:
+            self.conn = self.pool.check_health(self.conn)
+        self.last_used = now
+        return self.conn
+
+    def __del__(self):
+        """Return the connection to the pool when the thread goes away."""
+        if self.conn is not None:
+            self.pool.check_in(self.conn)
+            self.conn = None
+
+
+# pylint: disable=too-many-instance-attributes
+class ConnectionPool(object):
+    """Thread-safe pool of MySQL connections.
+
+    Each thread checks out at most one connection, which is shared by all
+    the DAOs used in that thread and is returned to the pool when the
+    thread exits or calls release(). A connection that fails is dropped
+    with discard().
+
+    A pool inherited by a forked child process starts over with new
+    connections the first time the child uses it.
+    """
+
+    def __init__(self, connect_kwargs, max_size=DEFAULT_POOL_MAX_SIZE,
+                 recycle_seconds=DEFAULT_POOL_RECYCLE_SECONDS):
+        """Initialize.
+
+        Args:
+            connect_kwargs (dict): Args to pass to MySQLdb.connect().
+            max_size (int): Maximum number of open connections.
+            recycle_seconds (int): Idle connections older than this
+                are replaced by new connections.
+        """
+        self._connect_kwargs = connect_kwargs
+        self._max_size = max_size
+        self._recycle_seconds = recycle_seconds
+        # List of (connection, time it was checked in) tuples.
+        self._idle = []
+        self._size = 0
+        self._condition = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._inherited = []
+
+    def _check_fork(self):
+        """Drop the connections inherited from a parent process.
+
+        The inherited connections share their sockets with the parent, so
+        they are neither used nor closed here; they stay referenced so
+        that garbage collection does not close them either.
+        """
+        if self._pid == os.getpid():
+            return
+        self._inherited.append((self._idle, self._local))
+        self._idle = []
+        self._size = 0
+        self._condition = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _connect(self):
+        """Open a new connection.
+
+        Returns:
+            Connection: A new MySQLdb connection.
+        """
+        LOGGER.debug('Opening new mysql connection to %s.',
+                     self._connect_kwargs.get('host'))
+        return MySQLdb.connect(**self._connect_kwargs)
+
+    def check_health(self, conn):
+        """Ping a connection, and replace it if it has gone away.
+
+        Args:
+            conn (Connection): The connection to check.
+
+        Returns:
+            Connection: The connection, or a new one replacing it.
+        """
+        try:
+            conn.ping()
+            return conn
+        except OperationalError as e:
+            LOGGER.warn('Replacing mysql connection that has gone away: %s',
+                        e)
+            _close_quietly(conn)
+            return self._connect()
+
+    def _check_out(self):
+        """Take an idle connection from the pool, or open a new one.
+
+        Returns:
+            Connection: A MySQLdb connection.
+
+        Raises:
+            OperationalError: When a new connection can not be opened.
+            MySQLError: When no connection is freed before the timeout.
+        """
+        deadline = time.time() + POOL_TIMEOUT_SECONDS
+        with self._condition:
+            while not self._idle and self._size >= self._max_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise MySQLError(
+                        'DB Connector',
+                        'No connection available after {} seconds, {} '
+                        'connections are in use.'.format(
+                            POOL_TIMEOUT_SECONDS, self._size))
+                self._condition.wait(remaining)
+
+            if self._idle:
+                conn, checked_in = self._idle.pop()
+            else:
+                conn, checked_in = None, None
+                self._size += 1
+
+        try:
+            if conn is None:
+                return self._connect()
+            idle_time = time.time() - checked_in
+            if idle_time > self._recycle_seconds:
+                _close_quietly(conn)
+                return self._connect()
+            if idle_time > PING_INTERVAL_SECONDS:
+                return self.check_health(conn)
+            return conn
+        except OperationalError:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _drop(self, conn):
+        """Close a connection and free its place in the pool.
+
+        Args:
+            conn (Connection): The connection to drop.
+        """
+        _close_quietly(conn)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def check_in(self, conn):
+        """Return a connection to the pool.
+
+        The transaction of the connection is rolled back first, so that the
+        next thread using it doesn't read through an old snapshot.
+
+        Args:
+            conn (Connection): The connection to return.
+        """
+        try:
+            conn.rollback()
+        except MySQLdb.Error as e:
+            LOGGER.warn('Dropping mysql connection that failed to roll '
+                        'back: %s', e)
+            self._drop(conn)
+            return
+        with self._condition:
+            self._idle.append((conn, time.time()))
+            self._condition.notify()
+
+    def get_connection(self):
+        """Get the connection checked out by the current thread.
+
+        Returns:
+            Connection: A MySQLdb connection.
+        """
+        self._check_fork()
+        checked_out = getattr(self._local, 'checked_out', None)
+        if checked_out is None:
+            checked_out = _CheckedOutConnection(self, self._check_out())
+            self._local.checked_out = checked_out
+        return checked_out.get()
+
+    def release(self):
+        """Return the connection of the current thread to the pool."""
+        self._check_fork()
+        checked_out = getattr(self._local, 'checked_out', None)
+        if checked_out is not None:
+            del self._local.checked_out
+            checked_out.pool.check_in(checked_out.conn)
+            checked_out.conn = None
+
+    def discard(self):
+        """Drop the connection of the current thread after it has failed.
+
+        The next use of the pool by the thread opens a new connection.
+        """
+        self._check_fork()
+        checked_out = getattr(self._local, 'checked_out', None)
+        if checked_out is not None:
+            del self._local.checked_out
+            self._drop(checked_out.conn)
+            checked_out.conn = None
+# pylint: enable=too-many-instance-attributes
+
+
+def get_pool(global_configs):
+    """Get the process-wide connection pool for a database.
+
+    Args:
+        global_configs (dict): Global configurations.
+
+    Returns:
+        ConnectionPool: The connection pool.
+    """
+    connect_kwargs = {
+        'host': global_configs['db_host'],
+        'user': global_configs['db_user'],
+        'db': global_configs['db_name'],
+        'local_infile': 1}
+    key = (connect_kwargs['host'], connect_kwargs['user'],
+           connect_kwargs['db'])
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                connect_kwargs,
+                max_size=global_configs.get(
+                    'db_pool_max_size', DEFAULT_POOL_MAX_SIZE),
+                recycle_seconds=global_configs.get(
+                    'db_pool_recycle_seconds', DEFAULT_POOL_RECYCLE_SECONDS))
+            _POOLS[key] = pool
+        return pool
+
+
+def release_connections():
+    """Return the connections of the current thread to their pools.
+
+    Called when a thread is done with a unit of work, e.g. a pipeline or a
+    scanner, so that the thread doesn't keep a connection, and its open
+    transaction, while it is idle or runs the next unit.
+    """
+    with _POOLS_LOCK:
+        pools = _POOLS.values()
+    for pool in pools:
+        pool.release()
+
+
 class DbConnector(object):
-    """Database connector."""
+    """Database connector.
+
+    Connections are borrowed from a process-wide pool, so all the DAOs used
+    in a thread share a single connection.
+    """
+
+    _pool = None
+    _conn = None
 
     def __init__(self, global_configs=None):
         """Initialize the db connector.
@@ -35,21 +339,49 @@ class DbConnector(object):
         Raises:
             MySQLError: An error with MySQL has occurred.
         """
+        self._pool = get_pool(global_configs)
         try:
-            self.conn = MySQLdb.connect(
-                host=global_configs['db_host'],
-                user=global_configs['db_user'],
-                db=global_configs['db_name'],
-                local_infile=1)
+            # Check out the connection early, to fail fast when the
+            # database can not be reached.
+            self._pool.get_connection()
         except OperationalError as e:
             LOGGER.error('Unable to create mysql connector:\n%s', e)
             raise MySQLError('DB Connector', e)
 
-    def __del__(self):
-        """Closes the database connection."""
+    @property
+    def conn(self):
+        """The connection of the current thread.
+
+        Returns:
+            Connection: A MySQLdb connection.
+        """
+        if self._conn is not None:
+            return self._conn
+        return self._pool.get_connection()
+
+    @conn.setter
+    def conn(self, conn):
+        """Use a fixed connection instead of the pooled ones.
+
+        Args:
+            conn (Connection): A MySQLdb connection.
+        """
+        self._conn = conn
+
+    def _recover_connection(self, error):
+        """Recover the connection of the current thread after an error.
+
+        A connection failing with an OperationalError, e.g. because the
+        server has gone away, is dropped so that the next query reconnects.
+        Otherwise the transaction of the failed query is rolled back.
+
+        Args:
+            error (Exception): The MySQLdb error raised by the query.
+        """
+        if isinstance(error, OperationalError) and self._conn is None:
+            self._pool.discard()
+            return
         try:
-            self.conn.close()
-        except AttributeError:
-            # This happens when conn is not created in the first place,
-            # thus does not need to be cleaned up.
-            pass
+            self.conn.rollback()
+        except MySQLdb.Error as e:
+            LOGGER.warn('Unable to roll back mysql transaction: %s', e)
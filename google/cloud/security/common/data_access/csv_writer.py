@@ -17,6 +17,7 @@ from contextlib import contextmanager
 import os
 import tempfile
 
+import concurrent.futures
 import unicodecsv as csv
 
 from google.cloud.security.common.data_access.errors import CSVFileError
@@ -503,3 +504,118 @@ def write_csv(resource_name, data, write_header=False):
         os.remove(csv_file.name)
     except (IOError, OSError, csv.Error) as e:
         raise CSVFileError(resource_name, e)
+
+
+def _write_csv_chunk(resource_name, rows, max_rows, max_bytes,
+                     fieldnames=None):
+    """Write the next chunk of rows into a temporary csv file.
+
+    Args:
+        resource_name (str): The resource name.
+        rows (iterator): An iterator of data to be written to csv.
+        max_rows (int): Maximum number of rows in the chunk, or None.
+        max_bytes (int): Approximate maximum size of the chunk in bytes,
+            or None.
+        fieldnames (list): The columns to write, defaults to the columns
+            of the resource.
+
+    Returns:
+        tuple: The closed CSV temporary file pointer and the number of rows
+            written into it, or None when there are no more rows.
+
+    Raises:
+        CSVFileError: If there was an error writing the CSV file.
+    """
+    csv_file = tempfile.NamedTemporaryFile(delete=False)
+    row_count = 0
+    try:
+        writer = csv.DictWriter(csv_file, doublequote=False, escapechar='\\',
+                                quoting=csv.QUOTE_NONE,
+                                fieldnames=(fieldnames or
+                                            CSV_FIELDNAME_MAP[resource_name]))
+        for row in rows:
+            writer.writerow(row)
+            row_count += 1
+            if ((max_rows and row_count >= max_rows) or
+                    (max_bytes and csv_file.tell() >= max_bytes)):
+                break
+        csv_file.close()
+    except (IOError, OSError, csv.Error) as e:
+        csv_file.close()
+        os.remove(csv_file.name)
+        raise CSVFileError(resource_name, e)
+
+    if not row_count:
+        os.remove(csv_file.name)
+        return None
+    return csv_file, row_count
+
+
+def write_csv_chunks(resource_name, data, max_rows=None, max_bytes=None,
+                     prefetch=False, fieldnames=None):
+    """Write the data into a series of bounded csv files.
+
+    Only one chunk (two when prefetching) is on disk at any time, so disk
+    and memory use do not depend on the size of the data.
+
+    Args:
+        resource_name (str): The resource name.
+        data (iterable): An iterable of data to be written to csv.
+        max_rows (int): Maximum number of rows per chunk, or None.
+        max_bytes (int): Approximate maximum size of a chunk in bytes,
+            or None.
+        prefetch (bool): If True, write the next chunk in a background
+            thread while the caller is processing the current one.
+        fieldnames (list): The columns to write, defaults to the columns
+            of the resource.
+
+    Yields:
+        tuple: The closed CSV temporary file pointer of a chunk and the
+            number of rows in it. The file is removed when the next chunk
+            is requested.
+
+    Raises:
+        CSVFileError: If there was an error writing a CSV file.
+    """
+    rows = iter(data)
+
+    def _next_chunk():
+        """Write the next chunk.
+
+        Returns:
+            tuple: The chunk file and its row count, or None.
+        """
+        return _write_csv_chunk(resource_name, rows, max_rows, max_bytes,
+                                fieldnames)
+
+    executor = None
+    pending = None
+    if prefetch:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        pending = executor.submit(_next_chunk)
+    try:
+        while True:
+            if pending is not None:
+                chunk, pending = pending.result(), None
+            else:
+                chunk = _next_chunk()
+            if chunk is None:
+                return
+
+            csv_file, _ = chunk
+            try:
+                if executor is not None:
+                    pending = executor.submit(_next_chunk)
+                yield chunk
+            finally:
+                os.remove(csv_file.name)
+    finally:
+        if pending is not None:
+            try:
+                leftover_chunk = pending.result()
+                if leftover_chunk is not None:
+                    os.remove(leftover_chunk[0].name)
+            except CSVFileError:
+                pass
+        if executor is not None:
+            executor.shutdown()
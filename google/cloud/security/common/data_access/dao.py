@@ -25,10 +25,14 @@ from MySQLdb import cursors
 from google.cloud.security.common.data_access import _db_connector
 from google.cloud.security.common.data_access import csv_writer
 from google.cloud.security.common.data_access import load_data_sql_provider
+from google.cloud.security.common.data_access import read_cache
+from google.cloud.security.common.data_access import snapshot_history
 from google.cloud.security.common.data_access.errors import MySQLError
 from google.cloud.security.common.data_access.errors import NoResultsError
 from google.cloud.security.common.data_access.sql_queries import create_tables
 from google.cloud.security.common.data_access.sql_queries import select_data
+from google.cloud.security.common.data_access.sql_queries import (
+    snapshot_history_sql)
 from google.cloud.security.common.util import log_util
 
 
@@ -113,10 +117,31 @@ CREATE_TABLE_MAP = {
 
 SNAPSHOT_STATUS_FILTER_CLAUSE = ' where status in ({})'
 
+# Default bounds of the csv chunks used to load data into snapshot tables.
+DEFAULT_LOAD_CHUNK_MAX_ROWS = 100000
+DEFAULT_LOAD_CHUNK_MAX_BYTES = 64 * 1024 * 1024
+
 
 class Dao(_db_connector.DbConnector):
     """Data access object (DAO)."""
 
+    def __init__(self, global_configs=None):
+        """Initialize the DAO.
+
+        Args:
+            global_configs (dict): Global configurations.
+        """
+        super(Dao, self).__init__(global_configs)
+        global_configs = global_configs or {}
+        self.load_chunk_max_rows = global_configs.get(
+            'db_load_chunk_max_rows', DEFAULT_LOAD_CHUNK_MAX_ROWS)
+        self.load_chunk_max_bytes = global_configs.get(
+            'db_load_chunk_max_bytes', DEFAULT_LOAD_CHUNK_MAX_BYTES)
+        self.load_chunk_prefetch = global_configs.get(
+            'db_load_chunk_prefetch', False)
+        self.incremental_snapshots = global_configs.get(
+            'db_incremental_snapshots', False)
+
     @staticmethod
     def map_row_to_object(object_class, row):
         """Instantiate an object from database row.
@@ -132,9 +157,24 @@ class Dao(_db_connector.DbConnector):
         """
         return object_class(**row)
 
+    def _is_incremental(self, resource_name):
+        """Whether a resource is kept in a history table.
+
+        Args:
+            resource_name (str): String of the resource name.
+
+        Returns:
+            bool: True if the snapshots of the resource are incremental.
+        """
+        return (self.incremental_snapshots and
+                resource_name not in snapshot_history.EXCLUDED_RESOURCES)
+
     def create_snapshot_table(self, resource_name, timestamp):
         """Creates a snapshot table.
 
+        With incremental snapshots, the snapshot table is a view of the
+        history table of the resource, which is created if needed.
+
         Args:
             resource_name (str): String of the resource name.
             timestamp (str): String of timestamp, formatted as
@@ -146,9 +186,19 @@ class Dao(_db_connector.DbConnector):
         snapshot_table_name = self._create_snapshot_table_name(
             resource_name, timestamp)
         create_table_sql = CREATE_TABLE_MAP[resource_name]
-        create_snapshot_sql = create_table_sql.format(snapshot_table_name)
         cursor = self.conn.cursor()
-        cursor.execute(create_snapshot_sql)
+        if self._is_incremental(resource_name):
+            history_table_name = snapshot_history.get_history_table_name(
+                resource_name)
+            cursor.execute(snapshot_history.get_create_history_table_sql(
+                create_table_sql, history_table_name))
+            columns = snapshot_history.get_column_names(create_table_sql)
+            cursor.execute(snapshot_history_sql.CREATE_SNAPSHOT_VIEW.format(
+                snapshot_table_name,
+                ', '.join('`{}`'.format(column) for column in columns),
+                history_table_name, timestamp))
+        else:
+            cursor.execute(create_table_sql.format(snapshot_table_name))
         return snapshot_table_name
 
     @staticmethod
@@ -190,31 +240,228 @@ class Dao(_db_connector.DbConnector):
     def load_data(self, resource_name, timestamp, data):
         """Load data into a snapshot table.
 
+        The data is streamed into bounded csv chunks, and each chunk is
+        loaded and committed on its own, so that memory and disk use stay
+        flat regardless of the size of the data.
+
+        With incremental snapshots, only the rows that were added or changed
+        since the previous cycle are loaded, into the history table of the
+        resource.
+
         Args:
             resource_name (str): String of the resource name.
             timestamp (str): String of timestamp, formatted as
                 YYYYMMDDTHHMMSSZ.
             data (iterable): An iterable or a list of data to be uploaded.
 
+        Returns:
+            int: The number of rows loaded.
+
         Raises:
             MySQLError: When an error has occured while executing the query.
         """
-        with csv_writer.write_csv(resource_name, data) as csv_file:
-            try:
-                snapshot_table_name = self._create_snapshot_table_name(
-                    resource_name, timestamp)
-                load_data_sql = load_data_sql_provider.provide_load_data_sql(
-                    resource_name, csv_file.name, snapshot_table_name)
-                LOGGER.debug('SQL: %s', load_data_sql)
-                cursor = self.conn.cursor()
-                cursor.execute(load_data_sql)
-                self.conn.commit()
-                # TODO: Return the snapshot table name so that it can be tracked
-                # in the main snapshot table.
-            except (DataError, IntegrityError, InternalError,
-                    NotSupportedError, OperationalError,
-                    ProgrammingError) as e:
-                raise MySQLError(resource_name, e)
+        if self._is_incremental(resource_name):
+            return self._load_history_data(resource_name, timestamp, data)
+
+        snapshot_table_name = self._create_snapshot_table_name(
+            resource_name, timestamp)
+        total_rows = self._load_csv_chunks(
+            resource_name, snapshot_table_name, data)
+        LOGGER.info('Loaded %s rows into %s.', total_rows, snapshot_table_name)
+        return total_rows
+
+    def _load_history_data(self, resource_name, timestamp, data):
+        """Load the added and changed rows into a history table.
+
+        Args:
+            resource_name (str): String of the resource name.
+            timestamp (str): String of timestamp, formatted as
+                YYYYMMDDTHHMMSSZ.
+            data (iterable): An iterable or a list of data to be uploaded.
+
+        Returns:
+            int: The number of rows loaded.
+
+        Raises:
+            MySQLError: When an error has occured while executing the query.
+        """
+        history_table_name = snapshot_history.get_history_table_name(
+            resource_name)
+        delta = snapshot_history.get_cycle_delta(
+            resource_name, timestamp,
+            lambda: self._select_live_fingerprints(resource_name, timestamp))
+        fieldnames = csv_writer.CSV_FIELDNAME_MAP[resource_name]
+        new_rows = (
+            dict(row, row_fingerprint=fingerprint, added_cycle=timestamp)
+            for fingerprint, row in delta.filter_new_rows(fieldnames, data))
+        total_rows = self._load_csv_chunks(
+            resource_name, history_table_name, new_rows,
+            fieldnames + snapshot_history.HISTORY_FIELDNAMES)
+        LOGGER.info('Loaded %s added or changed rows into %s.',
+                    total_rows, history_table_name)
+        return total_rows
+
+    def _load_csv_chunks(self, resource_name, table_name, data,
+                         fieldnames=None):
+        """Load data into a table, one csv chunk at a time.
+
+        Args:
+            resource_name (str): String of the resource name.
+            table_name (str): The table to load the data into.
+            data (iterable): An iterable or a list of data to be uploaded.
+            fieldnames (list): The columns to load, defaults to the columns
+                of the resource.
+
+        Returns:
+            int: The number of rows loaded.
+
+        Raises:
+            MySQLError: When an error has occured while executing the query.
+        """
+        chunks = csv_writer.write_csv_chunks(
+            resource_name, data,
+            max_rows=self.load_chunk_max_rows,
+            max_bytes=self.load_chunk_max_bytes,
+            prefetch=self.load_chunk_prefetch,
+            fieldnames=fieldnames)
+        total_rows = 0
+        try:
+            for chunk_number, (csv_file, row_count) in enumerate(chunks, 1):
+                try:
+                    load_data_sql = (
+                        load_data_sql_provider.provide_load_data_sql(
+                            resource_name, csv_file.name, table_name,
+                            fieldnames))
+                    LOGGER.debug('SQL: %s', load_data_sql)
+                    cursor = self.conn.cursor()
+                    cursor.execute(load_data_sql)
+                    self.conn.commit()
+                    # TODO: Return the snapshot table name so that it can be
+                    # tracked in the main snapshot table.
+                except (DataError, IntegrityError, InternalError,
+                        NotSupportedError, OperationalError,
+                        ProgrammingError) as e:
+                    self._recover_connection(e)
+                    raise MySQLError(resource_name, e)
+                total_rows += row_count
+                LOGGER.debug('Loaded chunk #%s of %s rows into %s.',
+                             chunk_number, row_count, table_name)
+        finally:
+            chunks.close()
+        return total_rows
+
+    def _select_live_fingerprints(self, resource_name, timestamp):
+        """Select the fingerprints of the rows live before a cycle.
+
+        Args:
+            resource_name (str): String of the resource name.
+            timestamp (str): String of timestamp, formatted as
+                YYYYMMDDTHHMMSSZ.
+
+        Returns:
+            list: The fingerprints of the live rows.
+
+        Raises:
+            MySQLError: When an error has occured while executing the query.
+        """
+        sql = snapshot_history_sql.SELECT_LIVE_FINGERPRINTS.format(
+            snapshot_history.get_history_table_name(resource_name))
+        rows = self.execute_sql_with_fetch(resource_name, sql, (timestamp,))
+        return [row['row_fingerprint'] for row in rows]
+
+    def mark_incremental_loads_complete(self, resource_names, timestamp):
+        """Record that the resources of a successful pipeline are loaded.
+
+        Args:
+            resource_names (iterable): The names of the resources loaded by
+                the pipeline.
+            timestamp (str): String of timestamp, formatted as
+                YYYYMMDDTHHMMSSZ.
+        """
+        for resource_name in resource_names:
+            if self._is_incremental(resource_name):
+                snapshot_history.mark_resource_loaded(resource_name, timestamp)
+
+    def _select_history_table_names(self):
+        """Select the names of the existing history tables.
+
+        Returns:
+            set: The names of the history tables.
+
+        Raises:
+            MySQLError: When an error has occured while executing the query.
+        """
+        rows = self.execute_sql_with_fetch(
+            snapshot_history_sql.RESOURCE_NAME,
+            snapshot_history_sql.SELECT_HISTORY_TABLES,
+            (snapshot_history.get_history_table_name('%'),))
+        return set(row['TABLE_NAME'] for row in rows)
+
+    def complete_incremental_snapshot(self, timestamp):
+        """Record the rows removed in a cycle, and the cycle's change log.
+
+        The rows of a fully loaded resource that were live before the cycle,
+        but were not loaded in it, are marked as removed by the cycle. The
+        rows of a resource whose pipeline did not run or failed stay live.
+        Every added and removed row is recorded in the snapshot_changes
+        table.
+
+        Args:
+            timestamp (str): String of timestamp, formatted as
+                YYYYMMDDTHHMMSSZ.
+
+        Raises:
+            MySQLError: When an error has occured while executing the query.
+        """
+        if not self.incremental_snapshots:
+            return
+
+        self.execute_sql_with_commit(
+            snapshot_history_sql.RESOURCE_NAME,
+            snapshot_history_sql.CREATE_CHANGES_TABLE, None)
+        history_table_names = self._select_history_table_names()
+        for resource_name in sorted(CREATE_TABLE_MAP):
+            if not self._is_incremental(resource_name):
+                continue
+            delta = snapshot_history.pop_cycle_delta(resource_name, timestamp)
+            loaded = snapshot_history.pop_resource_loaded(
+                resource_name, timestamp)
+            history_table_name = snapshot_history.get_history_table_name(
+                resource_name)
+            if history_table_name not in history_table_names:
+                LOGGER.warn('%s does not exist, skipping.', history_table_name)
+                continue
+            if not loaded:
+                LOGGER.warn('%s was not fully loaded in this cycle, its rows '
+                            'are not marked as removed.', resource_name)
+                if delta is None:
+                    continue
+            elif delta is None:
+                delta = snapshot_history.CycleDelta(
+                    self._select_live_fingerprints(resource_name, timestamp))
+
+            removed_fingerprints = (
+                delta.get_removed_fingerprints() if loaded else [])
+            if removed_fingerprints:
+                self.execute_many_with_commit(
+                    resource_name,
+                    snapshot_history_sql.UPDATE_REMOVED_ROW.format(
+                        history_table_name),
+                    [(timestamp, fingerprint)
+                     for fingerprint in removed_fingerprints])
+
+            changes = (
+                [(timestamp, resource_name, fingerprint, 'ADDED')
+                 for fingerprint in delta.added_fingerprints] +
+                [(timestamp, resource_name, fingerprint, 'REMOVED')
+                 for fingerprint in removed_fingerprints])
+            if changes:
+                self.execute_many_with_commit(
+                    snapshot_history_sql.RESOURCE_NAME,
+                    snapshot_history_sql.INSERT_CHANGE, changes)
+            LOGGER.info('%s: %s rows added, %s rows removed.',
+                        resource_name, len(delta.added_fingerprints),
+                        len(removed_fingerprints))
 
     def select_record_count(self, resource_name, timestamp):
         """Select the record count from a snapshot table.
@@ -236,9 +483,12 @@ class Dao(_db_connector.DbConnector):
                 resource_name, timestamp)
             cursor = self.conn.cursor()
             cursor.execute(record_count_sql)
-            return cursor.fetchone()[0]
+            record_count = cursor.fetchone()[0]
+            self.conn.commit()
+            return record_count
         except (DataError, IntegrityError, InternalError, NotSupportedError,
                 OperationalError, ProgrammingError) as e:
+            self._recover_connection(e)
             raise MySQLError(resource_name, e)
 
     def select_group_ids(self, resource_name, timestamp):
@@ -260,14 +510,25 @@ class Dao(_db_connector.DbConnector):
             cursor = self.conn.cursor(cursorclass=cursors.DictCursor)
             cursor.execute(group_ids_sql)
             rows = cursor.fetchall()
+            self.conn.commit()
             return [row['group_id'] for row in rows]
         except (DataError, IntegrityError, InternalError, NotSupportedError,
                 OperationalError, ProgrammingError) as e:
+            self._recover_connection(e)
             raise MySQLError(resource_name, e)
 
     def execute_sql_with_fetch(self, resource_name, sql, values):
         """Executes a provided sql statement with fetch.
 
+        The rows of the queries reading the snapshot of the read cache, if
+        it is enabled, are shared with all the DAOs and must not be modified.
+
+        The read transaction is committed once the rows are fetched. The
+        connection is shared by all the DAOs of the thread, so the next read,
+        e.g. by the next pipeline run by the thread, must not see the
+        snapshot of this one, which misses the rows committed since by the
+        other threads.
+
         Args:
             resource_name (str): String of the resource name.
             sql (str): String of the sql statement.
@@ -276,34 +537,78 @@ class Dao(_db_connector.DbConnector):
         Returns:
             list: A list of dict representing rows of sql query result.
 
+        Raises:
+            MySQLError: When an error has occured while executing the query.
+        """
+        def _fetch():
+            """Run the query.
+
+            Returns:
+                tuple: The rows of the query.
+
+            Raises:
+                MySQLError: When an error has occured while executing the
+                    query.
+            """
+            try:
+                cursor = self.conn.cursor(cursorclass=cursors.DictCursor)
+                cursor.execute(sql, values)
+                rows = cursor.fetchall()
+                self.conn.commit()
+                return rows
+            except (DataError, IntegrityError, InternalError,
+                    NotSupportedError, OperationalError,
+                    ProgrammingError) as e:
+                self._recover_connection(e)
+                raise MySQLError(resource_name, e)
+
+        cache = read_cache.READ_CACHE
+        if cache is not None and cache.is_cacheable(sql):
+            return cache.get(sql, values, _fetch)
+        return _fetch()
+
+    def execute_sql_with_commit(self, resource_name, sql, values):
+        """Executes a provided sql statement with commit.
+
+        Args:
+            resource_name (str): String of the resource name.
+            sql (str): String of the sql statement.
+            values (tuple): Tuple of string for sql placeholder values.
+
         Raises:
             MySQLError: When an error has occured while executing the query.
         """
         try:
-            cursor = self.conn.cursor(cursorclass=cursors.DictCursor)
+            cursor = self.conn.cursor()
             cursor.execute(sql, values)
-            return cursor.fetchall()
+            self.conn.commit()
         except (DataError, IntegrityError, InternalError, NotSupportedError,
                 OperationalError, ProgrammingError) as e:
+            self._recover_connection(e)
             raise MySQLError(resource_name, e)
 
-    def execute_sql_with_commit(self, resource_name, sql, values):
-        """Executes a provided sql statement with commit.
+    def execute_many_with_commit(self, resource_name, sql, values_list):
+        """Executes a provided sql statement for many values, with commit.
+
+        For INSERT ... VALUES statements, MySQLdb sends all the values as
+        a single multi-row INSERT.
 
         Args:
             resource_name (str): String of the resource name.
             sql (str): String of the sql statement.
-            values (tuple): Tuple of string for sql placeholder values.
+            values_list (list): List of tuples of string for sql placeholder
+                values.
 
         Raises:
             MySQLError: When an error has occured while executing the query.
         """
         try:
             cursor = self.conn.cursor()
-            cursor.execute(sql, values)
+            cursor.executemany(sql, values_list)
             self.conn.commit()
         except (DataError, IntegrityError, InternalError, NotSupportedError,
                 OperationalError, ProgrammingError) as e:
+            self._recover_connection(e)
             raise MySQLError(resource_name, e)
 
     def get_latest_snapshot_timestamp(self, statuses):
@@ -330,9 +635,13 @@ class Dao(_db_connector.DbConnector):
             cursor.execute(
                 select_data.LATEST_SNAPSHOT_TIMESTAMP + filter_clause, statuses)
             row = cursor.fetchone()
+            self.conn.commit()
             if row:
                 return row[0]
             raise NoResultsError('No snapshot cycle found.')
         except (DataError, IntegrityError, InternalError, NotSupportedError,
-                OperationalError, ProgrammingError, NoResultsError) as e:
+                OperationalError, ProgrammingError) as e:
+            self._recover_connection(e)
+            raise MySQLError('snapshot_cycles', e)
+        except NoResultsError as e:
             raise MySQLError('snapshot_cycles', e)
@@ -76,6 +76,20 @@ class GroupDao(dao.Dao):
         sql = select_data.GROUP_MEMBERS.format(timestamp)
         return self.execute_sql_with_fetch(resource_name, sql, (group_id,))
 
+    def get_all_group_members(self, resource_name, timestamp):
+        """Get the members of all the groups.
+
+        Args:
+            resource_name (str): The resource name.
+            timestamp (str): The timestamp of the snapshot.
+
+        Returns:
+             tuple: A tuple of group members in dict format, in the same
+                 format as get_group_members().
+        """
+        sql = select_data.ALL_GROUP_MEMBERS.format(timestamp)
+        return self.execute_sql_with_fetch(resource_name, sql, None)
+
     def get_recursive_members_of_group(self, group_email, timestamp):
         """Get all the recursive members of a group.
 
@@ -21,18 +21,21 @@ from google.cloud.security.common.data_access.sql_queries import load_data
 FIELDNAME_MAP = csv_writer.CSV_FIELDNAME_MAP
 
 
-def provide_load_data_sql(resource_name, csv_filename, snapshot_table_name):
+def provide_load_data_sql(resource_name, csv_filename, snapshot_table_name,
+                          fieldnames=None):
     """Provide the load data sql for projects.
 
     Args:
         resource_name (str): The resource name.
         csv_filename (str): The csv filename; full path included.
         snapshot_table_name (str): The snapshot table name.
+        fieldnames (list): The columns of the csv file, defaults to the
+            columns of the resource.
 
     Returns:
         str: The load data sql statement for projects.
     """
-    fieldname = FIELDNAME_MAP[resource_name]
+    fieldname = fieldnames or FIELDNAME_MAP[resource_name]
     return load_data.LOAD_DATA.format(
         csv_filename, snapshot_table_name,
         (','.join(fieldname)))
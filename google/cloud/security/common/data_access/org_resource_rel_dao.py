@@ -17,18 +17,133 @@
 from google.cloud.security.common.data_access import folder_dao
 from google.cloud.security.common.data_access import organization_dao
 from google.cloud.security.common.data_access import project_dao
+from google.cloud.security.common.data_access.errors import MySQLError
 from google.cloud.security.common.gcp_type import resource
+from google.cloud.security.common.util import log_util
+
+
+LOGGER = log_util.get_logger(__name__)
+
+
+class ResourceHierarchyIndex(object):
+    """In-memory index of the organization/folder/project hierarchy.
+
+    Resources are keyed by (type, id) and linked to their parents through
+    the parent pointers loaded from the snapshot. Ancestor chains are
+    memoized, so repeated lookups are plain dictionary reads.
+    """
+
+    def __init__(self, org_resources):
+        """Initialize.
+
+        Args:
+            org_resources (iterable): The Resources to index.
+        """
+        self._resources = {}
+        self._ancestors = {}
+        for org_resource in org_resources:
+            self._resources[self._key(org_resource)] = org_resource
+
+    def __len__(self):
+        """Number of indexed resources.
+
+        Returns:
+            int: The number of indexed resources.
+        """
+        return len(self._resources)
+
+    @staticmethod
+    def _key(org_resource):
+        """Get the index key of a resource.
+
+        Args:
+            org_resource (Resource): A Resource.
+
+        Returns:
+            tuple: The (type, id) key of the resource.
+        """
+        return (org_resource.type, str(org_resource.id))
+
+    def get(self, org_resource):
+        """Get the indexed copy of a resource.
+
+        Args:
+            org_resource (Resource): A Resource.
+
+        Returns:
+            Resource: The indexed Resource, or None if it is not indexed.
+        """
+        if not org_resource or not org_resource.id:
+            return None
+        return self._resources.get(self._key(org_resource))
+
+    def find_ancestors(self, org_resource):
+        """Find the ancestors of a resource using only the index.
+
+        Args:
+            org_resource (Resource): A Resource.
+
+        Returns:
+            list: A list of Resource ancestors, starting with the closest
+                ancestor, or None if the resource or one of its ancestors
+                is not in the index.
+        """
+        indexed_resource = self.get(org_resource)
+        if indexed_resource is None:
+            return None
+
+        key = self._key(indexed_resource)
+        if key in self._ancestors:
+            return list(self._ancestors[key])
+
+        # Walk up until the root or a memoized chain, then fill in the
+        # chains of every resource visited on the way back down.
+        path = []
+        visited = set()
+        curr_resource = indexed_resource
+        tail = []
+        while curr_resource is not None:
+            curr_key = self._key(curr_resource)
+            if curr_key in self._ancestors:
+                tail = (curr_resource,) + self._ancestors[curr_key]
+                break
+            if curr_key in visited:
+                LOGGER.warn('Cycle in resource hierarchy at %s', curr_key)
+                break
+            visited.add(curr_key)
+            path.append(curr_resource)
+
+            parent = curr_resource.parent
+            if not parent or not parent.type or not parent.id:
+                break
+            curr_resource = self.get(parent)
+            if curr_resource is None:
+                return None
+
+        chain = list(tail)
+        for curr_resource in reversed(path):
+            self._ancestors[self._key(curr_resource)] = tuple(chain)
+            chain.insert(0, curr_resource)
+
+        return list(self._ancestors[key])
 
 
 class OrgResourceRelDao(object):
     """DAO for organization resource entity relationships."""
 
-    def __init__(self, global_configs):
+    def __init__(self, global_configs, use_hierarchy_index=False):
         """Initialize.
 
         Args:
             global_configs (dict): Global configurations.
+            use_hierarchy_index (bool): Whether to bulk load the resource
+                hierarchy of each snapshot into a ResourceHierarchyIndex
+                and resolve ancestors from it, instead of querying each
+                ancestor individually.
         """
+        self._use_hierarchy_index = use_hierarchy_index
+        self._hierarchy_indexes = {}
+
         # Map the org resource type to the appropriate dao class
         self._resource_db_lookup = {
             resource.ResourceType.ORGANIZATION: {
@@ -58,6 +173,13 @@ class OrgResourceRelDao(object):
         """
         # TODO: handle case where snapshot is None
 
+        if self._use_hierarchy_index:
+            index = self.get_hierarchy_index(snapshot_timestamp)
+            if index is not None:
+                ancestors = index.find_ancestors(org_resource)
+                if ancestors is not None:
+                    return ancestors
+
         ancestors = []
         curr_resource = org_resource
 
@@ -82,6 +204,59 @@ class OrgResourceRelDao(object):
 
         return ancestors
 
+    def get_hierarchy_index(self, snapshot_timestamp):
+        """Get the hierarchy index of a snapshot, loading it if needed.
+
+        Args:
+            snapshot_timestamp (str): The timestamp to use for data lookup.
+
+        Returns:
+            ResourceHierarchyIndex: The index of the snapshot hierarchy, or
+                None if there is no snapshot timestamp.
+        """
+        if not snapshot_timestamp:
+            return None
+        if snapshot_timestamp not in self._hierarchy_indexes:
+            self._hierarchy_indexes[snapshot_timestamp] = (
+                ResourceHierarchyIndex(
+                    self._load_hierarchy(snapshot_timestamp)))
+        return self._hierarchy_indexes[snapshot_timestamp]
+
+    def _load_hierarchy(self, snapshot_timestamp):
+        """Bulk load the organizations, folders and projects of a snapshot.
+
+        A resource type that can't be loaded is left out of the index;
+        lookups that need it fall back to querying each ancestor.
+
+        Args:
+            snapshot_timestamp (str): The timestamp to use for data lookup.
+
+        Returns:
+            list: The Resources of the snapshot hierarchy.
+        """
+        loaders = [
+            (resource.ResourceType.ORGANIZATION,
+             lambda dao: dao.get_organizations(
+                 resource.ResourceType.ORGANIZATION, snapshot_timestamp)),
+            (resource.ResourceType.FOLDER,
+             lambda dao: dao.get_folders(
+                 resource.ResourceType.FOLDER, snapshot_timestamp)),
+            (resource.ResourceType.PROJECT,
+             lambda dao: dao.get_projects(snapshot_timestamp)),
+        ]
+
+        org_resources = []
+        for resource_type, load in loaders:
+            try:
+                org_resources.extend(
+                    load(self._resource_db_lookup[resource_type]['dao']))
+            except MySQLError as e:
+                LOGGER.warn('Unable to load %s hierarchy for snapshot %s: %s',
+                            resource_type, snapshot_timestamp, e)
+        LOGGER.debug('Indexed %s resources of snapshot %s.',
+                     len(org_resources), snapshot_timestamp)
+        return org_resources
+
     def _load_resource(self, unloaded_resource, snapshot_timestamp):
         """Load the resource from the database.
 
@@ -0,0 +1,155 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An in-memory cache of the rows read from a snapshot.
+
+The snapshot tables are not modified once their inventory cycle has
+completed, so the results of the queries reading them can be shared by all
+the DAOs of a scanner run. Only the SELECT queries that reference the tables
+of the cached snapshot, i.e. that contain its timestamp, are cached, except
+for the violations tables which are written during the run.
+
+The least recently used results are evicted once the estimated size of the
+cached rows exceeds the memory budget.
+"""
+import collections
+import sys
+import threading
+
+from google.cloud.security.common.util import log_util
+
+LOGGER = log_util.get_logger(__name__)
+
+# Default memory budget of the cached rows.
+DEFAULT_MAX_MEGABYTES = 256
+
+# Tables of the snapshot that are written during a scanner run.
+UNCACHED_TABLES = ('violations',)
+
+# The cache used by the DAOs, None when caching is disabled.
+READ_CACHE = None
+
+
+def _estimate_size(rows):
+    """Estimate the memory used by rows.
+
+    Args:
+        rows (tuple): The rows, as dicts.
+
+    Returns:
+        int: The approximate number of bytes used by the rows.
+    """
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row.itervalues():
+            size += sys.getsizeof(value)
+    return size
+
+
+class ReadCache(object):
+    """LRU cache of the query results of a snapshot."""
+
+    def __init__(self, timestamp, max_bytes):
+        """Initialize.
+
+        Args:
+            timestamp (str): The timestamp of the cached snapshot.
+            max_bytes (int): Memory budget of the cached rows.
+        """
+        self.timestamp = timestamp
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Maps (sql, values) to (rows, size), least recently used first.
+        self._entries = collections.OrderedDict()
+
+    def is_cacheable(self, sql):
+        """Check whether the result of a query can be cached.
+
+        Args:
+            sql (str): The query.
+
+        Returns:
+            bool: True if the query only reads immutable snapshot tables.
+        """
+        return (sql.lstrip()[:6].upper() == 'SELECT' and
+                self.timestamp in sql and
+                not any(table in sql for table in UNCACHED_TABLES))
+
+    def get(self, sql, values, fetch):
+        """Get the rows of a query, fetching them on a miss.
+
+        The cached rows are shared by all the callers, who must not modify
+        them.
+
+        Args:
+            sql (str): The query.
+            values (tuple): The values of the query placeholders.
+            fetch (function): Runs the query and returns its rows.
+
+        Returns:
+            tuple: The rows of the query.
+        """
+        key = (sql, tuple(values or ()))
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        rows = tuple(fetch())
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            return rows
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (rows, size)
+                self.size += size
+                while self.size > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self.size -= evicted_size
+        return rows
+
+    def log_stats(self):
+        """Log the hits and misses of the cache."""
+        LOGGER.info('Read cache of snapshot %s: %s hits, %s misses, %s '
+                    'results cached in %s bytes.', self.timestamp, self.hits,
+                    self.misses, len(self._entries), self.size)
+
+
+def configure(scanner_configs, timestamp):
+    """Enable the read cache of all the DAOs, if configured.
+
+    Args:
+        scanner_configs (dict): Scanner configurations, read_cache_max_mb is
+            the memory budget of the cache, and 0 disables it.
+        timestamp (str): The timestamp of the scanned snapshot.
+
+    Returns:
+        ReadCache: The read cache, or None if it is disabled.
+    """
+    global READ_CACHE  # pylint: disable=global-statement
+    max_megabytes = scanner_configs.get(
+        'read_cache_max_mb', DEFAULT_MAX_MEGABYTES)
+    if not max_megabytes or not timestamp:
+        READ_CACHE = None
+    else:
+        READ_CACHE = ReadCache(timestamp, max_megabytes * 1024 * 1024)
+    return READ_CACHE
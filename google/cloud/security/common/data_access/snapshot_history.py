@@ -0,0 +1,248 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental inventory snapshots.
+
+In incremental mode, a resource is not loaded into a new snapshot table on
+every cycle. Each resource has a single history table, holding every
+version of its rows, with the cycle that added it and the cycle that
+removed it. A cycle only writes the rows that were added or changed since
+the previous cycle, and marks the rows that are gone as removed. The
+snapshot table of a cycle, e.g. instances_20170130T192053Z, is a view of the
+rows that were live in that cycle, so readers still see a full snapshot.
+
+A row is identified by a fingerprint of all its columns, which include the
+raw JSON of the resource. A changed resource is therefore recorded as the
+removal of its old row and the addition of its new row.
+"""
+
+import collections
+import hashlib
+import json
+import re
+import threading
+
+from google.cloud.security.common.data_access.sql_queries import (
+    snapshot_history_sql)
+
+
+# Resources that are not loaded by the inventory, and so stay in regular
+# snapshot tables.
+EXCLUDED_RESOURCES = frozenset(['violations'])
+
+# The columns written by the inventory, in addition to the snapshot columns.
+HISTORY_FIELDNAMES = ['row_fingerprint', 'added_cycle']
+
+_COLUMN_REGEX = re.compile(r'^\s*`(\w+)`\s', re.MULTILINE)
+_AUTO_INCREMENT_COLUMN_REGEX = re.compile(r'`(\w+)`[^,\n]*AUTO_INCREMENT')
+_KEY_REGEX = re.compile(r',\s*(?:PRIMARY|UNIQUE) KEY[^(]*\([^)]*\)')
+_TABLE_END_REGEX = re.compile(r'\s*\)\s*ENGINE')
+
+_CYCLE_DELTAS = {}
+_LOADED_RESOURCES = set()
+_CYCLE_DELTAS_LOCK = threading.Lock()
+
+
+def get_history_table_name(resource_name):
+    """Get the name of the history table of a resource.
+
+    Args:
+        resource_name (str): The resource name.
+
+    Returns:
+        str: The history table name.
+    """
+    return resource_name + '_history'
+
+
+def get_column_names(create_table_sql):
+    """Get the column names of a snapshot table.
+
+    Args:
+        create_table_sql (str): The create table statement of the table.
+
+    Returns:
+        list: The column names, in the order of the table.
+    """
+    return _COLUMN_REGEX.findall(create_table_sql)
+
+
+def get_create_history_table_sql(create_table_sql, history_table_name):
+    """Get the statement creating a history table, if it doesn't exist.
+
+    The history table has the columns of the snapshot table, without its
+    unique keys, because it holds several versions of the same resource.
+
+    Args:
+        create_table_sql (str): The create table statement of the snapshot
+            table.
+        history_table_name (str): The history table name.
+
+    Returns:
+        str: The create table statement of the history table.
+    """
+    auto_increment_column = _AUTO_INCREMENT_COLUMN_REGEX.search(
+        create_table_sql)
+    if auto_increment_column:
+        primary_key = 'PRIMARY KEY (`{}`)'.format(
+            auto_increment_column.group(1))
+    else:
+        primary_key = 'PRIMARY KEY (`row_fingerprint`, `added_cycle`)'
+
+    history_sql = _KEY_REGEX.sub('', create_table_sql)
+    history_sql = _TABLE_END_REGEX.sub(
+        ',' + snapshot_history_sql.HISTORY_COLUMNS.format(primary_key) +
+        '\n    ) ENGINE', history_sql, count=1)
+    history_sql = history_sql.replace(
+        'CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1)
+    return history_sql.format(history_table_name)
+
+
+class CycleDelta(object):
+    """The rows of a resource that were seen and added in a cycle."""
+
+    def __init__(self, previous_fingerprints):
+        """Initialize.
+
+        Args:
+            previous_fingerprints (iterable): The fingerprints of the rows
+                that were live before the cycle.
+        """
+        self.previous_fingerprints = frozenset(previous_fingerprints)
+        self.seen_fingerprints = set()
+        self.added_fingerprints = []
+        self._occurrences = collections.Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(values, occurrence):
+        """Fingerprint the values of a row.
+
+        Args:
+            values (list): The values of the row.
+            occurrence (int): How many identical rows came before this one,
+                so that duplicated rows get distinct fingerprints.
+
+        Returns:
+            str: The hex md5 digest of the row.
+        """
+        serialized = json.dumps([values, occurrence], sort_keys=True,
+                                default=str)
+        return hashlib.md5(serialized).hexdigest()
+
+    def filter_new_rows(self, fieldnames, rows):
+        """Filter out the rows that were live before the cycle.
+
+        Args:
+            fieldnames (list): The columns of the rows.
+            rows (iterable): The rows loaded in the cycle, as dicts.
+
+        Yields:
+            tuple: The fingerprint and the row, for every row that was added
+                or changed since the previous cycle.
+        """
+        for row in rows:
+            values = [row.get(fieldname) for fieldname in fieldnames]
+            base_fingerprint = self._fingerprint(values, 0)
+            with self._lock:
+                occurrence = self._occurrences[base_fingerprint]
+                self._occurrences[base_fingerprint] += 1
+                fingerprint = (self._fingerprint(values, occurrence)
+                               if occurrence else base_fingerprint)
+                self.seen_fingerprints.add(fingerprint)
+                if fingerprint in self.previous_fingerprints:
+                    continue
+                self.added_fingerprints.append(fingerprint)
+            yield fingerprint, row
+
+    def get_removed_fingerprints(self):
+        """Get the fingerprints of the rows that were not seen in the cycle.
+
+        Returns:
+            list: The fingerprints of the removed rows.
+        """
+        with self._lock:
+            return list(self.previous_fingerprints - self.seen_fingerprints)
+
+
+def get_cycle_delta(resource_name, cycle_timestamp, get_previous_fingerprints):
+    """Get the delta of a resource in a cycle, creating it on first use.
+
+    The deltas are shared by all the DAOs of the process, because a
+    resource can be loaded several times in a cycle.
+
+    Args:
+        resource_name (str): The resource name.
+        cycle_timestamp (str): Timestamp, formatted as YYYYMMDDTHHMMSSZ.
+        get_previous_fingerprints (function): Returns the fingerprints of
+            the rows that were live before the cycle.
+
+    Returns:
+        CycleDelta: The delta of the resource in the cycle.
+    """
+    key = (resource_name, cycle_timestamp)
+    with _CYCLE_DELTAS_LOCK:
+        delta = _CYCLE_DELTAS.get(key)
+    if delta is None:
+        delta = CycleDelta(get_previous_fingerprints())
+        with _CYCLE_DELTAS_LOCK:
+            delta = _CYCLE_DELTAS.setdefault(key, delta)
+    return delta
+
+
+def pop_cycle_delta(resource_name, cycle_timestamp):
+    """Remove the delta of a resource in a cycle.
+
+    Args:
+        resource_name (str): The resource name.
+        cycle_timestamp (str): Timestamp, formatted as YYYYMMDDTHHMMSSZ.
+
+    Returns:
+        CycleDelta: The delta, or None if the resource wasn't loaded in the
+            cycle.
+    """
+    with _CYCLE_DELTAS_LOCK:
+        return _CYCLE_DELTAS.pop((resource_name, cycle_timestamp), None)
+
+
+def mark_resource_loaded(resource_name, cycle_timestamp):
+    """Record that a resource was fully loaded in a cycle.
+
+    Only the rows of the resources that were fully loaded are marked as
+    removed when the cycle completes. The rows of a resource whose pipeline
+    was disabled or failed stay live.
+
+    Args:
+        resource_name (str): The resource name.
+        cycle_timestamp (str): Timestamp, formatted as YYYYMMDDTHHMMSSZ.
+    """
+    with _CYCLE_DELTAS_LOCK:
+        _LOADED_RESOURCES.add((resource_name, cycle_timestamp))
+
+
+def pop_resource_loaded(resource_name, cycle_timestamp):
+    """Check and forget whether a resource was fully loaded in a cycle.
+
+    Args:
+        resource_name (str): The resource name.
+        cycle_timestamp (str): Timestamp, formatted as YYYYMMDDTHHMMSSZ.
+
+    Returns:
+        bool: True if the resource was fully loaded in the cycle.
+    """
+    key = (resource_name, cycle_timestamp)
+    with _CYCLE_DELTAS_LOCK:
+        loaded = key in _LOADED_RESOURCES
+        _LOADED_RESOURCES.discard(key)
+        return loaded
@@ -149,6 +149,11 @@ GROUP_MEMBERS = """
     WHERE group_id = %s;
 """
 
+ALL_GROUP_MEMBERS = """
+    SELECT group_id, member_role, member_type, member_id, member_email
+    FROM group_members_{};
+"""
+
 BUCKETS = """
     SELECT project_number, bucket_id, bucket_name, bucket_kind, bucket_storage_class,
     bucket_location, bucket_create_time, bucket_update_time, bucket_selflink,
@@ -0,0 +1,67 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""SQL queries for the incremental snapshot history tables."""
+
+RESOURCE_NAME = 'snapshot_changes'
+
+# Appended to the columns of a snapshot table to create its history table.
+# {0} is the primary key of the history table.
+HISTORY_COLUMNS = """
+        `row_fingerprint` char(32) NOT NULL,
+        `added_cycle` varchar(255) NOT NULL,
+        `removed_cycle` varchar(255) DEFAULT NULL,
+        {0},
+        KEY `live_rows` (`removed_cycle`, `added_cycle`, `row_fingerprint`),
+        KEY `row_fingerprint` (`row_fingerprint`, `removed_cycle`)"""
+
+CREATE_SNAPSHOT_VIEW = """
+    CREATE VIEW `{0}` AS
+    SELECT {1} FROM `{2}`
+    WHERE added_cycle <= '{3}'
+    AND (removed_cycle IS NULL OR removed_cycle > '{3}');
+"""
+
+SELECT_HISTORY_TABLES = """
+    SELECT TABLE_NAME FROM information_schema.tables
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME LIKE %s;
+"""
+
+SELECT_LIVE_FINGERPRINTS = """
+    SELECT row_fingerprint FROM `{0}`
+    WHERE removed_cycle IS NULL AND added_cycle < %s;
+"""
+
+UPDATE_REMOVED_ROW = """
+    UPDATE `{0}` SET removed_cycle=%s
+    WHERE row_fingerprint=%s AND removed_cycle IS NULL;
+"""
+
+CREATE_CHANGES_TABLE = """
+    CREATE TABLE IF NOT EXISTS `snapshot_changes` (
+        `id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+        `cycle_timestamp` varchar(255) NOT NULL,
+        `resource_name` varchar(255) NOT NULL,
+        `row_fingerprint` char(32) NOT NULL,
+        `change_type` enum('ADDED','REMOVED') NOT NULL,
+        PRIMARY KEY (`id`),
+        KEY `cycle_resource` (`cycle_timestamp`, `resource_name`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
+"""
+
+INSERT_CHANGE = """
+    INSERT INTO snapshot_changes
+    (cycle_timestamp, resource_name, row_fingerprint, change_type)
+    VALUES (%s, %s, %s, %s);
+"""
@@ -31,6 +31,9 @@ from google.cloud.security.common.util import log_util
 
 LOGGER = log_util.get_logger(__name__)
 
+# Number of violations to insert per statement in the bulk path.
+DEFAULT_INSERT_BATCH_SIZE = 500
+
 
 class ViolationDao(dao.Dao):
     """Data access object (DAO) for rule violations."""
@@ -42,13 +45,20 @@ class ViolationDao(dao.Dao):
     Violation = namedtuple('Violation', frozen_violation_attribute_list)
 
     def insert_violations(self, violations,
-                          snapshot_timestamp=None):
+                          snapshot_timestamp=None, batch_size=1):
         """Import violations into database.
 
+        With a batch_size greater than 1, the violations are inserted with
+        one multi-row INSERT and one commit per batch. If a batch fails, its
+        rows are retried one at a time so only the failing rows are
+        reported as errors.
+
         Args:
             violations (iterator): An iterator of RuleViolations.
             snapshot_timestamp (str): The snapshot timestamp to associate
                 these violations with.
+            batch_size (int): The number of violations to insert per
+                statement.
 
         Returns:
             tuple: A tuple of (int, list) containing the count of inserted
@@ -82,8 +92,38 @@ class ViolationDao(dao.Dao):
         except MySQLdb.Error, e:
             raise db_errors.MySQLError(resource_name, e)
 
+        insert_sql = load_data.INSERT_VIOLATION.format(snapshot_table)
         inserted_rows = 0
         violation_errors = []
+        batch = []
+        for formatted_violation in self._format_violations(violations,
+                                                           resource_name):
+            if batch_size > 1:
+                batch.append(formatted_violation)
+                if len(batch) >= batch_size:
+                    inserted_rows += self._insert_batch(
+                        resource_name, insert_sql, batch, violation_errors)
+                    batch = []
+            else:
+                inserted_rows += self._insert_one(
+                    resource_name, insert_sql, formatted_violation,
+                    violation_errors)
+        if batch:
+            inserted_rows += self._insert_batch(
+                resource_name, insert_sql, batch, violation_errors)
+
+        return (inserted_rows, violation_errors)
+
+    def _format_violations(self, violations, resource_name):
+        """Flatten and format the violations into insertable rows.
+
+        Args:
+            violations (iterator): An iterator of RuleViolations.
+            resource_name (str): String that defines a resource.
+
+        Yields:
+            tuple: A formatted violation.
+        """
         for violation in violations:
             violation = self.Violation(
                 resource_type=violation['resource_type'],
@@ -94,18 +134,53 @@ class ViolationDao(dao.Dao):
                 violation_data=violation['violation_data'])
             for formatted_violation in _format_violation(violation,
                                                          resource_name):
-                try:
-                    self.execute_sql_with_commit(
-                        resource_name,
-                        load_data.INSERT_VIOLATION.format(snapshot_table),
-                        formatted_violation)
-                    inserted_rows += 1
-                except MySQLdb.Error, e:
-                    LOGGER.error('Unable to insert violation %s due to %s',
-                                 formatted_violation, e)
-                    violation_errors.append(formatted_violation)
+                yield formatted_violation
 
-        return (inserted_rows, violation_errors)
+    def _insert_one(self, resource_name, insert_sql, formatted_violation,
+                    violation_errors):
+        """Insert a single violation.
+
+        Args:
+            resource_name (str): String that defines a resource.
+            insert_sql (str): The insert sql statement.
+            formatted_violation (tuple): The formatted violation.
+            violation_errors (list): Failed violations are appended here.
+
+        Returns:
+            int: The number of inserted rows.
+        """
+        try:
+            self.execute_sql_with_commit(
+                resource_name, insert_sql, formatted_violation)
+            return 1
+        except db_errors.MySQLError as e:
+            LOGGER.error('Unable to insert violation %s due to %s',
+                         formatted_violation, e)
+            violation_errors.append(formatted_violation)
+            return 0
+
+    def _insert_batch(self, resource_name, insert_sql, batch,
+                      violation_errors):
+        """Insert a batch of violations with a single statement.
+
+        Args:
+            resource_name (str): String that defines a resource.
+            insert_sql (str): The insert sql statement.
+            batch (list): The formatted violations.
+            violation_errors (list): Failed violations are appended here.
+
+        Returns:
+            int: The number of inserted rows.
+        """
+        try:
+            self.execute_many_with_commit(resource_name, insert_sql, batch)
+            return len(batch)
+        except db_errors.MySQLError as e:
+            LOGGER.warn('Unable to insert batch of %s violations, retrying '
+                        'one at a time: %s', len(batch), e)
+        return sum(self._insert_one(resource_name, insert_sql,
+                                    formatted_violation, violation_errors)
+                   for formatted_violation in batch)
 
     def get_all_violations(self, timestamp, violation_type=None):
         """Get all the violations.
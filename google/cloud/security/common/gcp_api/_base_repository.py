@@ -15,16 +15,21 @@
 """Base GCP client which uses the discovery API."""
 import logging
 import threading
+import time
 import googleapiclient
 from googleapiclient import discovery
+from googleapiclient import errors
 import httplib2
 from oauth2client import client
 from ratelimiter import RateLimiter
 from retrying import retry
 
 from google.cloud import security as forseti_security
+from google.cloud.security.common.gcp_api import _discovery_cache
 from google.cloud.security.common.gcp_api import _supported_apis
+from google.cloud.security.common.gcp_api import api_helpers
 from google.cloud.security.common.gcp_api import errors as api_errors
+from google.cloud.security.common.gcp_api import response_cache
 from google.cloud.security.common.util import log_util
 from google.cloud.security.common.util import retryable_exceptions
 
@@ -41,15 +46,27 @@ LOGGER = log_util.get_logger(__name__)
 # Default value num_retries within HttpRequest execute method
 NUM_HTTP_RETRIES = 5
 
+# Maximum number of requests sent in one batch HTTP request.
+MAX_BATCH_SIZE = 100
+
+# Number of attempts of a batched request that failed with a retryable
+# HTTP error.
+NUM_BATCH_ATTEMPTS = 5
+
 # Support older versions of apiclient without cache support
 SUPPORT_DISCOVERY_CACHE = (googleapiclient.__version__ >= '1.4.2')
 
+# The service objects built in this process, by API name, version, developer
+# key and credentials identity.
+_SERVICE_REGISTRY = {}
+_SERVICE_REGISTRY_LOCK = threading.Lock()
+
 
 @retry(retry_on_exception=retryable_exceptions.is_retryable_exception,
        wait_exponential_multiplier=1000, wait_exponential_max=10000,
        stop_max_attempt_number=5)
 def _create_service_api(credentials, service_name, version, developer_key=None,
-                        cache_discovery=False):
+                        cache_discovery=True):
     """Builds and returns a cloud API service object.
 
     Args:
@@ -60,7 +77,8 @@ def _create_service_api(credentials, service_name, version, developer_key=None,
         developer_key (str): The api key to use to determine the project
             associated with the API call, most API services do not require
             this to be set.
-        cache_discovery (bool): Whether or not to cache the discovery doc.
+        cache_discovery (bool): Whether or not to cache the discovery doc,
+            in memory and on disk, see _discovery_cache.
 
     Returns:
         object: A Resource object with methods for interacting with the service.
@@ -78,9 +96,48 @@ def _create_service_api(credentials, service_name, version, developer_key=None,
         'credentials': credentials}
     if SUPPORT_DISCOVERY_CACHE:
         discovery_kwargs['cache_discovery'] = cache_discovery
+        if cache_discovery:
+            discovery_kwargs['cache'] = _discovery_cache.DISCOVERY_CACHE
     return discovery.build(**discovery_kwargs)
 
 
+def _get_service_api(credentials, service_name, version, developer_key=None,
+                     cache_discovery=True):
+    """Returns a cloud API service object, built once per process.
+
+    The service object is shared by all the clients of the API with the same
+    credentials identity. The clients execute their requests on their own
+    thread local http objects, so sharing the service object is thread safe.
+    Credentials without a known identity get a service object of their own.
+
+    Args:
+        credentials (OAuth2Credentials): Credentials that will be used to
+            authenticate the API calls.
+        service_name (str): The name of the API.
+        version (str): The version of the API to use.
+        developer_key (str): The api key to use to determine the project
+            associated with the API call.
+        cache_discovery (bool): Whether or not to cache the discovery doc.
+
+    Returns:
+        object: A Resource object with methods for interacting with the service.
+    """
+    credentials_id = api_helpers.get_credentials_id(credentials)
+    if credentials_id is None:
+        return _create_service_api(credentials, service_name, version,
+                                   developer_key, cache_discovery)
+
+    key = (service_name, version, developer_key, credentials_id)
+    with _SERVICE_REGISTRY_LOCK:
+        service = _SERVICE_REGISTRY.get(key)
+    if service is None:
+        service = _create_service_api(credentials, service_name, version,
+                                      developer_key, cache_discovery)
+        with _SERVICE_REGISTRY_LOCK:
+            service = _SERVICE_REGISTRY.setdefault(key, service)
+    return service
+
+
 def _set_ua_and_scopes(credentials):
     """Set custom Forseti user agent and add cloud scopes on credential object.
 
@@ -108,6 +165,38 @@ def _set_ua_and_scopes(credentials):
     return credentials
 
 
+def _is_retryable_http_error(error):
+    """Whether a failed request of a batch should be retried.
+
+    Args:
+        error (Exception): The error of the request.
+
+    Returns:
+        bool: True for rate limit and server errors, False otherwise.
+    """
+    return (isinstance(error, errors.HttpError) and
+            (error.resp.status == 429 or error.resp.status >= 500))
+
+
+def _to_api_error(resource_name, error):
+    """Maps the error of a request of a batch to an API error.
+
+    Args:
+        resource_name (str): The resource name.
+        error (HttpError): The error of the request, or None.
+
+    Returns:
+        Error: An ApiNotEnabledError or ApiExecutionError, or None if there
+            was no error.
+    """
+    if error is None:
+        return None
+    api_not_enabled, details = api_helpers.api_not_enabled(error)
+    if api_not_enabled:
+        return api_errors.ApiNotEnabledError(details, error)
+    return api_errors.ApiExecutionError(resource_name, error)
+
+
 class BaseRepositoryClient(object):
     """Base class for API repository for a specified Cloud API."""
 
@@ -131,7 +220,9 @@ class BaseRepositoryClient(object):
             quota_period (float): The time period to track requests over.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
-            **kwargs (dict): Additional args such as version.
+            **kwargs (dict): Additional args such as version, and
+                share_service, False to build service objects that are not
+                shared with the other clients of the process.
         """
         self._use_cached_http = False
         if not credentials:
@@ -170,14 +261,21 @@ class BaseRepositoryClient(object):
                                 'in Forseti, proceed at your own risk.',
                                 api_name, version)
 
+        # A service object that executes its own requests, like the ones of
+        # the enforcer, is not thread safe and must not be shared.
+        if kwargs.get('share_service', True):
+            build_service = _get_service_api
+        else:
+            build_service = _create_service_api
+
         self.gcp_services = {}
         for version in versions:
-            self.gcp_services[version] = _create_service_api(
+            self.gcp_services[version] = build_service(
                 self._credentials,
                 self.name,
                 version,
                 kwargs.get('developer_key'),
-                kwargs.get('cache_discovery', False))
+                kwargs.get('cache_discovery', True))
 
     def __repr__(self):
         """The object representation.
@@ -432,10 +530,131 @@ class GCPRepository(object):
         request = self._build_request(verb, verb_arguments)
         return self._execute(request)
 
+    def execute_batch(self, verb, verb_arguments_list, resource_name,
+                      batch_size=MAX_BATCH_SIZE):
+        """Executes queries (ex. get) in batch HTTP requests.
+
+        The queries are sent in batch HTTP requests of up to batch_size
+        queries, and the results of a batch are yielded before the next
+        batch is sent, so only one batch of responses is held at a time.
+        Only use this for queries that return a single page.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get).
+            verb_arguments_list (list): The key-value pairs to be passed to
+                _build_request, one dict per query.
+            resource_name (str): The resource name, used in the errors.
+            batch_size (int): Maximum number of queries per batch request.
+
+        Yields:
+            tuple: A (response, error) tuple per query, in the same order as
+                verb_arguments_list. The response is None if the query
+                failed, and the error is an ApiNotEnabledError or
+                ApiExecutionError, or None if the query succeeded.
+        """
+        for start in range(0, len(verb_arguments_list), batch_size):
+            results = self._execute_batch_with_retries(
+                verb, verb_arguments_list[start:start + batch_size])
+            for response, error in results:
+                yield response, _to_api_error(resource_name, error)
+
+    def _execute_batch_with_retries(self, verb, verb_arguments_list):
+        """Executes queries in a batch HTTP request, retrying failed queries.
+
+        Queries that fail with a retryable HTTP error (429 or 5xx) are
+        retried in a new batch, without the queries that succeeded or
+        failed for good.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get).
+            verb_arguments_list (list): The key-value pairs to be passed to
+                _build_request, one dict per query.
+
+        Returns:
+            list: A (response, exception) tuple per query, in the same order
+                as verb_arguments_list.
+        """
+        results = [None] * len(verb_arguments_list)
+        pending = range(len(verb_arguments_list))
+        for attempt in range(NUM_BATCH_ATTEMPTS):
+            if attempt:
+                LOGGER.debug('Retrying %s failed batched requests.',
+                             len(pending))
+                time.sleep(min(2 ** attempt, 10))
+            requests = [self._build_request(verb, verb_arguments_list[index])
+                        for index in pending]
+            failed = []
+            for index, (response, error) in zip(
+                    pending, self._execute_batch(requests)):
+                results[index] = (response, error)
+                if error is not None and _is_retryable_http_error(error):
+                    failed.append(index)
+            pending = failed
+            if not pending:
+                break
+        return results
+
     @retry(retry_on_exception=retryable_exceptions.is_retryable_exception,
            wait_exponential_multiplier=1000, wait_exponential_max=10000,
            stop_max_attempt_number=5)
+    def _execute_batch(self, requests):
+        """Run a batch HTTP request with retries and rate limiting.
+
+        Args:
+            requests (list): The HttpRequest objects to execute.
+
+        Returns:
+            list: A (response, exception) tuple per request, in the same
+                order as requests.
+        """
+        results = {}
+
+        def _callback(request_id, response, exception):
+            """Stores the result of a request of the batch.
+
+            Args:
+                request_id (str): The id of the request in the batch.
+                response (dict): The response, or None on error.
+                exception (HttpError): The error, or None on success.
+            """
+            results[request_id] = (response, exception)
+
+        batch = self.gcp_service.new_batch_http_request(callback=_callback)
+        for index, request in enumerate(requests):
+            batch.add(request, request_id=str(index))
+
+        if self._rate_limiter:
+            # Each request of the batch counts against the API quota.
+            for _ in requests:
+                with self._rate_limiter:
+                    pass
+        batch.execute(http=self.http)
+        return [results[str(index)] for index in range(len(requests))]
+
     def _execute(self, request):
+        """Run execute through the response cache, when it is enabled.
+
+        The requests sent with credentials without a known identity, see
+        api_helpers.get_credentials_id(), are not cached, because their
+        responses can't be told apart from the responses of other
+        credentials.
+
+        Args:
+            request (object): The HttpRequest object to execute.
+
+        Returns:
+            dict: The response from the API.
+        """
+        cache = response_cache.RESPONSE_CACHE
+        credentials_id = api_helpers.get_credentials_id(self._credentials)
+        if cache is None or credentials_id is None:
+            return self._execute_request(request)
+        return cache.execute(request, self._execute_request, credentials_id)
+
+    @retry(retry_on_exception=retryable_exceptions.is_retryable_exception,
+           wait_exponential_multiplier=1000, wait_exponential_max=10000,
+           stop_max_attempt_number=5)
+    def _execute_request(self, request):
         """Run execute with retries and rate limiting.
 
         Args:
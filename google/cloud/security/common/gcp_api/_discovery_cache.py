@@ -0,0 +1,171 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A persistent cache of the API discovery documents.
+
+Implements the cache interface of googleapiclient.discovery_cache, so that
+discovery.build() only fetches a discovery document from the network when
+it is not cached on disk, or when the cached copy is older than the TTL.
+
+A tampered discovery document could send the authenticated API requests to
+another host, so the cache directory is private to the user running
+Forseti, and is not used if any other user can write to it.
+"""
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+
+import googleapiclient
+
+from google.cloud import security as forseti_security
+from google.cloud.security.common.util import log_util
+
+LOGGER = log_util.get_logger(__name__)
+
+# Age after which a cached discovery document is fetched again.
+DISCOVERY_CACHE_TTL = 24 * 60 * 60
+
+# The cache is versioned by the Forseti and googleapiclient versions, so that
+# an upgrade doesn't use the documents cached by an older version.
+DISCOVERY_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or
+    os.path.join(os.path.expanduser('~'), '.cache'),
+    'forseti', 'discovery',
+    '{}-{}'.format(forseti_security.__version__, googleapiclient.__version__))
+
+
+class DiscoveryCache(object):
+    """Caches the discovery documents in memory and on disk."""
+
+    def __init__(self, cache_dir=DISCOVERY_CACHE_DIR,
+                 ttl=DISCOVERY_CACHE_TTL):
+        """Initialize.
+
+        Args:
+            cache_dir (str): The directory of the cached documents.
+            ttl (int): Seconds a cached document stays valid.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._cache_dir_is_private = None
+
+    def _check_cache_dir(self, create=False):
+        """Check that the cache directory is private to the current user.
+
+        The result is remembered once the directory exists, so a directory
+        that can't be trusted is reported once and never used.
+
+        Args:
+            create (bool): Whether to create the directory, with mode 0700,
+                if it doesn't exist.
+
+        Returns:
+            bool: True if the directory exists, is owned by the current user,
+                and is not writable by its group or by other users.
+        """
+        if self._cache_dir_is_private is not None:
+            return self._cache_dir_is_private
+        try:
+            if create and not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, 0700)
+            dir_stat = os.stat(self.cache_dir)
+        except OSError:
+            return False
+
+        is_private = (dir_stat.st_uid == os.getuid() and
+                      not dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+        if not is_private:
+            LOGGER.warn('Not using the discovery cache directory %s, it is '
+                        'not private to the current user.', self.cache_dir)
+        self._cache_dir_is_private = is_private
+        return is_private
+
+    def _get_path(self, url):
+        """Get the path of the cached document of a discovery url.
+
+        The discovery url holds the API name and version, e.g.
+        https://www.googleapis.com/discovery/v1/apis/compute/v1/rest
+
+        Args:
+            url (str): The discovery url.
+
+        Returns:
+            str: The path of the cache file.
+        """
+        return os.path.join(self.cache_dir,
+                            re.sub(r'[^\w.-]', '_', url) + '.json')
+
+    def get(self, url):
+        """Get a cached discovery document.
+
+        Args:
+            url (str): The discovery url.
+
+        Returns:
+            str: The discovery document, or None if it is not cached or the
+                cached copy expired.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._documents.get(url)
+        if cached and now - cached[1] < self.ttl:
+            return cached[0]
+
+        if not self._check_cache_dir():
+            return None
+        path = self._get_path(url)
+        try:
+            cached_time = os.path.getmtime(path)
+            if now - cached_time >= self.ttl:
+                return None
+            with open(path, 'r') as cache_file:
+                content = cache_file.read()
+        except (IOError, OSError):
+            return None
+
+        with self._lock:
+            self._documents[url] = (content, cached_time)
+        return content
+
+    def set(self, url, content):
+        """Cache a discovery document.
+
+        Args:
+            url (str): The discovery url.
+            content (str): The discovery document.
+        """
+        with self._lock:
+            self._documents[url] = (content, time.time())
+
+        if not self._check_cache_dir(create=True):
+            return
+        path = self._get_path(url)
+        try:
+            # Write to a temporary file first, so that concurrent processes
+            # never read a partially written document.
+            temp_fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(temp_fd, 'w') as temp_file:
+                temp_file.write(content)
+            os.rename(temp_path, path)
+        except (IOError, OSError) as e:
+            LOGGER.warn('Unable to cache the discovery document of %s: %s',
+                        url, e)
+
+
+DISCOVERY_CACHE = DiscoveryCache()
@@ -13,7 +13,12 @@
 # limitations under the License.
 
 """Helper functions for API clients."""
+import json
+
+from googleapiclient import errors
+from oauth2client import client
 from oauth2client import service_account
+from oauth2client.contrib import gce
 
 from google.cloud.security.common.gcp_api import errors as api_errors
 
@@ -44,6 +49,80 @@ def credential_from_keyfile(keyfile_name, scopes, delegated_account):
     return credentials.create_delegated(delegated_account)
 
 
+def get_credentials_id(credentials):
+    """Get the identity the API requests are authorized as.
+
+    Two credentials objects with the same identity are authorized as the
+    same account, with the same scopes. The identity is only known for
+    service accounts, GCE credentials whose service account email is known,
+    e.g. once they have been refreshed, and credentials holding an id token.
+    The client id alone is shared by all the users of an OAuth client, so
+    it is not an identity.
+
+    Args:
+        credentials (OAuth2Credentials): The credentials.
+
+    Returns:
+        str: The identity of the credentials, or None if it is not known.
+    """
+    if isinstance(credentials, service_account.ServiceAccountCredentials):
+        # pylint: disable=protected-access
+        return 'service_account:{}:{}:{}'.format(
+            credentials._service_account_email,
+            credentials._kwargs.get('sub'),
+            credentials._scopes)
+    if isinstance(credentials, gce.AppAssertionCredentials):
+        email = getattr(credentials, 'service_account_email', None)
+        if email:
+            return 'gce:{}'.format(email)
+        return None
+    if isinstance(credentials, client.OAuth2Credentials):
+        subject = (credentials.id_token or {}).get('sub')
+        if subject:
+            return '{}:{}:{}:{}'.format(
+                credentials.__class__.__name__, credentials.client_id,
+                subject, sorted(credentials.scopes or []))
+    return None
+
+
+def api_not_enabled(error):
+    """Checks if the error is due to the API not being enabled for project.
+
+    Args:
+        error (Exception): The error to check.
+
+    Returns:
+        tuple: (bool, str) True, API not enabled reason if API is not enabled
+            or False, '' if there is a different exception.
+    """
+    if isinstance(error, errors.HttpError):
+        if (error.resp.status == 403 and
+                error.resp.get('content-type', '').startswith(
+                    'application/json')):
+
+            # If a project doesn't have the necessary API enabled, Google
+            # will return an error domain=usageLimits and
+            # reason=accessNotConfigured. Clients may wish to handle this
+            # error in some particular way. For instance, when listing
+            # resources, it might be treated as "no resources of that type
+            # are present", if the API would need to be enabled in order
+            # to create the resources in question!
+            #
+            # So, if we find that specific error, raise a different
+            # exception to indicate it to callers. Otherwise, propagate
+            # the initial exception.
+            error_details = json.loads(error.content.decode('utf-8'))
+            all_errors = error_details.get('error', {}).get('errors', [])
+            api_disabled_errors = [
+                error for error in all_errors
+                if (error.get('domain') == 'usageLimits'
+                    and error.get('reason') == 'accessNotConfigured')]
+            if (api_disabled_errors and
+                    len(api_disabled_errors) == len(all_errors)):
+                return (True, api_disabled_errors[0].get('extendedHelp', ''))
+    return (False, '')
+
+
 def flatten_list_results(paged_results, item_key):
     """Flatten a split-up list as returned by list_next() API.
 
@@ -288,6 +288,33 @@ class CloudResourceManagerClient(object):
         except (errors.HttpError, HttpLib2Error) as e:
             raise api_errors.ApiExecutionError(resource_name, e)
 
+    def get_project_iam_policies_batch(self, resource_name, project_ids):
+        """Get the iam policies of many projects, in batch requests.
+
+        Args:
+            resource_name (str): The resource type.
+            project_ids (list): The project numbers or project ids.
+
+        Yields:
+            tuple: A (policy, error) tuple per project, in the same order as
+                project_ids, one batch request at a time. The error is an
+                ApiExecutionError or ApiNotEnabledError if the policy could
+                not be fetched.
+
+        Raises:
+            ApiExecutionError: If a batch request failed.
+        """
+        try:
+            for result in self.repository.projects.execute_batch(
+                    verb='getIamPolicy',
+                    verb_arguments_list=[
+                        {'resource': project_id, 'fields': None, 'body': {}}
+                        for project_id in project_ids],
+                    resource_name=resource_name):
+                yield result
+        except (errors.HttpError, HttpLib2Error) as e:
+            raise api_errors.ApiExecutionError(resource_name, e)
+
     def get_organization(self, org_name):
         """Get organization by org_name.
 
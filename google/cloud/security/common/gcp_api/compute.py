@@ -13,7 +13,6 @@
 # limitations under the License.
 
 """Wrapper for Compute API client."""
-import json
 import os
 from googleapiclient import errors
 from httplib2 import HttpLib2Error
@@ -27,44 +26,6 @@ from google.cloud.security.common.util import log_util
 LOGGER = log_util.get_logger(__name__)
 
 
-def _api_not_enabled(error):
-    """Checks if the error is due to the API not being enabled for project.
-
-    Args:
-        error (Exception): The error to check.
-
-    Returns:
-        tuple: (bool, str) True, API not enabled reason if API is not enabled
-            or False, '' if there is a different exception.
-    """
-    if isinstance(error, errors.HttpError):
-        if (error.resp.status == 403 and
-                error.resp.get('content-type', '').startswith(
-                    'application/json')):
-
-            # If a project doesn't have the necessary API enabled, Google
-            # will return an error domain=usageLimits and
-            # reason=accessNotConfigured. Clients may wish to handle this
-            # error in some particular way. For instance, when listing
-            # resources, it might be treated as "no resources of that type
-            # are present", if the API would need to be enabled in order
-            # to create the resources in question!
-            #
-            # So, if we find that specific error, raise a different
-            # exception to indicate it to callers. Otherwise, propagate
-            # the initial exception.
-            error_details = json.loads(error.content.decode('utf-8'))
-            all_errors = error_details.get('error', {}).get('errors', [])
-            api_disabled_errors = [
-                error for error in all_errors
-                if (error.get('domain') == 'usageLimits'
-                    and error.get('reason') == 'accessNotConfigured')]
-            if (api_disabled_errors and
-                    len(api_disabled_errors) == len(all_errors)):
-                return (True, api_disabled_errors[0].get('extendedHelp', ''))
-    return (False, '')
-
-
 # pylint: disable=invalid-name
 def _flatten_aggregated_list_results(project_id, paged_results, item_key,
                                      sort_key='name'):
@@ -93,7 +54,7 @@ def _flatten_aggregated_list_results(project_id, paged_results, item_key,
                                                         item_key),
             key=lambda d: d.get(sort_key, ''))
     except (errors.HttpError, HttpLib2Error) as e:
-        api_not_enabled, details = _api_not_enabled(e)
+        api_not_enabled, details = api_helpers.api_not_enabled(e)
         if api_not_enabled:
             raise api_errors.ApiNotEnabledError(details, e)
         raise api_errors.ApiExecutionError(project_id, e)
@@ -121,7 +82,7 @@ def _flatten_list_results(project_id, paged_results, item_key):
     try:
         return api_helpers.flatten_list_results(paged_results, item_key)
     except (errors.HttpError, HttpLib2Error) as e:
-        api_not_enabled, details = _api_not_enabled(e)
+        api_not_enabled, details = api_helpers.api_not_enabled(e)
         if api_not_enabled:
             raise api_errors.ApiNotEnabledError(details, e)
         raise api_errors.ApiExecutionError(project_id, e)
@@ -134,7 +95,8 @@ class ComputeRepositoryClient(_base_repository.BaseRepositoryClient):
     def __init__(self,
                  quota_max_calls=None,
                  quota_period=100.0,
-                 use_rate_limiter=True):
+                 use_rate_limiter=True,
+                 share_service=True):
         """Constructor.
 
         Args:
@@ -143,6 +105,8 @@ class ComputeRepositoryClient(_base_repository.BaseRepositoryClient):
             quota_period (float): The time period to track requests over.
             use_rate_limiter (bool): Set to false to disable the use of a rate
                 limiter for this service.
+            share_service (bool): Set to false to build service objects that
+                are not shared with the other clients of the process.
         """
         if not quota_max_calls:
             use_rate_limiter = False
@@ -165,7 +129,8 @@ class ComputeRepositoryClient(_base_repository.BaseRepositoryClient):
             'compute', versions=['beta', 'v1'],
             quota_max_calls=quota_max_calls,
             quota_period=quota_period,
-            use_rate_limiter=use_rate_limiter)
+            use_rate_limiter=use_rate_limiter,
+            share_service=share_service)
 
     # Turn off docstrings for properties.
     # pylint: disable=missing-return-doc, missing-return-type-doc
@@ -597,7 +562,8 @@ class ComputeClient(object):
         self.repository = ComputeRepositoryClient(
             quota_max_calls=max_calls,
             quota_period=self.DEFAULT_QUOTA_PERIOD,
-            use_rate_limiter=kwargs.get('use_rate_limiter', True))
+            use_rate_limiter=kwargs.get('use_rate_limiter', True),
+            share_service=kwargs.get('share_service', True))
 
         # Default service object, currently used by enforcer.
         # TODO: Clean up enforcer so this isn't required.
@@ -697,7 +663,7 @@ class ComputeClient(object):
             return self.repository.global_operations.get(
                 project_id, operation_id)
         except (errors.HttpError, HttpLib2Error) as e:
-            api_not_enabled, details = _api_not_enabled(e)
+            api_not_enabled, details = api_helpers.api_not_enabled(e)
             if api_not_enabled:
                 raise api_errors.ApiNotEnabledError(details, e)
             raise api_errors.ApiExecutionError(project_id, e)
@@ -841,7 +807,7 @@ class ComputeClient(object):
         try:
             return self.repository.projects.get(project_id)
         except (errors.HttpError, HttpLib2Error) as e:
-            api_not_enabled, details = _api_not_enabled(e)
+            api_not_enabled, details = api_helpers.api_not_enabled(e)
             if api_not_enabled:
                 raise api_errors.ApiNotEnabledError(details, e)
             raise api_errors.ApiExecutionError(project_id, e)
@@ -930,7 +896,7 @@ class ComputeClient(object):
             result = self.repository.projects.get(project_id, fields='name')
             return bool('name' in result)  # True if name, otherwise False.
         except (errors.HttpError, HttpLib2Error) as e:
-            api_not_enabled, _ = _api_not_enabled(e)
+            api_not_enabled, _ = api_helpers.api_not_enabled(e)
             if api_not_enabled:
                 return False
             raise api_errors.ApiExecutionError(project_id, e)
@@ -221,15 +221,69 @@ class IAMClient(object):
             ValueError: Raised if an invalid key_type is specified.
         """
         try:
-            kwargs = {}
-            if key_type:
-                if key_type not in self.KEY_TYPES:
-                    raise ValueError(
-                        'Key type %s is not a valid key type.' % key_type)
-                kwargs['keyTypes'] = key_type
             results = self.repository.projects_serviceaccounts_keys.list(
-                name, **kwargs)
+                name, **self._get_key_type_kwargs(key_type))
             return api_helpers.flatten_list_results(results, 'keys')
         except (errors.HttpError, HttpLib2Error) as e:
             LOGGER.warn(api_errors.ApiExecutionError(name, e))
             raise api_errors.ApiExecutionError('serviceAccountKeys', e)
+
+    def get_service_account_keys_batch(self, names, key_type=None):
+        """Get the keys of many Service Accounts, in batch requests.
+
+        Args:
+            names (list): The service account names to query, each in the
+                format
+                projects/{PROJECT_ID}/serviceAccounts/{SERVICE_ACCOUNT_EMAIL}
+            key_type (str): Optional, the key type to include in the results.
+                Can be None, USER_MANAGED or SYSTEM_MANAGED. Defaults to
+                returning all key types.
+
+        Yields:
+            tuple: A (keys, error) tuple per service account, in the same
+                order as names, one batch request at a time. The keys are a
+                list with a dict for each key, and the error is an
+                ApiExecutionError if the keys could not be fetched.
+
+        Raises:
+            ApiExecutionError: If a batch request failed.
+        """
+        kwargs = self._get_key_type_kwargs(key_type)
+        verb_arguments_list = []
+        for name in names:
+            verb_arguments = {'name': name, 'fields': None}
+            verb_arguments.update(kwargs)
+            verb_arguments_list.append(verb_arguments)
+
+        try:
+            for response, error in (
+                    self.repository.projects_serviceaccounts_keys.execute_batch(
+                        verb='list',
+                        verb_arguments_list=verb_arguments_list,
+                        resource_name='serviceAccountKeys')):
+                if error:
+                    yield None, error
+                else:
+                    yield (api_helpers.flatten_list_results([response], 'keys'),
+                           None)
+        except (errors.HttpError, HttpLib2Error) as e:
+            raise api_errors.ApiExecutionError('serviceAccountKeys', e)
+
+    def _get_key_type_kwargs(self, key_type):
+        """Get the query arguments that filter keys by type.
+
+        Args:
+            key_type (str): The key type to include in the results, or None.
+
+        Returns:
+            dict: The arguments to pass to the keys list query.
+
+        Raises:
+            ValueError: Raised if an invalid key_type is specified.
+        """
+        if not key_type:
+            return {}
+        if key_type not in self.KEY_TYPES:
+            raise ValueError(
+                'Key type %s is not a valid key type.' % key_type)
+        return {'keyTypes': key_type}
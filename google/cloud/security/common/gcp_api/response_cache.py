@@ -0,0 +1,284 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A persistent cache of the API responses, revalidated with their etags.
+
+The responses of GET requests are stored in a sqlite database, keyed by the
+request URI and the identity of the credentials it was sent with. When a
+request is sent again, e.g. by the next inventory cycle, the cached response
+is returned as is if it is younger than the max age. Otherwise the request
+is sent with an If-None-Match header holding the etag of the cached
+response, and the cached response is returned if the API answers 304 Not
+Modified.
+
+Paged responses are not cached, because their page tokens can expire.
+
+The responses hold IAM policies and group memberships, so the database is
+only readable by the user running Forseti, and a database owned by another
+user is not used.
+"""
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from googleapiclient import errors
+
+from google.cloud.security.common.util import log_util
+
+LOGGER = log_util.get_logger(__name__)
+
+# The outcomes of a cached request.
+HIT = 'hit'
+REVALIDATED = 'revalidated'
+MISS = 'miss'
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS responses (
+        request_key TEXT PRIMARY KEY,
+        etag TEXT,
+        response TEXT NOT NULL,
+        stored_time REAL NOT NULL
+    );
+"""
+
+SELECT_RESPONSE = """
+    SELECT etag, response, stored_time FROM responses WHERE request_key = ?;
+"""
+
+INSERT_RESPONSE = """
+    INSERT OR REPLACE INTO responses (request_key, etag, response, stored_time)
+    VALUES (?, ?, ?, ?);
+"""
+
+UPDATE_STORED_TIME = """
+    UPDATE responses SET stored_time = ? WHERE request_key = ?;
+"""
+
+# The cache used by the API clients, None when caching is disabled.
+RESPONSE_CACHE = None
+
+
+class ResponseCache(object):
+    """Caches the API responses in a sqlite database."""
+
+    def __init__(self, path, max_age=0):
+        """Initialize.
+
+        Args:
+            path (str): The path of the sqlite database.
+            max_age (int): Seconds a cached response is returned without
+                revalidating it with the API.
+
+        Raises:
+            OSError: When the database can't be created, or is owned by
+                another user.
+        """
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stats = collections.defaultdict(collections.Counter)
+        _create_private_file(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # The cache can always be rebuilt, so don't wait for the disk.
+        self._conn.execute('PRAGMA synchronous = OFF;')
+        self._conn.execute(CREATE_TABLE)
+        self._conn.commit()
+
+    @staticmethod
+    def _get_key(request, credentials_id):
+        """Get the cache key of a request.
+
+        Args:
+            request (HttpRequest): The request.
+            credentials_id (str): The identity of the credentials the
+                request is sent with.
+
+        Returns:
+            str: The hex sha1 digest of the credentials identity, and of the
+                request method, URI and body.
+        """
+        return hashlib.sha1('{} {} {} {}'.format(
+            credentials_id, request.method, request.uri,
+            request.body or '')).hexdigest()
+
+    def _get(self, key):
+        """Get a cached response.
+
+        Args:
+            key (str): The cache key of the request.
+
+        Returns:
+            tuple: The etag, the response and the time it was stored, or
+                None if the request is not cached.
+        """
+        with self._lock:
+            row = self._conn.execute(SELECT_RESPONSE, (key,)).fetchone()
+        if not row:
+            return None
+        etag, response, stored_time = row
+        return etag, json.loads(response), stored_time
+
+    def _set(self, key, response):
+        """Cache a response.
+
+        Args:
+            key (str): The cache key of the request.
+            response (dict): The response.
+        """
+        etag = response.get('etag') if isinstance(response, dict) else None
+        with self._lock:
+            self._conn.execute(INSERT_RESPONSE, (
+                key, etag, json.dumps(response), time.time()))
+            self._conn.commit()
+
+    def _touch(self, key):
+        """Mark a cached response as fresh.
+
+        Args:
+            key (str): The cache key of the request.
+        """
+        with self._lock:
+            self._conn.execute(UPDATE_STORED_TIME, (time.time(), key))
+            self._conn.commit()
+
+    def _record(self, request, outcome):
+        """Count the outcome of a request in the statistics of its API.
+
+        Args:
+            request (HttpRequest): The request.
+            outcome (str): HIT, REVALIDATED or MISS.
+        """
+        api_name = (request.methodId or '').split('.')[0]
+        with self._lock:
+            self._stats[api_name][outcome] += 1
+
+    def get_stats(self):
+        """Get the outcomes of the cached requests of each API.
+
+        Returns:
+            dict: The number of hits, revalidated hits and misses, keyed by
+                API name.
+        """
+        with self._lock:
+            return {api_name: dict(counter)
+                    for api_name, counter in self._stats.iteritems()}
+
+    def execute(self, request, execute_request, credentials_id):
+        """Execute a request through the cache.
+
+        Args:
+            request (HttpRequest): The request, only GET requests of a single
+                page are cached.
+            execute_request (function): Sends the request and returns the
+                response.
+            credentials_id (str): The identity of the credentials the
+                request is sent with, see api_helpers.get_credentials_id().
+
+        Returns:
+            dict: The response from the API or from the cache.
+
+        Raises:
+            HttpError: When the request failed, other than with a 304 Not
+                Modified answer to a revalidation.
+        """
+        if request.method != 'GET' or 'pageToken=' in request.uri:
+            return execute_request(request)
+
+        key = self._get_key(request, credentials_id)
+        cached = self._get(key)
+        if cached:
+            etag, cached_response, stored_time = cached
+            if time.time() - stored_time < self.max_age:
+                self._record(request, HIT)
+                return cached_response
+            if etag:
+                request.headers['If-None-Match'] = etag
+
+        try:
+            response = execute_request(request)
+        except errors.HttpError as e:
+            if cached and e.resp.status == 304:
+                self._touch(key)
+                self._record(request, REVALIDATED)
+                return cached_response
+            raise
+        finally:
+            request.headers.pop('If-None-Match', None)
+
+        if not (isinstance(response, dict) and
+                response.get('nextPageToken')):
+            self._set(key, response)
+        self._record(request, MISS)
+        return response
+
+    def log_stats(self):
+        """Log the statistics of each API."""
+        for api_name, stats in sorted(self.get_stats().iteritems()):
+            LOGGER.info('API response cache for %s: %s hits, %s revalidated, '
+                        '%s misses.', api_name, stats.get(HIT, 0),
+                        stats.get(REVALIDATED, 0), stats.get(MISS, 0))
+
+
+def _create_private_file(path):
+    """Create a file only the current user can read, if it doesn't exist.
+
+    Args:
+        path (str): The path of the file. Its directory is created with mode
+            0700 if needed.
+
+    Raises:
+        OSError: When the file can't be created, or is owned by another user.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, 0700)
+    file_descriptor = os.open(
+        path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0600)
+    try:
+        if os.fstat(file_descriptor).st_uid != os.getuid():
+            raise OSError('{} is owned by another user'.format(path))
+        os.fchmod(file_descriptor, 0600)
+    finally:
+        os.close(file_descriptor)
+
+
+def configure(global_configs):
+    """Enable the response cache of all the API clients, if configured.
+
+    Args:
+        global_configs (dict): Global configurations, the cache is enabled
+            by api_response_cache_file, and api_response_cache_max_age is the
+            seconds a response is used without revalidating it. A leading ~
+            in the file path is expanded to the home directory.
+
+    Returns:
+        ResponseCache: The response cache, or None if it is disabled.
+    """
+    global RESPONSE_CACHE  # pylint: disable=global-statement
+    path = global_configs.get('api_response_cache_file')
+    if not path:
+        RESPONSE_CACHE = None
+        return None
+    path = os.path.expanduser(path)
+    try:
+        RESPONSE_CACHE = ResponseCache(
+            path, global_configs.get('api_response_cache_max_age', 0))
+    except (OSError, sqlite3.Error) as e:
+        LOGGER.warn('Unable to open the API response cache %s: %s', path, e)
+        RESPONSE_CACHE = None
+    return RESPONSE_CACHE
@@ -27,7 +27,8 @@ LOGGER = log_util.get_logger(__name__)
 
 # pylint: disable=too-many-instance-attributes
 
-ALL_REPRESENTATIONS = ('all', '0-65355', '1-65535')
+MIN_PORT = 0
+MAX_PORT = 65535
 ALLOWED_RULE_ITEMS = frozenset(('allowed', 'denied', 'description', 'direction',
                                 'name', 'network', 'priority', 'sourceRanges',
                                 'destinationRanges', 'sourceTags',
@@ -47,6 +48,154 @@ class InvalidFirewallActionError(Error):
     """Raised if a firewall action doesn't look like a firewall rule should."""
 
 
+class IntervalSet(object):
+    """An immutable set of integers, stored as sorted disjoint ranges.
+
+    Used for the ports and the ip addresses of firewall rules, so that a rule
+    allowing a wide port or ip range is a single (start, end) pair, and the
+    comparisons between rules are linear in the number of ranges.
+    """
+
+    __slots__ = ('ranges',)
+
+    def __init__(self, ranges=()):
+        """Initialize.
+
+        Args:
+          ranges (iterable): Inclusive (start, end) integer pairs, which can
+            be unsorted, overlapping or adjacent.
+        """
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        self.ranges = tuple(merged)
+
+    def __repr__(self):
+        """String representation.
+
+        Returns:
+          str: A string representation of IntervalSet.
+        """
+        return 'IntervalSet(%s)' % list(self.ranges)
+
+    def __nonzero__(self):
+        """Whether the set is not empty.
+
+        Returns:
+          bool: Whether the set contains any integer.
+        """
+        return bool(self.ranges)
+
+    def __eq__(self, other):
+        """Equals.
+
+        Args:
+          other (IntervalSet): The IntervalSet to compare to.
+
+        Returns:
+          bool: Whether both sets contain the same integers.
+        """
+        return isinstance(other, IntervalSet) and self.ranges == other.ranges
+
+    def __ne__(self, other):
+        """Not equals.
+
+        Args:
+          other (IntervalSet): The IntervalSet to compare to.
+
+        Returns:
+          bool: Whether the sets contain different integers.
+        """
+        return not self == other
+
+    def __hash__(self):
+        """Hash.
+
+        Returns:
+          int: The hash of the ranges.
+        """
+        return hash(self.ranges)
+
+    def covers(self, start, end):
+        """Returns whether all integers from start to end are in the set.
+
+        Args:
+          start (int): The start of the range.
+          end (int): The inclusive end of the range.
+
+        Returns:
+          bool: Whether the range is in the set.
+        """
+        for range_start, range_end in self.ranges:
+            if range_end >= end:
+                return range_start <= start
+        return False
+
+    def issubset(self, other):
+        """Returns whether this set is a subset of another set.
+
+        Args:
+          other (IntervalSet): The IntervalSet to compare to.
+
+        Returns:
+          bool: Whether all integers of this set are in the other set.
+        """
+        other_ranges = other.ranges
+        i = 0
+        for start, end in self.ranges:
+            # The ranges are merged, so a range is a subset only if it is
+            # contained in a single range of the other set.
+            while i < len(other_ranges) and other_ranges[i][1] < start:
+                i += 1
+            if (i == len(other_ranges) or other_ranges[i][0] > start or
+                    other_ranges[i][1] < end):
+                return False
+        return True
+
+    def overlaps(self, other):
+        """Returns whether this set and another set have common integers.
+
+        Args:
+          other (IntervalSet): The IntervalSet to compare to.
+
+        Returns:
+          bool: Whether the intersection of the sets is not empty.
+        """
+        ranges, other_ranges = self.ranges, other.ranges
+        i = j = 0
+        while i < len(ranges) and j < len(other_ranges):
+            if ranges[i][1] < other_ranges[j][0]:
+                i += 1
+            elif other_ranges[j][1] < ranges[i][0]:
+                j += 1
+            else:
+                return True
+        return False
+
+    def union(self, other):
+        """Returns the union of this set and another set.
+
+        Args:
+          other (IntervalSet): The IntervalSet to merge with.
+
+        Returns:
+          IntervalSet: The integers in either set.
+        """
+        return IntervalSet(self.ranges + other.ranges)
+
+
+EMPTY_SET = IntervalSet()
+ALL_PORTS = IntervalSet([(MIN_PORT, MAX_PORT)])
+
+# IPv6 addresses are offset past the IPv4 address space, so that both fit in
+# one IntervalSet without an IPv4 range containing an IPv6 range.
+IPV6_OFFSET = 1 << 32
+
+
 class FirewallRule(object):
     """Represents Firewall resource."""
 
@@ -97,6 +246,8 @@ class FirewallRule(object):
         if self.allowed is None and self.denied is None:
             raise InvalidFirewallRuleError('Must have allowed or denied rules')
         self._firewall_action = None
+        self._source_ip_set = None
+        self._destination_ip_set = None
         if validate:
             self.validate()
 
@@ -446,6 +597,28 @@ class FirewallRule(object):
         """
         return sorted(self._target_service_accounts)
 
+    @property
+    def source_ip_set(self):
+        """The source ranges for this policy as an interval set.
+
+        Returns:
+          IntervalSet: The addresses in the source ranges.
+        """
+        if self._source_ip_set is None:
+            self._source_ip_set = ip_set(self._source_ranges)
+        return self._source_ip_set
+
+    @property
+    def destination_ip_set(self):
+        """The destination ranges for this policy as an interval set.
+
+        Returns:
+          IntervalSet: The addresses in the destination ranges.
+        """
+        if self._destination_ip_set is None:
+            self._destination_ip_set = ip_set(self._destination_ranges)
+        return self._destination_ip_set
+
     @property
     def priority(self):
         """The effective priority of the firewall rule.
@@ -484,6 +657,7 @@ class FirewallRule(object):
                     firewall_rule_action='denied')
         return self._firewall_action
 
+    # pylint: disable=protected-access
     def __lt__(self, other):
         """Test whether this policy is contained in another policy.
 
@@ -501,11 +675,12 @@ class FirewallRule(object):
                  self.direction is None or
                  other.direction is None) and
                 (self.network == other.network or other.network is None) and
-                set(self.source_tags).issubset(other.source_tags) and
-                set(self.target_tags).issubset(other.target_tags) and
+                self._source_tags.issubset(other._source_tags) and
+                self._target_tags.issubset(other._target_tags) and
                 self.firewall_action < other.firewall_action and
-                ips_in_list(self.source_ranges, other.source_ranges) and
-                ips_in_list(self.destination_ranges, other.destination_ranges))
+                ip_set_in_set(self.source_ip_set, other.source_ip_set) and
+                ip_set_in_set(self.destination_ip_set,
+                              other.destination_ip_set))
 
     def __gt__(self, other):
         """Test whether this policy contains the other policy.
@@ -525,11 +700,13 @@ class FirewallRule(object):
                  self.direction == other.direction) and
                 (self.network is None or other.network is None or
                  self.network == other.network) and
-                set(other.source_tags).issubset(self.source_tags) and
-                set(other.target_tags).issubset(self.target_tags) and
+                other._source_tags.issubset(self._source_tags) and
+                other._target_tags.issubset(self._target_tags) and
                 self.firewall_action > other.firewall_action and
-                ips_in_list(other.source_ranges, self.source_ranges) and
-                ips_in_list(other.destination_ranges, self.destination_ranges))
+                ip_set_in_set(other.source_ip_set, self.source_ip_set) and
+                ip_set_in_set(other.destination_ip_set,
+                              self.destination_ip_set))
+    # pylint: enable=protected-access
 
     # pylint: disable=protected-access
     def __eq__(self, other):
@@ -565,8 +742,8 @@ class FirewallRule(object):
                 self.network == other.network and
                 self._source_tags == other._source_tags and
                 self._target_tags == other._target_tags and
-                self.source_ranges == other.source_ranges and
-                self.destination_ranges == other.destination_ranges and
+                self.source_ip_set == other.source_ip_set and
+                self.destination_ip_set == other.destination_ip_set and
                 self.firewall_action.is_equivalent(other.firewall_action))
     # pylint: enable=protected-access
 
@@ -679,54 +856,23 @@ class FirewallAction(object):
 
     @property
     def expanded_rules(self):
-        """Returns an expanded set of ports.
+        """Returns the ports of each protocol as interval sets.
 
         Returns:
-          dict: A dict of protocol to all port numbers.
+          dict: A dict of protocol to an IntervalSet of port numbers.
         """
         if self._expanded_rules is None:
             self._expanded_rules = {}
             if not self.any_value:
                 for rule in self.rules:
                     protocol = rule.get('IPProtocol')
-                    ports = rule.get('ports', ['all'])
-                    expanded_ports = set(expand_ports(ports))
-                    current_ports = self._expanded_rules.get(protocol, set([]))
-                    current_ports.update(expanded_ports)
-                    self._expanded_rules[protocol] = current_ports
+                    ports = port_set(rule.get('ports'))
+                    current_ports = self._expanded_rules.get(protocol)
+                    if current_ports is not None:
+                        ports = current_ports.union(ports)
+                    self._expanded_rules[protocol] = ports
         return self._expanded_rules
 
-    @staticmethod
-    def ports_are_subset(ports_1, ports_2):
-        """Returns whether one port list is a subset of another.
-
-        Args:
-          ports_1 (list): A list of string port numbers.
-          ports_2 (list): A list of string port numbers.
-
-        Returns:
-          bool: Whether ports_1 are a subset of ports_2 or not.
-        """
-        if any([a in ports_2 for a in ALL_REPRESENTATIONS]):
-            return True
-        return set(ports_1).issubset(ports_2)
-
-    @staticmethod
-    def ports_are_equal(ports_1, ports_2):
-        """Returns whether two port lists are the same.
-
-        Args:
-          ports_1 (list): A list of string port numbers.
-          ports_2 (list): A list of string port numbers.
-
-        Returns:
-          bool: Whether ports_1 have the same ports as ports_2.
-        """
-        if (any([a in ports_1 for a in ALL_REPRESENTATIONS]) and
-                any([a in ports_2 for a in ALL_REPRESENTATIONS])):
-            return True
-        return set(ports_1) == set(ports_2)
-
     def is_equivalent(self, other):
         """Returns whether this action and another are functionally equivalent.
 
@@ -738,13 +884,7 @@ class FirewallAction(object):
         """
         return (self.action == other.action and
                 (self.any_value or other.any_value or
-                 self.expanded_rules.keys() == other.expanded_rules.keys() and
-                 all([
-                     self.ports_are_equal(
-                         self.expanded_rules.get(protocol, []),
-                         other.expanded_rules.get(protocol, []))
-                     for protocol in self.expanded_rules
-                 ])))
+                 self.expanded_rules == other.expanded_rules))
 
     def __lt__(self, other):
         """Less than.
@@ -760,11 +900,9 @@ class FirewallAction(object):
                  other.any_value or
                  other.applies_to_all or not
                  other.expanded_rules or
-                 all([
-                     self.ports_are_subset(
-                         self.expanded_rules.get(protocol, []),
-                         other.expanded_rules.get(protocol, []))
-                     for protocol in self.expanded_rules])))
+                 all(ports.issubset(
+                     other.expanded_rules.get(protocol, EMPTY_SET))
+                     for protocol, ports in self.expanded_rules.iteritems())))
 
     def __gt__(self, other):
         """Greater than.
@@ -780,11 +918,9 @@ class FirewallAction(object):
                  other.any_value or
                  self.applies_to_all or not
                  self.expanded_rules or
-                 all([
-                     self.ports_are_subset(
-                         other.expanded_rules.get(protocol, []),
-                         self.expanded_rules.get(protocol, []))
-                     for protocol in other.expanded_rules])))
+                 all(ports.issubset(
+                     self.expanded_rules.get(protocol, EMPTY_SET))
+                     for protocol, ports in other.expanded_rules.iteritems())))
 
     def __eq__(self, other):
         """Equals.
@@ -823,6 +959,45 @@ def sort_rules(rules):
     return sorted_rules
 
 
+def ip_interval(ip_addr):
+    """Returns the integer range of an ip address or CIDR range.
+
+    Args:
+      ip_addr (str): An ip address or CIDR range.
+
+    Returns:
+      tuple: The first and last address of the range, as integers.
+    """
+    ip_network = netaddr.IPNetwork(ip_addr)
+    if ip_network.version == 6:
+        return ip_network.first + IPV6_OFFSET, ip_network.last + IPV6_OFFSET
+    return ip_network.first, ip_network.last
+
+def ip_set(ips):
+    """Returns the ip addresses and ranges as an interval set.
+
+    Args:
+      ips (iterable): String ip addresses or CIDR ranges.
+
+    Returns:
+      IntervalSet: All the addresses in the ips.
+    """
+    return IntervalSet(ip_interval(ip_addr) for ip_addr in ips)
+
+def ip_set_in_set(ips, ips_range):
+    """Checks whether an ip set is in another ip set.
+
+    An empty set matches any ip address, so either set being empty is True.
+
+    Args:
+      ips (IntervalSet): The ip addresses to check.
+      ips_range (IntervalSet): The ip addresses to check against.
+
+    Returns:
+      bool: Whether the ips are all in ips_range.
+    """
+    return not ips or not ips_range or ips.issubset(ips_range)
+
 def ips_in_list(ips, ips_list):
     """Checks whether the ips and ranges are all in a list.
 
@@ -840,14 +1015,7 @@ def ips_in_list(ips, ips_list):
     Returns:
       bool: Whether the ips are all in the given ips_list.
     """
-    if not ips or not ips_list:
-        return True
-    for ip_addr in ips:
-        if not ips_list:
-            return False
-        if not any([ip_in_range(ip_addr, ips) for ips in ips_list]):
-            return False
-    return True
+    return ip_set_in_set(ip_set(ips), ip_set(ips_list))
 
 def ip_in_range(ip_addr, ip_range):
     """Checks whether the ip/ip range is in another ip range.
@@ -858,53 +1026,41 @@ def ip_in_range(ip_addr, ip_range):
       ip_in_range(0.0.0.0/0, 1.1.1.1) = False
 
     Args:
-      ip_addr (string): A list of string IP addresses.
-      ip_range (string): A list of string IP addresses.
+      ip_addr (string): An ip address or CIDR range.
+      ip_range (string): An ip address or CIDR range.
 
     Returns:
       bool: Whether the ip / ip range is in another ip range.
     """
-    ip_network = netaddr.IPNetwork(ip_addr)
-    ip_range_network = netaddr.IPNetwork(ip_range)
-    return ip_network in ip_range_network
-
-def expand_port_range(port_range):
-    """Expands a port range.
-
-    From https://cloud.google.com/compute/docs/reference/beta/firewalls, ports
-    can be of the form "<number>-<number>".
-
-    Args:
-      port_range (string): A string of format "<number_1>-<number_2>".
-
-    Returns:
-      list: A list of string integers from number_1 to number_2.
-    """
-    start, end = port_range.split('-')
-    return [str(i) for i in xrange(int(start), int(end) + 1)]
+    return IntervalSet([ip_interval(ip_range)]).covers(*ip_interval(ip_addr))
 
-def expand_ports(ports):
-    """Expands all ports in a list.
+def port_set(ports):
+    """Returns the ports of a firewall rule as an interval set.
 
     From https://cloud.google.com/compute/docs/reference/beta/firewalls, ports
-    can be of the form "<number" or "<number>-<number>".
+    can be of the form "<number" or "<number>-<number>". No ports, or "all",
+    means all the ports, and so does a set covering ports 1 to 65535.
 
     Args:
       ports (list): A list of strings of format "<number>" or
-        "<number_1>-<number_2>".
+        "<number_1>-<number_2>", or "all".
 
     Returns:
-      list: A list of all port number strings with the ranges expanded.
+      IntervalSet: All the port numbers.
     """
-    expanded_ports = []
-    if not ports:
-        return []
+    if not ports or ports == 'all' or 'all' in ports:
+        return ALL_PORTS
+    port_ranges = []
     for port_str in ports:
         if '-' in port_str:
-            expanded_ports.extend(expand_port_range(port_str))
+            start, end = port_str.split('-')
+            port_ranges.append((int(start), int(end)))
         else:
-            expanded_ports.append(port_str)
-    return expanded_ports
+            port_ranges.append((int(port_str), int(port_str)))
+    ports = IntervalSet(port_ranges)
+    if ports.covers(MIN_PORT + 1, MAX_PORT):
+        return ALL_PORTS
+    return ports
 
 
 def validate_port(port):
@@ -80,7 +80,7 @@ class BatchFirewallEnforcer(object):
         """
         if not hasattr(self._local, 'compute_client'):
             self._local.compute_client = compute.ComputeClient(
-                self.global_configs)
+                self.global_configs, share_service=False)
 
         return self._local.compute_client
 
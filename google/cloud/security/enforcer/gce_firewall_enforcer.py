@@ -61,6 +61,12 @@ ALLOWED_RULE_ITEMS = frozenset(('allowed', 'denied', 'description', 'direction',
 # Maximum time to allow an active API operation to wait for status=Done
 OPERATION_TIMEOUT = 600.0
 
+# The first interval in seconds between polls of a running operation, the
+# interval grows by OPERATION_POLL_BACKOFF up to OPERATION_POLL_MAX_INTERVAL.
+OPERATION_POLL_INTERVAL = 1.0
+OPERATION_POLL_BACKOFF = 1.5
+OPERATION_POLL_MAX_INTERVAL = 10.0
+
 
 class Error(Exception):
     """Base error class for the module."""
@@ -148,6 +154,27 @@ def build_network_url(project, network):
             }
 
 
+class _OperationPoll(object):
+    """The polling state of a running operation."""
+
+    def __init__(self, start_time):
+        """Constructor.
+
+        Args:
+          start_time: The time the operation was first waited on, in seconds
+              since the epoch.
+        """
+        self.start_time = start_time
+        self.next_poll_time = start_time
+        self.interval = OPERATION_POLL_INTERVAL
+
+    def backoff(self):
+        """Schedule the next poll, backing off exponentially."""
+        self.next_poll_time = time.time() + self.interval
+        self.interval = min(self.interval * OPERATION_POLL_BACKOFF,
+                            OPERATION_POLL_MAX_INTERVAL)
+
+
 class ComputeFirewallAPI(object):
     """Wrap calls to the Google Compute Engine API.
 
@@ -168,6 +195,8 @@ class ComputeFirewallAPI(object):
         """
         self.gce_service = gce_service
         self._dry_run = dry_run
+        # The polling state of the running operations, keyed by name.
+        self._operation_polls = {}
 
     # pylint: disable=no-self-use
 
@@ -292,65 +321,142 @@ class ComputeFirewallAPI(object):
             body=rule, firewall=rule['name'], project=project)
         return self._execute(request)
 
+    @retry(
+        retry_on_exception=http_retry,
+        wait_exponential_multiplier=1000,
+        stop_max_attempt_number=4)
+    def _execute_batch(self, requests):
+        """Execute the requests in a single batch request and retry logic.
+
+        Args:
+          requests: A dict of requests, keyed by request id.
+
+        Returns:
+          A dict of responses, keyed by request id.
+
+        Raises:
+          HttpError: If any of the requests in the batch failed.
+        """
+        responses = {}
+        request_errors = []
+
+        def _callback(request_id, response, exception):
+            """Store the result of a request of the batch."""
+            if exception is not None:
+                request_errors.append(exception)
+            else:
+                responses[request_id] = response
+
+        batch = self.gce_service.new_batch_http_request(callback=_callback)
+        for request_id, request in requests.iteritems():
+            batch.add(request, request_id=request_id)
+        batch.execute()
+
+        if request_errors:
+            raise request_errors[0]
+        return responses
+
+    def _get_operations(self, project, operation_names):
+        """Fetch the current state of operations.
+
+        The state of several operations is fetched in a single batch request.
+
+        Args:
+          project: The id of the project the operations belong to.
+          operation_names: A list of the names of the operations.
+
+        Returns:
+          A dict of GlobalOperations responses, keyed by operation name.
+        """
+        requests = dict(
+            (name, self.gce_service.globalOperations().get(
+                project=project, operation=name))
+            for name in operation_names)
+        if len(requests) == 1:
+            name, request = requests.popitem()
+            return {name: self._execute(request)}
+        return self._execute_batch(requests)
+
     # TODO: Investigate improving so we can avoid the pylint disable.
-    # pylint: disable=too-many-locals
+    # pylint: disable=too-many-locals,too-many-branches
     def wait_for_any_to_complete(self, project, responses, timeout=0):
         """Wait for one or more requests to complete.
 
+        Each running operation is polled with its own exponential backoff,
+        and all the operations due for a poll are checked in one batch
+        request.
+
         Args:
           project: The id of the project to query.
           responses: A list of Response objects from GCE for the operation.
           timeout: An optional maximum time in seconds to wait for an operation
-              to complete. Operations that exceed the timeout are marked as
+              to complete, measured from the first time the operation was
+              waited on. Operations that exceed the timeout are marked as
               Failed.
 
         Returns:
           A tuple of (completed, still_running) requests.
         """
-        started_timestamp = time.time()
-
         while True:
             completed_operations = []
             running_operations = []
+            due_operations = []
+            now = time.time()
             for response in responses:
-                status = response['status']
-                if status == 'DONE':
-                    completed_operations.append(response)
-                    continue
-
-                operation_name = response['name']
-                LOGGER.debug('Checking on operation %s', operation_name)
-                request = self.gce_service.globalOperations().get(
-                    project=project, operation=operation_name)
-                response = self._execute(request)
-                status = response['status']
-                LOGGER.info('status of %s is %s', operation_name, status)
                 if response['status'] == 'DONE':
+                    self._operation_polls.pop(response.get('name'), None)
                     completed_operations.append(response)
                     continue
 
-                if timeout and time.time() - started_timestamp > timeout:
-                    # Add a timeout error to the response
-                    LOGGER.error(
-                        'Operation %s did not complete before timeout of %f, '
-                        'marking operation as failed.', operation_name, timeout)
-                    response.setdefault('error', {}).setdefault(
-                        'errors', []).append({
-                            'code':
-                                'OPERATION_TIMEOUT',
-                            'message': (
-                                'Operation exceeded timeout for completion '
-                                'of %0.2f seconds' % timeout)
-                        })
-                    completed_operations.append(response)
+                poll = self._operation_polls.setdefault(
+                    response['name'], _OperationPoll(now))
+                if poll.next_poll_time <= now:
+                    due_operations.append(response['name'])
                 else:
-                    # Operation still running
                     running_operations.append(response)
 
-            if completed_operations or not responses:
+            if due_operations:
+                LOGGER.debug('Checking on operations %s', due_operations)
+                current_responses = self._get_operations(project,
+                                                         due_operations)
+                for operation_name in due_operations:
+                    response = current_responses[operation_name]
+                    poll = self._operation_polls[operation_name]
+                    LOGGER.info('status of %s is %s', operation_name,
+                                response['status'])
+                    if response['status'] == 'DONE':
+                        del self._operation_polls[operation_name]
+                        completed_operations.append(response)
+                    elif timeout and time.time() - poll.start_time > timeout:
+                        # Add a timeout error to the response
+                        LOGGER.error(
+                            'Operation %s did not complete before timeout of '
+                            '%f, marking operation as failed.',
+                            operation_name, timeout)
+                        response.setdefault('error', {}).setdefault(
+                            'errors', []).append({
+                                'code':
+                                    'OPERATION_TIMEOUT',
+                                'message': (
+                                    'Operation exceeded timeout for '
+                                    'completion of %0.2f seconds' % timeout)
+                            })
+                        del self._operation_polls[operation_name]
+                        completed_operations.append(response)
+                    else:
+                        # Operation still running
+                        poll.backoff()
+                        running_operations.append(response)
+
+            if completed_operations or not running_operations:
                 break
-            else:
-                time.sleep(2)
+
+            # Sleep until the next operation is due for a poll.
+            next_poll_time = min(
+                self._operation_polls[response['name']].next_poll_time
+                for response in running_operations)
+            time.sleep(max(0, next_poll_time - time.time()))
+            responses = running_operations
 
         for response in completed_operations:
             try:
@@ -71,7 +71,8 @@ class ProjectEnforcer(object):
         self.project_id = project_id
 
         if not compute_service:
-            gce_api = compute.ComputeClient(global_configs)
+            gce_api = compute.ComputeClient(global_configs,
+                                            share_service=False)
             compute_service = gce_api.service
 
         self.firewall_api = fe.ComputeFirewallAPI(compute_service,
@@ -0,0 +1,374 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+""" In-memory authorization graph of an IAM Explain model. """
+
+import collections
+import threading
+
+
+# pylint: disable=too-many-instance-attributes
+class AuthorizationGraph(object):
+    """The resources, members, roles and bindings of a model, in memory.
+
+    Resources and members are referenced by their 'type/name', permissions
+    are represented as bits and each role as the bitset of its permissions.
+
+    The graph is shared by the threads of the server, so every update and
+    query holds the lock of the graph. The lock is reentrant: hold it to run
+    several queries on the same state of the graph.
+    """
+
+    def __init__(self):
+        """Create an empty graph."""
+
+        self.lock = threading.RLock()
+        self.resource_parents = {}
+        self.resource_children = collections.defaultdict(set)
+        self.members = set()
+        self.member_parents = collections.defaultdict(set)
+        self.member_children = collections.defaultdict(set)
+        self.permission_bits = {}
+        self.role_bits = {}
+        self.resource_bindings = collections.defaultdict(
+            lambda: collections.defaultdict(set))
+        self.member_bindings = collections.defaultdict(set)
+
+    def add_resource(self, type_name, parent_type_name=None):
+        """Add a resource.
+
+        Args:
+            type_name (str): Resource to add.
+            parent_type_name (str): Parent of the resource, None for a root.
+        """
+
+        with self.lock:
+            self.resource_parents[type_name] = parent_type_name
+            if parent_type_name is not None:
+                self.resource_children[parent_type_name].add(type_name)
+
+    def remove_resource(self, type_name):
+        """Remove a resource, its descendants and their bindings.
+
+        Args:
+            type_name (str): Resource to remove.
+        """
+
+        with self.lock:
+            parent_type_name = self.resource_parents.get(type_name)
+            if parent_type_name is not None:
+                self.resource_children[parent_type_name].discard(type_name)
+
+            for resource in self.expand_resource(type_name):
+                self.resource_parents.pop(resource, None)
+                self.resource_children.pop(resource, None)
+                for role, members in self.resource_bindings.pop(
+                        resource, {}).iteritems():
+                    for member in members:
+                        self.member_bindings[member].discard((resource, role))
+
+    def get_resource_path(self, type_name):
+        """Get a resource and its ancestors.
+
+        Args:
+            type_name (str): Resource to start from.
+
+        Returns:
+            list: The resource followed by its ancestors, bottom up, empty
+                if the resource does not exist.
+        """
+
+        with self.lock:
+            path = []
+            while (type_name is not None and
+                   type_name in self.resource_parents):
+                path.append(type_name)
+                type_name = self.resource_parents[type_name]
+            return path
+
+    def expand_resource(self, type_name):
+        """Get a resource and all of its descendants.
+
+        Args:
+            type_name (str): Resource to expand.
+
+        Returns:
+            set: The resource and its descendants.
+        """
+
+        with self.lock:
+            resources = set([type_name])
+            to_walk = [type_name]
+            while to_walk:
+                for child in self.resource_children.get(to_walk.pop(), ()):
+                    if child not in resources:
+                        resources.add(child)
+                        to_walk.append(child)
+            return resources
+
+    def add_member(self, name, parent_names=()):
+        """Add a member, or memberships of an existing member.
+
+        Args:
+            name (str): Member to add.
+            parent_names (iterable): Groups the member belongs to.
+        """
+
+        with self.lock:
+            self.members.add(name)
+            for parent_name in parent_names:
+                self.add_membership(name, parent_name)
+
+    def add_membership(self, name, parent_name):
+        """Add a member to a group.
+
+        Args:
+            name (str): Member to add to the group.
+            parent_name (str): Group to add the member to.
+        """
+
+        with self.lock:
+            self.member_parents[name].add(parent_name)
+            self.member_children[parent_name].add(name)
+
+    def remove_membership(self, name, parent_name):
+        """Remove a member from a group.
+
+        Args:
+            name (str): Member to remove from the group.
+            parent_name (str): Group to remove the member from.
+        """
+
+        with self.lock:
+            self.member_parents[name].discard(parent_name)
+            self.member_children[parent_name].discard(name)
+
+    def remove_member(self, name):
+        """Remove a member, its memberships and its bindings.
+
+        Args:
+            name (str): Member to remove.
+        """
+
+        with self.lock:
+            self.members.discard(name)
+            for parent_name in self.member_parents.pop(name, ()):
+                self.member_children[parent_name].discard(name)
+            for child_name in self.member_children.pop(name, ()):
+                self.member_parents[child_name].discard(name)
+            for resource, role in self.member_bindings.pop(name, ()):
+                self.resource_bindings[resource][role].discard(name)
+
+    def reverse_expand_member(self, name):
+        """Get a member and all the groups it transitively belongs to.
+
+        Args:
+            name (str): Member to expand.
+
+        Returns:
+            tuple: The set of member names, empty if the member does not
+                exist, and the membership graph mapping each member with
+                groups, and the expanded member, to its direct groups.
+        """
+
+        with self.lock:
+            if name not in self.members:
+                return set(), {}
+
+            members = set([name])
+            membership_graph = {name: set()}
+            to_walk = [name]
+            while to_walk:
+                member = to_walk.pop()
+                for parent_name in self.member_parents.get(member, ()):
+                    if parent_name not in self.members:
+                        continue
+                    membership_graph.setdefault(member, set()).add(parent_name)
+                    if parent_name not in members:
+                        members.add(parent_name)
+                        to_walk.append(parent_name)
+            return members, membership_graph
+
+    def expand_members(self, names):
+        """Get members and all the members of the groups among them.
+
+        Args:
+            names (iterable): Members to expand.
+
+        Returns:
+            set: The existing members and their transitive group members.
+        """
+
+        with self.lock:
+            members = set()
+            to_walk = [name for name in names if name in self.members]
+            while to_walk:
+                member = to_walk.pop()
+                if member in members:
+                    continue
+                members.add(member)
+                if member.startswith('group/'):
+                    to_walk.extend(child for child in self.member_children.get(
+                        member, ()) if child in self.members)
+            return members
+
+    def set_role(self, name, permission_names):
+        """Add a role or replace its permissions.
+
+        Args:
+            name (str): Role to set.
+            permission_names (iterable): Permissions of the role.
+        """
+
+        with self.lock:
+            bits = 0
+            for permission_name in permission_names:
+                bits |= self._get_permission_bit(permission_name)
+            self.role_bits[name] = bits
+
+    def remove_role(self, name):
+        """Remove a role.
+
+        Args:
+            name (str): Role to remove.
+        """
+
+        with self.lock:
+            self.role_bits.pop(name, None)
+
+    def add_permission(self, name, role_names=()):
+        """Add a permission, optionally to roles.
+
+        Args:
+            name (str): Permission to add.
+            role_names (iterable): Roles which include the permission.
+        """
+
+        with self.lock:
+            bit = self._get_permission_bit(name)
+            for role_name in role_names:
+                self.role_bits[role_name] = (
+                    self.role_bits.get(role_name, 0) | bit)
+
+    def _get_permission_bit(self, name):
+        """Get the bit of a permission, allocating it if needed.
+
+        Args:
+            name (str): Permission name.
+
+        Returns:
+            int: The bit of the permission.
+        """
+
+        with self.lock:
+            if name not in self.permission_bits:
+                self.permission_bits[name] = 1 << len(self.permission_bits)
+            return self.permission_bits[name]
+
+    def get_roles_by_permission_names(self, permission_names):
+        """Get the roles which include all of the permissions.
+
+        Args:
+            permission_names (iterable): Permissions to look for.
+
+        Returns:
+            set: Names of the roles with all of the permissions, or of the
+                roles with any permission if no permission is given.
+        """
+
+        with self.lock:
+            mask = 0
+            for permission_name in permission_names:
+                if permission_name not in self.permission_bits:
+                    return set()
+                mask |= self.permission_bits[permission_name]
+            return set(role for role, bits in self.role_bits.iteritems()
+                       if bits and bits & mask == mask)
+
+    def add_binding(self, resource, role, member_names):
+        """Grant a role to members on a resource.
+
+        Args:
+            resource (str): Resource of the binding.
+            role (str): Role of the binding.
+            member_names (iterable): Members of the binding.
+        """
+
+        with self.lock:
+            for member_name in member_names:
+                self.resource_bindings[resource][role].add(member_name)
+                self.member_bindings[member_name].add((resource, role))
+
+    def set_bindings(self, resource, bindings):
+        """Replace the bindings of a resource.
+
+        Args:
+            resource (str): Resource of the bindings.
+            bindings (dict): Maps roles to the members they are granted to.
+        """
+
+        with self.lock:
+            for role, members in self.resource_bindings.pop(
+                    resource, {}).iteritems():
+                for member in members:
+                    self.member_bindings[member].discard((resource, role))
+            for role, members in bindings.iteritems():
+                self.add_binding(resource, role, members)
+
+    def get_bindings(self, resources, roles, members):
+        """Get the bindings matching resources, roles and members.
+
+        The bindings are collected under the lock, rather than yielded, so
+        the graph can't change while the caller goes through them.
+
+        Args:
+            resources (iterable): Resources of the bindings.
+            roles (set): Roles of the bindings.
+            members (set): Members to look for in the bindings.
+
+        Returns:
+            list: (resource, role, member) of each matching grant.
+        """
+
+        with self.lock:
+            bindings = []
+            for resource in resources:
+                for role, bound_members in self.resource_bindings.get(
+                        resource, {}).iteritems():
+                    if role not in roles:
+                        continue
+                    for member in bound_members & members:
+                        bindings.append((resource, role, member))
+            return bindings
+
+    def get_member_bindings(self, members, roles):
+        """Get the bindings of members with the given roles.
+
+        Args:
+            members (iterable): Members of the bindings.
+            roles (set): Roles of the bindings.
+
+        Returns:
+            list: (resource, role) of each binding, without duplicates.
+        """
+
+        with self.lock:
+            bindings = []
+            seen = set()
+            for member in members:
+                for resource, role in self.member_bindings.get(member, ()):
+                    if role in roles and (resource, role) not in seen:
+                        seen.add((resource, role))
+                        bindings.append((resource, role))
+            return bindings
@@ -37,13 +37,16 @@ from sqlalchemy import DateTime
 from sqlalchemy import or_
 from sqlalchemy import and_
 from sqlalchemy import not_
+from sqlalchemy import event
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import select
 from sqlalchemy.sql import union
 from sqlalchemy.ext.declarative import declarative_base
 
+from google.cloud.security.iam.authz_graph import AuthorizationGraph
 from google.cloud.security.iam.utils import mutual_exclusive
 
 # TODO: The next editor must remove this disable and correct issues.
@@ -54,6 +57,43 @@ from google.cloud.security.iam.utils import mutual_exclusive
 POOL_RECYCLE_SECONDS = 300
 PER_YIELD = 1024
 
+# Key of the graph updates waiting for the commit, in the session info.
+PENDING_GRAPH_UPDATES = 'pending_graph_updates'
+
+
+def update_graph_on_commit(session, update, *args):
+    """Update the in-memory graph once the session is committed.
+
+    Updates made before the commit are applied when it succeeds, and are
+    dropped if the session is rolled back, so the graph never holds changes
+    the database doesn't have.
+
+    Args:
+        session (object): Database session.
+        update (function): Graph method applying the update.
+        *args: Arguments of the update.
+    """
+
+    session.info.setdefault(PENDING_GRAPH_UPDATES, []).append((update, args))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending_graph_updates(session):
+    """Apply the graph updates of a committed session."""
+
+    if session.transaction is not None and session.transaction.nested:
+        return
+    for update, args in session.info.pop(PENDING_GRAPH_UPDATES, []):
+        update(*args)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_pending_graph_updates(session, transaction):
+    """Drop the graph updates of a session that was not committed."""
+
+    if transaction.parent is None:
+        session.info.pop(PENDING_GRAPH_UPDATES, None)
+
 
 def generate_model_handle():
     """Generate random model handle."""
@@ -67,6 +107,101 @@ def generate_model_seed():
     return binascii.hexlify(os.urandom(16))
 
 
+def transitive_closure(graph):
+    """Compute the transitive closure of a directed graph.
+
+    The strongly connected components of the graph are found with Tarjan's
+    algorithm, which emits them children first. The descendants of each
+    component are then the union of the descendant bitsets of its children.
+
+    Args:
+        graph (dict): Maps each node to the set of its direct children.
+
+    Returns:
+        dict: Maps each node with descendants to the set of them. A node is
+            its own descendant if it is part of a cycle.
+    """
+
+    nodes = set(graph)
+    for children in graph.itervalues():
+        nodes.update(children)
+    nodes = sorted(nodes)
+
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph.get(child, ()))))
+                    break
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    bits = dict((node, 1 << i) for i, node in enumerate(nodes))
+    component_ids = {}
+    component_bits = []
+    component_reach = []
+    closure = {}
+    for component_id, component in enumerate(components):
+        own_bits = 0
+        for node in component:
+            component_ids[node] = component_id
+            own_bits |= bits[node]
+
+        reach = 0
+        cyclic = len(component) > 1
+        for node in component:
+            for child in graph.get(node, ()):
+                child_id = component_ids[child]
+                if child_id == component_id:
+                    cyclic = True
+                else:
+                    reach |= (component_reach[child_id] |
+                              component_bits[child_id])
+        if cyclic:
+            reach |= own_bits
+        component_bits.append(own_bits)
+        component_reach.append(reach)
+
+        if reach:
+            descendants = []
+            while reach:
+                lowest = reach & -reach
+                descendants.append(nodes[lowest.bit_length() - 1])
+                reach ^= lowest
+            for node in component:
+                closure[node] = set(descendants)
+    return closure
+
+
 MODEL_BASE = declarative_base()
 
 
@@ -334,6 +469,63 @@ def define_model(model_name, dbengine, model_seed):
         TBL_ROLE = Role
         TBL_RESOURCE = Resource
         TBL_MEMBERSHIP = group_members
+        TBL_ROLE_PERMISSION = role_permissions
+        TBL_BINDING_MEMBER = binding_members
+
+        # In-memory AuthorizationGraph of the model, used by the explain
+        # queries once loaded by load_graph.
+        graph = None
+
+        @classmethod
+        def load_graph(cls, session):
+            """Load the model into an in-memory authorization graph.
+
+            Once loaded, the graph answers the explain queries and is kept
+            up to date by the playground mutations.
+
+            Args:
+                session (object): Database session to use.
+            Returns:
+                AuthorizationGraph: The graph of the model.
+            """
+
+            graph = AuthorizationGraph()
+            for type_name, parent_type_name in (
+                    session.query(Resource.type_name,
+                                  Resource.parent_type_name)
+                    .yield_per(PER_YIELD)):
+                graph.add_resource(type_name, parent_type_name)
+
+            for (member_name,) in (session.query(Member.name)
+                                   .yield_per(PER_YIELD)):
+                graph.add_member(member_name)
+            for group_name, member_name in session.execute(
+                    select([group_members.c.group_name,
+                            group_members.c.members_name])):
+                graph.add_membership(member_name, group_name)
+
+            for (role_name,) in session.query(Role.name).yield_per(PER_YIELD):
+                graph.set_role(role_name, [])
+            for (permission_name,) in (session.query(Permission.name)
+                                       .yield_per(PER_YIELD)):
+                graph.add_permission(permission_name)
+            for role_name, permission_name in session.execute(
+                    select([role_permissions.c.roles_name,
+                            role_permissions.c.permissions_name])):
+                graph.add_permission(permission_name, [role_name])
+
+            for resource_type_name, role_name, member_name in (
+                    session.query(Binding.resource_type_name,
+                                  Binding.role_name,
+                                  binding_members.c.members_name)
+                    .filter(binding_members.c.bindings_id == Binding.id)
+                    .yield_per(PER_YIELD)):
+                if member_name in graph.members:
+                    graph.add_binding(resource_type_name, role_name,
+                                      [member_name])
+
+            cls.graph = graph
+            return graph
 
         @classmethod
         def delete_all(cls, engine):
@@ -448,10 +640,158 @@ def define_model(model_name, dbengine, model_seed):
                 session.commit()
             return iterations
 
+        @classmethod
+        def _get_group_graph(cls, session):
+            """Read the group-in-group memberships.
+
+            Args:
+                session (object): Database session to use.
+            Returns:
+                dict: Maps each group to the set of its direct subgroups.
+            """
+
+            qry = (
+                select([group_members.c.group_name,
+                        group_members.c.members_name])
+                .where(group_members.c.group_name.startswith('group/'))
+                .where(group_members.c.members_name.startswith('group/')))
+
+            graph = collections.defaultdict(set)
+            for parent, member in session.execute(qry):
+                graph[parent].add(member)
+            return graph
+
+        @classmethod
+        def _insert_group_in_group(cls, session, closure):
+            """Bulk insert group-in-group rows.
+
+            Args:
+                session (object): Database session to use.
+                closure (dict): Maps groups to the set of their subgroups.
+            Returns:
+                int: Number of rows inserted.
+            """
+
+            rows = [{'parent': parent, 'member': member}
+                    for parent, members in closure.iteritems()
+                    for member in members]
+            for i in xrange(0, len(rows), PER_YIELD):
+                session.execute(GroupInGroup.__table__.insert(),
+                                rows[i:i + PER_YIELD])
+            return len(rows)
+
+        @classmethod
+        def denorm_group_in_group_in_memory(cls, session):
+            """Denormalize group-in-group relation in memory.
+
+            Unlike denorm_group_in_group, the memberships are read once and
+            their transitive closure is computed in memory, then written
+            with bulk inserts.
+
+            Args:
+                session (object): Database session to use.
+            Returns:
+                int: Number of group-in-group rows.
+            """
+
+            closure = transitive_closure(cls._get_group_graph(session))
+            try:
+                session.execute(GroupInGroup.__table__.delete())
+                row_count = cls._insert_group_in_group(session, closure)
+            except Exception:
+                session.rollback()
+                raise
+            session.commit()
+            return row_count
+
+        @classmethod
+        def _add_group_in_group(cls, session, member_name, parent_names):
+            """Add the group-in-group rows of new group memberships.
+
+            Args:
+                session (object): Database session to use.
+                member_name (str): Group which became a member of the parents.
+                parent_names (list): Groups the member was added to.
+            """
+
+            parent_names = set(name for name in parent_names
+                               if name.startswith('group/'))
+            if not parent_names:
+                return
+
+            ancestors = set(parent_names)
+            for row in (session.query(GroupInGroup.parent)
+                        .filter(GroupInGroup.member.in_(parent_names))):
+                ancestors.add(row.parent)
+
+            descendants = set([member_name])
+            for row in (session.query(GroupInGroup.member)
+                        .filter(GroupInGroup.parent == member_name)):
+                descendants.add(row.member)
+
+            closure = collections.defaultdict(set)
+            for ancestor in ancestors:
+                closure[ancestor].update(descendants)
+            for row in (session.query(GroupInGroup)
+                        .filter(GroupInGroup.parent.in_(ancestors))
+                        .filter(GroupInGroup.member.in_(descendants))):
+                closure[row.parent].discard(row.member)
+
+            cls._insert_group_in_group(session, closure)
+            session.commit()
+
+        @classmethod
+        def _refresh_group_in_group(cls, session, group_names):
+            """Recompute the group-in-group rows of groups and their ancestors.
+
+            Used after memberships are removed, only the rows of the groups
+            which could have lost subgroups are rewritten.
+
+            Args:
+                session (object): Database session to use.
+                group_names (list): Groups which lost a member.
+            """
+
+            group_names = set(name for name in group_names
+                              if name.startswith('group/'))
+            if not group_names:
+                return
+
+            ancestors = set(group_names)
+            for row in (session.query(GroupInGroup.parent)
+                        .filter(GroupInGroup.member.in_(group_names))):
+                ancestors.add(row.parent)
+
+            graph = cls._get_group_graph(session)
+            closure = {}
+            for ancestor in ancestors:
+                descendants = set()
+                to_walk = list(graph[ancestor])
+                while to_walk:
+                    group = to_walk.pop()
+                    if group not in descendants:
+                        descendants.add(group)
+                        to_walk.extend(graph[group])
+                closure[ancestor] = descendants
+
+            try:
+                session.execute(GroupInGroup.__table__.delete(
+                    GroupInGroup.parent.in_(ancestors)))
+                cls._insert_group_in_group(session, closure)
+            except Exception:
+                session.rollback()
+                raise
+            session.commit()
+
         @classmethod
         def explain_granted(cls, session, member_name, resource_type_name,
                             role, permission):
             """Provide info about how the member has access to the resource."""
+            if cls.graph is not None:
+                with cls.graph.lock:
+                    return cls._explain_granted_from_graph(
+                        member_name, resource_type_name, role, permission)
+
             members, member_graph = cls.reverse_expand_members(
                 session, [member_name], request_graph=True)
             member_names = [m.name for m in members]
@@ -488,6 +828,30 @@ def define_model(model_name, dbengine, model_seed):
                             for b, m in result]
                 return bindings, member_graph, resource_type_names
 
+        @classmethod
+        def _explain_granted_from_graph(cls, member_name, resource_type_name,
+                                        role, permission):
+            """Implements explain_granted with the in-memory graph."""
+
+            member_names, member_graph = cls.graph.reverse_expand_member(
+                member_name)
+            resource_type_names = cls.graph.get_resource_path(
+                resource_type_name)
+            if role:
+                roles = set([role])
+            else:
+                roles = cls.graph.get_roles_by_permission_names([permission])
+
+            bindings = cls.graph.get_bindings(
+                resource_type_names, roles, member_names)
+            if not bindings:
+                raise Exception(
+                    'Grant not found: ({},{},{})'.format(
+                        member_name,
+                        resource_type_name,
+                        role if role is not None else permission))
+            return bindings, member_graph, resource_type_names
+
         @classmethod
         def explain_denied(cls, session, member_name, resource_type_names,
                            permission_names, role_names):
@@ -576,6 +940,12 @@ def define_model(model_name, dbengine, model_seed):
                                    reverse_expand_members=True):
             """Return the set of resources the member has access to."""
 
+            if cls.graph is not None:
+                with cls.graph.lock:
+                    return cls._query_access_by_member_from_graph(
+                        member_name, permission_names, expand_resources,
+                        reverse_expand_members)
+
             if reverse_expand_members:
                 member_names = [m.name for m in
                                 cls.reverse_expand_members(
@@ -612,6 +982,26 @@ def define_model(model_name, dbengine, model_seed):
                      res_exp[binding.resource_type_name])
                     for binding in bindings]
 
+        @classmethod
+        def _query_access_by_member_from_graph(cls, member_name,
+                                               permission_names,
+                                               expand_resources,
+                                               reverse_expand_members):
+            """Implements query_access_by_member with the in-memory graph."""
+
+            if reverse_expand_members:
+                member_names, _ = cls.graph.reverse_expand_member(
+                    member_name)
+            else:
+                member_names = [member_name]
+            roles = cls.graph.get_roles_by_permission_names(
+                permission_names)
+            bindings = cls.graph.get_member_bindings(member_names, roles)
+            if not expand_resources:
+                return [(role, [resource]) for resource, role in bindings]
+            return [(role, list(cls.graph.expand_resource(resource)))
+                    for resource, role in bindings]
+
         @classmethod
         def query_access_by_permission(cls,
                                        session,
@@ -698,6 +1088,11 @@ def define_model(model_name, dbengine, model_seed):
                                      permission_names, expand_groups=False):
             """Return members who have access to the given resource."""
 
+            if cls.graph is not None:
+                with cls.graph.lock:
+                    return cls._query_access_by_resource_from_graph(
+                        resource_type_name, permission_names, expand_groups)
+
             roles = cls.get_roles_by_permission_names(
                 session, permission_names)
             resources = cls.find_resource_path(session, resource_type_name)
@@ -722,6 +1117,26 @@ def define_model(model_name, dbengine, model_seed):
 
             return role_member_mapping
 
+        @classmethod
+        def _query_access_by_resource_from_graph(cls, resource_type_name,
+                                                 permission_names,
+                                                 expand_groups):
+            """Implements query_access_by_resource with the in-memory graph."""
+
+            role_member_mapping = collections.defaultdict(set)
+            for _, role, member in cls.graph.get_bindings(
+                    cls.graph.get_resource_path(resource_type_name),
+                    cls.graph.get_roles_by_permission_names(
+                        permission_names),
+                    cls.graph.members):
+                role_member_mapping[role].add(member)
+            if expand_groups:
+                for role in role_member_mapping:
+                    role_member_mapping[role] = list(
+                        cls.graph.expand_members(
+                            role_member_mapping[role]))
+            return role_member_mapping
+
         @classmethod
         def query_permissions_by_roles(cls, session, role_names, role_prefixes,
                                        _=1024):
@@ -741,50 +1156,78 @@ def define_model(model_name, dbengine, model_seed):
 
         @classmethod
         def denormalize(cls, session):
-            """Denormalize the model into access triples."""
+            """Denormalize the model into access triples.
 
-            qry = (session.query(Binding)
-                   .join(binding_members)
-                   .join(Member))
+            The resource hierarchy, the role permissions and the group
+            memberships are each loaded once, then the triples of every
+            binding are produced from memory.
 
-            members = set()
-            for binding in qry.yield_per(PER_YIELD):
-                for member in binding.members:
-                    members.add(member.name)
+            Args:
+                session (object): Database session.
 
-            expanded_members = cls.expand_members_map(session, members)
-            role_permissions_map = collections.defaultdict(set)
+            Yields:
+                tuple: (permission, resource type name, member name).
+            """
 
-            qry = (session.query(Role, Permission)
-                   .join(role_permissions)
-                   .filter(
-                       Role.name == role_permissions.c.roles_name)
-                   .filter(
-                       Permission.name == role_permissions.c.permissions_name))
+            resource_children = collections.defaultdict(set)
+            for type_name, parent_type_name in (
+                    session.query(Resource.type_name,
+                                  Resource.parent_type_name)
+                    .yield_per(PER_YIELD)):
+                resource_children[parent_type_name].add(type_name)
+
+            resource_closures = {}
+
+            def expand_resource(type_name):
+                """Get a resource and all of its descendants."""
+
+                if type_name not in resource_closures:
+                    closure = set([type_name])
+                    to_walk = [type_name]
+                    while to_walk:
+                        for child in resource_children[to_walk.pop()]:
+                            if child not in closure:
+                                closure.add(child)
+                                to_walk.append(child)
+                    resource_closures[type_name] = closure
+                return resource_closures[type_name]
+
+            binding_members_map = collections.defaultdict(set)
+            for resource_type_name, role_name, member_name in (
+                    session.query(Binding.resource_type_name,
+                                  Binding.role_name,
+                                  binding_members.c.members_name)
+                    .filter(binding_members.c.bindings_id == Binding.id)
+                    .yield_per(PER_YIELD)):
+                binding_members_map[(resource_type_name, role_name)].add(
+                    member_name)
 
-            for role, permission in qry.yield_per(PER_YIELD):
-                role_permissions_map[role.name].add(permission.name)
+            members = set()
+            for member_names in binding_members_map.itervalues():
+                members.update(member_names)
+            expanded_members = cls.expand_members_map(session, members)
 
-            for binding, member in (
-                    session.query(Binding, Member)
-                    .join(binding_members)
-                    .filter(binding_members.c.bindings_id == Binding.id)
-                    .filter(binding_members.c.members_name == Member.name)
+            role_permissions_map = collections.defaultdict(set)
+            for role_name, permission_name in (
+                    session.query(role_permissions.c.roles_name,
+                                  role_permissions.c.permissions_name)
                     .yield_per(PER_YIELD)):
+                role_permissions_map[role_name].add(permission_name)
 
-                resource_type_name = binding.resource_type_name
-                resource_mapping = cls.expand_resources_by_type_names(
-                    session,
-                    [resource_type_name])
+            for (resource_type_name, role_name), member_names in (
+                    binding_members_map.iteritems()):
+                permissions = role_permissions_map[role_name]
+                if not permissions:
+                    continue
 
-                resource_mapping = {k.type_name: set([m.type_name for m in v])
-                                    for k, v in resource_mapping.iteritems()}
+                binding_members_set = set()
+                for member_name in member_names:
+                    binding_members_set.update(expanded_members[member_name])
 
-                for expanded_member in expanded_members[member.name]:
-                    for permission in role_permissions_map[binding.role_name]:
-                        for res in resource_mapping[resource_type_name]:
-                            triple = (permission, res, expanded_member)
-                            yield triple
+                for res in expand_resource(resource_type_name):
+                    for permission in permissions:
+                        for expanded_member in binding_members_set:
+                            yield permission, res, expanded_member
 
         @classmethod
         def set_iam_policy(cls, session, resource_type_name, policy):
@@ -857,6 +1300,11 @@ def define_model(model_name, dbengine, model_seed):
             resource.increment_update_counter()
             session.commit()
 
+            if cls.graph is not None:
+                policy = cls.get_iam_policy(session, resource_type_name)
+                cls.graph.set_bindings(resource_type_name,
+                                       policy['bindings'])
+
         @classmethod
         def get_iam_policy(cls, session, resource_type_name):
             """Return the IAM policy for a resource."""
@@ -881,13 +1329,19 @@ def define_model(model_name, dbengine, model_seed):
                              member_name):
             """Check access according to the resource IAM policy."""
 
-            member_names = [m.name for m in
-                            cls.reverse_expand_members(
-                                session,
-                                [member_name])]
-            resource_type_names = [r.type_name for r in cls.find_resource_path(
-                session,
-                resource_type_name)]
+            if cls.graph is not None:
+                member_names, _ = cls.graph.reverse_expand_member(member_name)
+                resource_type_names = cls.graph.get_resource_path(
+                    resource_type_name)
+            else:
+                member_names = [m.name for m in
+                                cls.reverse_expand_members(
+                                    session,
+                                    [member_name])]
+                resource_type_names = [
+                    r.type_name for r in cls.find_resource_path(
+                        session,
+                        resource_type_name)]
 
             if not member_names:
                 raise Exception('Member not found: {}'.
@@ -896,6 +1350,12 @@ def define_model(model_name, dbengine, model_seed):
                 raise Exception('Resource not found: {}'.
                                 format(resource_type_name))
 
+            if cls.graph is not None:
+                roles = cls.graph.get_roles_by_permission_names(
+                    [permission_name])
+                return bool(cls.graph.get_bindings(
+                    resource_type_names, roles, member_names))
+
             return (
                 session.query(Permission)
                 .filter(Permission.name == permission_name)
@@ -940,6 +1400,8 @@ def define_model(model_name, dbengine, model_seed):
                 role_permissions.c.roles_name == role_name)
             session.execute(role_permission_delete)
             session.commit()
+            if cls.graph is not None:
+                cls.graph.remove_role(role_name)
 
         @classmethod
         def add_group_member(cls,
@@ -973,8 +1435,19 @@ def define_model(model_name, dbengine, model_seed):
                     group_members.c.members_name == member_type_name)
                 session.execute(group_members_delete)
             session.commit()
+            if cls.graph is not None:
+                if only_delete_relationship:
+                    cls.graph.remove_membership(member_type_name,
+                                                parent_type_name)
+                else:
+                    cls.graph.remove_member(member_type_name)
             if denorm:
-                cls.denorm_group_in_group(session)
+                if only_delete_relationship:
+                    if member_type_name.startswith('group/'):
+                        cls._refresh_group_in_group(session,
+                                                    [parent_type_name])
+                else:
+                    cls._refresh_group_in_group(session, [member_type_name])
 
         @classmethod
         def list_group_members(cls, session, member_name_prefix):
@@ -1052,6 +1525,8 @@ def define_model(model_name, dbengine, model_seed):
 
             res_qry.delete(synchronize_session='fetch')
             session.commit()
+            if cls.graph is not None:
+                cls.graph.remove_resource(resource_type_name)
 
         @classmethod
         def add_resource_by_name(cls,
@@ -1086,6 +1561,10 @@ def define_model(model_name, dbengine, model_seed):
                                 type=res_type,
                                 parent=parent)
             session.add(resource)
+            if cls.graph is not None:
+                update_graph_on_commit(
+                    session, cls.graph.add_resource, resource_type_name,
+                    parent.type_name if parent else None)
             return resource
 
         @classmethod
@@ -1095,6 +1574,9 @@ def define_model(model_name, dbengine, model_seed):
             permissions = [] if permissions is None else permissions
             role = Role(name=name, permissions=permissions)
             session.add(role)
+            if cls.graph is not None:
+                update_graph_on_commit(session, cls.graph.set_role, name,
+                                       [p.name for p in permissions])
             return role
 
         @classmethod
@@ -1104,6 +1586,9 @@ def define_model(model_name, dbengine, model_seed):
             roles = [] if roles is None else roles
             permission = Permission(name=name, roles=roles)
             session.add(permission)
+            if cls.graph is not None:
+                update_graph_on_commit(session, cls.graph.add_permission,
+                                       name, [r.name for r in roles])
             return permission
 
         @classmethod
@@ -1112,6 +1597,10 @@ def define_model(model_name, dbengine, model_seed):
 
             binding = Binding(resource=resource, role=role, members=members)
             session.add(binding)
+            if cls.graph is not None:
+                update_graph_on_commit(session, cls.graph.add_binding,
+                                       resource.type_name, role.name,
+                                       [m.name for m in members])
             return binding
 
         @classmethod
@@ -1138,8 +1627,10 @@ def define_model(model_name, dbengine, model_seed):
                             parents=parents)
             session.add(member)
             session.commit()
+            if cls.graph is not None:
+                cls.graph.add_member(type_name, parent_type_names)
             if denorm and res_type == 'group' and parents:
-                cls.denorm_group_in_group(session)
+                cls._add_group_in_group(session, type_name, parent_type_names)
             return member
 
         @classmethod
@@ -15,6 +15,7 @@
 """ Importer implementations. """
 
 from collections import defaultdict
+from collections import OrderedDict
 import csv
 import json
 from StringIO import StringIO
@@ -24,6 +25,9 @@ import traceback
 from google.cloud.security.common.data_access import forseti
 from google.cloud.security.iam.explain.importer import roles as roledef
 
+# Number of rows written by each bulk insert.
+BULK_INSERT_SIZE = 1024
+
 
 class ResourceCache(dict):
     """Resource cache."""
@@ -44,8 +48,24 @@ class ResourceCache(dict):
 
 
 class MemberCache(dict):
-    """Member cache."""
-    pass
+    """Member cache, maps 'type/name' to the member table row."""
+
+    def add(self, member_type, member_name):
+        """Add a member to the cache.
+
+        Args:
+            member_type (str): Type of the member, e.g. 'user'.
+            member_name (str): Name of the member, e.g. an email address.
+
+        Returns:
+            str: Name of the member in 'type/name' format.
+        """
+
+        name = '{}/{}'.format(member_type, member_name)
+        self[name] = {'name': name,
+                      'type': member_type,
+                      'member_name': member_name}
+        return name
 
 
 class RoleCache(defaultdict):
@@ -239,46 +259,71 @@ class ForsetiImporter(object):
         self.forseti_importer = forseti.Importer(
             service_config.forseti_connect_string)
         self.resource_cache = ResourceCache()
+        self.member_cache = MemberCache()
         self.role_cache = RoleCache()
+        self.resource_rows = OrderedDict()
+        self.membership_rows = set()
+        self.binding_rows = []
+        self.binding_member_rows = []
         self.dao = dao
         self.curated_roles = load_roles()
+        self.last_watchdog_kick = time()
+
+    def _kick_watchdog(self):
+        """Notify the model about the import progress every ten seconds."""
+
+        if time() - self.last_watchdog_kick > 10.0:
+            self.model.kick_watchdog(self.session)
+            self.last_watchdog_kick = time()
+
+    def _add_resource(self, full_name, type_name, name, res_type,
+                      parent_type_name, display_name=None):
+        """Add a resource to the rows written at the end of the import.
+
+        Args:
+            full_name (str): Full name of the resource, including ancestors.
+            type_name (str): Resource name in 'type/name' format.
+            name (str): Name of the resource.
+            res_type (str): Type of the resource.
+            parent_type_name (str): type_name of the parent, None for the
+                organization.
+            display_name (str): Display name of the resource.
+        """
+
+        self.resource_rows[type_name] = {
+            'full_name': full_name,
+            'type_name': type_name,
+            'name': name,
+            'type': res_type,
+            'parent_type_name': parent_type_name,
+            'display_name': display_name,
+            }
 
     def _convert_organization(self, forseti_org):
-        """Creates a db object from a Forseti organization.
+        """Adds the resource of a Forseti organization.
 
         Args:
             forseti_org (object): Forseti DB object for an organization.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         org_name = 'organization/{}'.format(forseti_org.org_id)
-        org = self.dao.TBL_RESOURCE(
-            full_name=org_name,
-            type_name=org_name,
-            name=forseti_org.org_id,
-            type='organization',
-            parent=None)
-        self.resource_cache['organization'] = (org, org_name)
-        self.resource_cache[org_name] = (org, org_name)
-        return org
+        self._add_resource(org_name, org_name, forseti_org.org_id,
+                           'organization', None)
+        self.resource_cache['organization'] = (org_name, org_name)
+        self.resource_cache[org_name] = (org_name, org_name)
 
     def _convert_folder(self, forseti_folder):
-        """Creates a db object from a Forseti folder.
+        """Adds the resource of a Forseti folder.
 
         Args:
             forseti_folder (object): Forseti DB object for a folder.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         parent_type_name = '{}/{}'.format(
             forseti_folder.parent_type,
             forseti_folder.parent_id)
 
-        obj, full_res_name = self.resource_cache[parent_type_name]
+        parent, full_res_name = self.resource_cache[parent_type_name]
 
         full_folder_name = '{}/folder/{}'.format(
             full_res_name, forseti_folder.folder_id)
@@ -286,80 +331,53 @@ class ForsetiImporter(object):
         folder_type_name = 'folder/{}'.format(
             forseti_folder.folder_id)
 
-        folder = self.dao.TBL_RESOURCE(
-            full_name=full_folder_name,
-            type_name=folder_type_name,
-            name=forseti_folder.folder_id,
-            type='folder',
-            parent=obj,
-            display_name=forseti_folder.display_name,
-            )
-
-        self.resource_cache[folder.type_name] = folder, full_folder_name
-        return self.session.merge(folder)
+        self._add_resource(full_folder_name, folder_type_name,
+                           forseti_folder.folder_id, 'folder', parent,
+                           display_name=forseti_folder.display_name)
+        self.resource_cache[folder_type_name] = (
+            folder_type_name, full_folder_name)
 
     def _convert_project(self, forseti_project):
-        """Creates a db object from a Forseti project.
+        """Adds the resource of a Forseti project.
 
         Args:
             forseti_project (object): Forseti DB object for a project.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         parent_type_name = '{}/{}'.format(
             forseti_project.parent_type,
             forseti_project.parent_id)
 
-        obj, full_res_name = self.resource_cache[parent_type_name]
+        parent, full_res_name = self.resource_cache[parent_type_name]
         project_name = 'project/{}'.format(forseti_project.project_number)
         full_project_name = '{}/project/{}'.format(
             full_res_name, forseti_project.project_number)
-        project = self.session.merge(
-            self.dao.TBL_RESOURCE(
-                full_name=full_project_name,
-                type_name=project_name,
-                name=forseti_project.project_number,
-                type='project',
-                display_name=forseti_project.project_name,
-                parent=obj))
-        self.resource_cache[project.type_name] = (project, full_project_name)
+        self._add_resource(full_project_name, project_name,
+                           forseti_project.project_number, 'project', parent,
+                           display_name=forseti_project.project_name)
+        self.resource_cache[project_name] = (project_name, full_project_name)
         self.resource_cache[forseti_project.project_id] = (
-            project, full_project_name)
-        return project
+            project_name, full_project_name)
 
     def _convert_bucket(self, forseti_bucket):
-        """Creates a db object from a Forseti bucket.
+        """Adds the resource of a Forseti bucket.
 
         Args:
             forseti_bucket (object): Forseti DB object for a bucket.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         bucket_name = 'bucket/{}'.format(forseti_bucket.bucket_id)
         project_name = 'project/{}'.format(forseti_bucket.project_number)
         parent, full_parent_name = self.resource_cache[project_name]
         full_bucket_name = '{}/{}'.format(full_parent_name, bucket_name)
-        bucket = self.session.merge(
-            self.dao.TBL_RESOURCE(
-                full_name=full_bucket_name,
-                type_name=bucket_name,
-                name=forseti_bucket.bucket_id,
-                type='bucket',
-                parent=parent))
-        return bucket
+        self._add_resource(full_bucket_name, bucket_name,
+                           forseti_bucket.bucket_id, 'bucket', parent)
 
     def _convert_instance(self, forseti_instance):
-        """Creates a db object from a Forseti gce instance.
+        """Adds the resource of a Forseti gce instance.
 
         Args:
             forseti_instance (object): Forseti DB object for a gce instance.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         instance_name = 'instance/{}#{}'.format(
@@ -369,24 +387,15 @@ class ForsetiImporter(object):
             forseti_instance.project_id]
 
         full_instance_name = '{}/{}'.format(full_parent_name, instance_name)
-        instance = self.session.merge(
-            self.dao.TBL_RESOURCE(
-                full_name=full_instance_name,
-                type_name=instance_name,
-                name=forseti_instance.name,
-                type='instance',
-                parent=parent))
-        return instance
+        self._add_resource(full_instance_name, instance_name,
+                           forseti_instance.name, 'instance', parent)
 
     def _convert_instance_group(self, forseti_instance_group):
-        """Creates a db object from a Forseti GCE instance group.
+        """Adds the resource of a Forseti GCE instance group.
 
         Args:
             forseti_instance_group (object): Forseti DB object for a gce
             instance.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         instance_group_name = '{}#{}'.format(
@@ -400,24 +409,15 @@ class ForsetiImporter(object):
         full_instance_name = '{}/{}'.format(
             full_parent_name, instance_group_type_name)
 
-        instance = self.session.merge(
-            self.dao.TBL_RESOURCE(
-                full_name=full_instance_name,
-                type_name=instance_group_type_name,
-                name=instance_group_name,
-                type='instancegroup',
-                parent=parent))
-        return instance
+        self._add_resource(full_instance_name, instance_group_type_name,
+                           instance_group_name, 'instancegroup', parent)
 
     def _convert_bigquery_dataset(self, forseti_bigquery_dataset):
-        """Creates a db object from a Forseti Bigquery dataset.
+        """Adds the resource of a Forseti Bigquery dataset.
 
         Args:
             forseti_bigquery_dataset (object): Forseti DB object for a gce
             instance.
-
-        Returns:
-            object: dao Resource() table object.
         """
         bigquery_dataset_name = '{}#{}'.format(
             forseti_bigquery_dataset.project_id,
@@ -430,24 +430,15 @@ class ForsetiImporter(object):
         full_instance_name = '{}/{}'.format(
             full_parent_name, bigquery_dataset_type_name)
 
-        instance = self.session.merge(
-            self.dao.TBL_RESOURCE(
-                full_name=full_instance_name,
-                type_name=bigquery_dataset_type_name,
-                name=bigquery_dataset_name,
-                type='bigquerydataset',
-                parent=parent))
-        return instance
+        self._add_resource(full_instance_name, bigquery_dataset_type_name,
+                           bigquery_dataset_name, 'bigquerydataset', parent)
 
     def _convert_backend_service(self, forseti_backend_service):
-        """Creates a db object from a Forseti backend service.
+        """Adds the resource of a Forseti backend service.
 
         Args:
             forseti_backend_service (object): Forseti DB object for a gce
             backend service.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         backend_service_name = '{}#{}'.format(
@@ -461,24 +452,15 @@ class ForsetiImporter(object):
         full_instance_name = '{}/{}'.format(
             full_parent_name, forseti_backend_service)
 
-        instance = self.session.merge(
-            self.dao.TBL_RESOURCE(
-                full_name=full_instance_name,
-                type_name=backend_service_type_name,
-                name=backend_service_name,
-                type='backendservice',
-                parent=parent))
-        return instance
+        self._add_resource(full_instance_name, backend_service_type_name,
+                           backend_service_name, 'backendservice', parent)
 
     def _convert_cloudsqlinstance(self, forseti_cloudsqlinstance):
-        """Creates a db sql instance from a Forseti sql instance.
+        """Adds the resource of a Forseti sql instance.
 
         Args:
             forseti_cloudsqlinstance (object): Forseti DB object
                                                for a sql instance.
-
-        Returns:
-            object: dao Resource() table object.
         """
 
         sqlinst_name = 'cloudsqlinstance/{}'.format(
@@ -487,66 +469,50 @@ class ForsetiImporter(object):
             forseti_cloudsqlinstance.project_number)
         parent, full_parent_name = self.resource_cache[project_name]
         full_sqlinst_name = '{}/{}'.format(full_parent_name, sqlinst_name)
-        sqlinst = self.session.merge(
-            self.dao.TBL_RESOURCE(
-                full_name=full_sqlinst_name,
-                type_name=sqlinst_name,
-                name=forseti_cloudsqlinstance.name,
-                type='cloudsqlinstance',
-                parent=parent))
-        return sqlinst
+        self._add_resource(full_sqlinst_name, sqlinst_name,
+                           forseti_cloudsqlinstance.name, 'cloudsqlinstance',
+                           parent)
 
     def _convert_binding(self, res_type, res_id, binding):
-        """Converts a policy binding into the respective db model.
+        """Adds the rows of a policy binding.
 
         Args:
             res_type (str): Type of the bound resource
             res_id (str): Id of the bound resource
             binding (dict): role:members dictionary
+
+        Raises:
+            KeyError: If the bound resource was not imported.
         """
-        members = []
+        members = set()
         for member in binding.iter_members():
-            members.append(self.session.merge(
-                self.dao.TBL_MEMBER(
-                    name='{}/{}'.format(member.get_type(),
-                                        member.get_name()),
-                    member_name=member.get_name(),
-                    type=member.get_type())))
+            members.add(self.member_cache.add(member.get_type(),
+                                              member.get_name()))
 
-        try:
-            role = (
-                self.session.query(self.dao.TBL_ROLE)
-                .filter(self.dao.TBL_ROLE.name == binding.get_role())
-                .one())
-        except Exception:  # pylint: disable=broad-except
+        role_name = binding.get_role()
+        if role_name not in self.role_cache:
             try:
-                permission_names = self._get_permissions_for_role(
-                    binding.get_role())
+                permission_names = self._get_permissions_for_role(role_name)
             except KeyError as err:
                 self.model.add_warning(self.session, str(err))
                 permission_names = []
-
-            permissions = (
-                [self.session.merge(self.dao.TBL_PERMISSION(name=p))
-                 for p in permission_names])
-            role = self.dao.TBL_ROLE(name=binding.get_role(),
-                                     permissions=permissions)
-            for permission in permissions:
-                self.session.add(permission)
-            self.session.add(role)
+            self.role_cache[role_name].update(permission_names)
 
         res_type_name = '{}/{}'.format(res_type, res_id)
-        resource = (
-            self.session.query(self.dao.TBL_RESOURCE)
-            .filter(self.dao.TBL_RESOURCE.type_name == res_type_name)
-            .one())
-        self.session.add(
-            self.dao.TBL_BINDING(resource=resource,
-                                 role=role,
-                                 members=members))
+        if res_type_name not in self.resource_rows:
+            raise KeyError(
+                'Bound resource not found: {}'.format(res_type_name))
+
+        binding_id = len(self.binding_rows) + 1
+        self.binding_rows.append({'id': binding_id,
+                                  'resource_type_name': res_type_name,
+                                  'role_name': role_name})
+        self.binding_member_rows.extend(
+            {'bindings_id': binding_id, 'members_name': member_name}
+            for member_name in members)
 
     def _convert_policy(self, forseti_policy):
-        """Creates a db object from a Forseti policy.
+        """Adds the rows of a Forseti policy.
 
         Args:
             forseti_policy (object): Forseti DB object for a policy.
@@ -558,45 +524,28 @@ class ForsetiImporter(object):
             self._convert_binding(res_type, res_id, binding)
 
     def _convert_membership(self, forseti_membership):
-        """Creates a db membership from a Forseti membership.
+        """Adds the rows of a Forseti membership.
 
         Args:
             forseti_membership (object): Forseti DB object for a membership.
-
-        Returns:
-            object: dao Membership() table object.
         """
 
         member, groups = forseti_membership
 
-        groups = [self.session.merge(
-            self.dao.TBL_MEMBER(name='group/{}'.format(group.group_email),
-                                type='group',
-                                member_name=group.group_email))
-                  for group in groups]
-
-        member_type = member.member_type.lower()
-        member_name = member.member_email
-        return self.session.merge(self.dao.TBL_MEMBER(
-            name='{}/{}'.format(member_type, member_name),
-            type=member_type,
-            member_name=member_name,
-            parents=groups))
+        member_name = self.member_cache.add(member.member_type.lower(),
+                                            member.member_email)
+        for group in groups:
+            group_name = self.member_cache.add('group', group.group_email)
+            self.membership_rows.add((group_name, member_name))
 
     def _convert_group(self, forseti_group):
-        """Creates a db group from a Forseti group.
+        """Adds the member of a Forseti group.
 
         Args:
             forseti_group (object): Forseti DB object for a group.
-
-        Returns:
-            object: dao Member() table object.
         """
 
-        return self.session.merge(
-            self.dao.TBL_MEMBER(name='group/{}'.format(forseti_group),
-                                type='group',
-                                member_name=forseti_group))
+        self.member_cache.add('group', forseti_group)
 
     def _get_permissions_for_role(self, role_type_name):
         """Returns permissions defined for that role name.
@@ -616,9 +565,54 @@ class ForsetiImporter(object):
             raise KeyError(warning)
         return self.curated_roles[role_name]
 
+    def _insert_rows(self, table, rows):
+        """Write rows to a table with bulk inserts.
+
+        Args:
+            table (Table): Table to write to.
+            rows (list): Rows to write, as dicts keyed by column name.
+        """
+
+        for i in xrange(0, len(rows), BULK_INSERT_SIZE):
+            self.session.execute(table.insert(),
+                                 rows[i:i + BULK_INSERT_SIZE])
+            self._kick_watchdog()
+
+    def _write_rows(self):
+        """Write the rows collected by the import, parents before children."""
+
+        permission_names = set()
+        for permissions in self.role_cache.itervalues():
+            permission_names.update(permissions)
+
+        self._insert_rows(self.dao.TBL_RESOURCE.__table__,
+                          self.resource_rows.values())
+        self._insert_rows(self.dao.TBL_PERMISSION.__table__,
+                          [{'name': name} for name in permission_names])
+        self._insert_rows(self.dao.TBL_ROLE.__table__,
+                          [{'name': name} for name in self.role_cache])
+        self._insert_rows(
+            self.dao.TBL_ROLE_PERMISSION,
+            [{'roles_name': role_name, 'permissions_name': permission_name}
+             for role_name, permissions in self.role_cache.iteritems()
+             for permission_name in permissions])
+        self._insert_rows(self.dao.TBL_MEMBER.__table__,
+                          self.member_cache.values())
+        self._insert_rows(
+            self.dao.TBL_MEMBERSHIP,
+            [{'group_name': group_name, 'members_name': member_name}
+             for group_name, member_name in self.membership_rows])
+        self._insert_rows(self.dao.TBL_BINDING.__table__, self.binding_rows)
+        self._insert_rows(self.dao.TBL_BINDING_MEMBER,
+                          self.binding_member_rows)
+
     def run(self):
         """Runs the import.
 
+        Members, roles, resources and bindings are collected in memory
+        while iterating over the Forseti inventory, then written with bulk
+        inserts.
+
         Raises:
             NotImplementedError: If the importer encounters an unknown
                                  inventory type.
@@ -628,6 +622,7 @@ class ForsetiImporter(object):
             self.session.add(self.session.merge(self.model))
             self.model.set_inprogress(self.session)
             self.model.kick_watchdog(self.session)
+            self.last_watchdog_kick = time()
 
             actions = {
                 'organizations': self._convert_organization,
@@ -641,16 +636,14 @@ class ForsetiImporter(object):
                 'instancegroups': self._convert_instance_group,
                 'bigquerydatasets': self._convert_bigquery_dataset,
                 'backendservices': self._convert_backend_service,
+                'policy': self._convert_policy,
                 }
 
             item_counter = 0
-            last_watchdog_kick = time()
             for res_type, obj in self.forseti_importer:
                 item_counter += 1
                 if res_type in actions:
-                    self.session.add(actions[res_type](obj))
-                elif res_type == 'policy':
-                    self._convert_policy(obj)
+                    actions[res_type](obj)
                 elif res_type == 'customer':
                     # TODO: investigate how we
                     # don't see this in the first place
@@ -659,11 +652,11 @@ class ForsetiImporter(object):
                     raise NotImplementedError(res_type)
 
                 # kick watchdog about every ten seconds
-                if time() - last_watchdog_kick > 10.0:
-                    self.model.kick_watchdog(self.session)
-                    last_watchdog_kick = time()
+                self._kick_watchdog()
 
-            self.dao.denorm_group_in_group(self.session)
+            self._write_rows()
+            self.dao.denorm_group_in_group_in_memory(self.session)
+            self.dao.load_graph(self.session)
 
         except Exception:  # pylint: disable=broad-except
             buf = StringIO()
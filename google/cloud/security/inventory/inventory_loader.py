@@ -23,13 +23,16 @@ To see all the dependent flags:
 
 """
 from datetime import datetime
+import collections
 import sys
 
+import concurrent.futures
 import gflags as flags
 
 # TODO: Investigate improving so we can avoid the pylint disable.
 # pylint: disable=line-too-long
 from google.apputils import app
+from google.cloud.security.common.data_access import _db_connector
 from google.cloud.security.common.data_access import appengine_dao
 from google.cloud.security.common.data_access import backend_service_dao
 from google.cloud.security.common.data_access import bucket_dao
@@ -49,6 +52,7 @@ from google.cloud.security.common.data_access import project_dao
 from google.cloud.security.common.data_access import service_account_dao
 from google.cloud.security.common.data_access.sql_queries import snapshot_cycles_sql
 from google.cloud.security.common.gcp_api import errors as api_errors
+from google.cloud.security.common.gcp_api import response_cache
 from google.cloud.security.common.util import file_loader
 from google.cloud.security.common.util import log_util
 from google.cloud.security.inventory import api_map
@@ -155,6 +159,39 @@ def _start_snapshot_cycle(inventory_dao):
     return cycle_time, cycle_timestamp
 
 # pylint: disable=broad-except
+def _run_pipeline(pipeline):
+    """Run a single pipeline to load data.
+
+    Args:
+        pipeline (BasePipeline): The pipeline to be run.
+
+    Returns:
+        bool: Whether the pipeline completed successfully or not.
+    """
+    # TODO: Define these status codes programmatically.
+    try:
+        LOGGER.info('Running pipeline %s', pipeline.__class__.__name__)
+        pipeline.run()
+        pipeline.dao.mark_incremental_loads_complete(
+            pipeline.loaded_resource_names, pipeline.cycle_timestamp)
+        pipeline.status = 'SUCCESS'
+        LOGGER.info('Finished running %s', pipeline.__class__.__name__)
+
+    except (api_errors.ApiInitializationError,
+            inventory_errors.LoadDataPipelineError) as e:
+        LOGGER.error('Encountered API error loading data.\n%s', e,
+                     exc_info=True)
+        pipeline.status = 'FAILURE'
+    except Exception as e:
+        LOGGER.error('Encountered error loading data.\n%s', e,
+                     exc_info=True)
+        pipeline.status = 'FAILURE'
+    finally:
+        # The next pipeline run by this thread must not read through this
+        # pipeline's transaction.
+        _db_connector.release_connections()
+    return pipeline.status == 'SUCCESS'
+
 def _run_pipelines(pipelines):
     """Run the pipelines to load data.
 
@@ -165,35 +202,89 @@ def _run_pipelines(pipelines):
         list: a list of booleans whether each pipeline completed
             successfully or not.
     """
-    # TODO: Define these status codes programmatically.
-    run_statuses = []
+    return [_run_pipeline(pipeline) for pipeline in pipelines]
+
+def _run_pipelines_as_dag(pipelines, pipeline_dependencies, max_workers):
+    """Run the pipelines concurrently, following their dependencies.
+
+    A pipeline is started as soon as the pipeline it depends on has
+    succeeded, so independent pipelines (e.g. instances and buckets, which
+    only depend on projects) run at the same time. When a pipeline fails,
+    the pipelines depending on it are not run and are marked as failed.
+
+    Args:
+        pipelines (list): List of pipelines to be run.
+        pipeline_dependencies (dict): Maps each pipeline to the pipeline it
+            depends on, or None if it has no dependency.
+        max_workers (int): The maximum number of pipelines to run at
+            the same time.
+
+    Returns:
+        list: a list of booleans whether each pipeline completed
+            successfully or not, in the same order as pipelines.
+    """
+    children = collections.defaultdict(list)
+    ready = []
     for pipeline in pipelines:
-        try:
-            LOGGER.info('Running pipeline %s', pipeline.__class__.__name__)
-            pipeline.run()
-            pipeline.status = 'SUCCESS'
-            LOGGER.info('Finished running %s', pipeline.__class__.__name__)
-
-        except (api_errors.ApiInitializationError,
-                inventory_errors.LoadDataPipelineError) as e:
-            LOGGER.error('Encountered API error loading data.\n%s', e,
-                         exc_info=True)
-            pipeline.status = 'FAILURE'
-        except Exception as e:
-            LOGGER.error('Encountered error loading data.\n%s', e,
-                         exc_info=True)
-            pipeline.status = 'FAILURE'
-        run_statuses.append(pipeline.status == 'SUCCESS')
-    return run_statuses
+        parent = pipeline_dependencies.get(pipeline)
+        if parent in pipelines:
+            children[parent].append(pipeline)
+        else:
+            ready.append(pipeline)
+
+    def _skip_pipeline(pipeline, failed_parent):
+        """Mark a pipeline, and all the pipelines under it, as failed.
+
+        Args:
+            pipeline (BasePipeline): The pipeline to skip.
+            failed_parent (BasePipeline): The pipeline that failed.
+        """
+        LOGGER.error('Skipping pipeline %s, because %s did not succeed.',
+                     pipeline.__class__.__name__,
+                     failed_parent.__class__.__name__)
+        pipeline.status = 'FAILURE'
+        for child in children[pipeline]:
+            _skip_pipeline(child, failed_parent)
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers) as executor:
+        running = {}
+        for pipeline in ready:
+            running[executor.submit(
+                _run_pipeline, pipeline)] = pipeline
+
+        while running:
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                pipeline = running.pop(future)
+                for child in children[pipeline]:
+                    if future.result():
+                        running[executor.submit(
+                            _run_pipeline, child)] = child
+                    else:
+                        _skip_pipeline(child, pipeline)
+
+    return [pipeline.status == 'SUCCESS' for pipeline in pipelines]
 
 def _complete_snapshot_cycle(inventory_dao, cycle_timestamp, status):
     """Complete the snapshot cycle.
 
+    With incremental snapshots, the rows removed in the cycle are recorded
+    first, and the cycle fails if they can't be.
+
     Args:
         inventory_dao (dao.Dao): Data access object.
         cycle_timestamp (str): Timestamp, formatted as YYYYMMDDTHHMMSSZ.
         status (str): The current cycle's status.
     """
+    try:
+        inventory_dao.complete_incremental_snapshot(cycle_timestamp)
+    except data_access_errors.MySQLError as e:
+        LOGGER.error('Unable to record the changes of the snapshot cycle: %s',
+                     e)
+        status = 'FAILURE'
+
     complete_time = datetime.utcnow()
 
     try:
@@ -281,6 +372,7 @@ def main(_):
     log_util.set_logger_level_from_config(inventory_configs.get('loglevel'))
 
     dao_map = _create_dao_map(global_configs)
+    api_response_cache = response_cache.configure(global_configs)
 
     cycle_time, cycle_timestamp = _start_snapshot_cycle(dao_map.get('dao'))
 
@@ -292,7 +384,17 @@ def main(_):
         dao_map)
     pipelines = pipeline_builder.build()
 
-    run_statuses = _run_pipelines(pipelines)
+    max_concurrent_pipelines = inventory_configs.get(
+        'max_concurrent_pipelines', 1)
+    if max_concurrent_pipelines > 1:
+        run_statuses = _run_pipelines_as_dag(
+            pipelines, pipeline_builder.pipeline_dependencies,
+            max_concurrent_pipelines)
+    else:
+        run_statuses = _run_pipelines(pipelines)
+
+    if api_response_cache:
+        api_response_cache.log_stats()
 
     if all(run_statuses):
         snapshot_cycle_status = 'SUCCESS'
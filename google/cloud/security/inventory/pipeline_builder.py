@@ -49,6 +49,9 @@ class PipelineBuilder(object):
         self.api_map = api_map
         self.dao_map = dao_map
         self.initialized_api_map = {}
+        # Maps each runnable pipeline to the pipeline it depends on,
+        # or None for the top-level pipeline(s).
+        self.pipeline_dependencies = {}
 
     def _get_api(self, api_name):
         """Get the api instance for the pipeline.
@@ -144,6 +147,7 @@ class PipelineBuilder(object):
         # The order matters: must go top-down in the tree, by PreOrder.
         # http://anytree.readthedocs.io/en/latest/apidoc/anytree.iterators.html
         runnable_pipelines = []
+        pipelines_by_node = {}
         for node in anytree.iterators.PreOrderIter(root):
             if node.enabled:
                 module_path = 'google.cloud.security.inventory.pipelines.{}'
@@ -191,8 +195,19 @@ class PipelineBuilder(object):
                     continue
 
                 pipeline = pipeline_class(
-                    self.cycle_timestamp, self.global_configs, api, dao)
+                    self.cycle_timestamp, self.global_configs, api, dao,
+                    max_workers=node.max_workers)
                 runnable_pipelines.append(pipeline)
+                pipelines_by_node[node] = pipeline
+
+                # Depend on the closest ancestor that has a runnable
+                # pipeline. Ancestors are always visited first in PreOrder.
+                parent_pipeline = None
+                ancestor = node.parent
+                while ancestor is not None and parent_pipeline is None:
+                    parent_pipeline = pipelines_by_node.get(ancestor)
+                    ancestor = ancestor.parent
+                self.pipeline_dependencies[pipeline] = parent_pipeline
 
         return runnable_pipelines
 
@@ -218,7 +233,8 @@ class PipelineBuilder(object):
 
         for entry in configured_pipelines:
             map_of_all_pipeline_nodes[entry.get('resource')] = PipelineNode(
-                entry.get('resource'), entry.get('enabled'))
+                entry.get('resource'), entry.get('enabled'),
+                max_workers=entry.get('max_workers', 1))
 
         # Another pass: build the dependency tree by setting the parents
         # correctly on all the nodes.
@@ -252,16 +268,19 @@ class PipelineNode(anytree.node.NodeMixin):
     http://anytree.readthedocs.io/en/latest/apidoc/anytree.node.html
     """
 
-    def __init__(self, resource_name, enabled, parent=None):
+    def __init__(self, resource_name, enabled, parent=None, max_workers=1):
         """Initialize the pipeline node.
 
         Args:
             resource_name (str): Name of the resource.
             enabled (bool): Whether the pipeline should run.
             parent (PipelineNode): This node's parent.
+            max_workers (int): The number of concurrent API calls the
+                pipeline may use to fetch its resources.
 
         Returns:
         """
         self.resource_name = resource_name
         self.enabled = enabled
         self.parent = parent
+        self.max_workers = max_workers
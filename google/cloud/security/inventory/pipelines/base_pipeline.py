@@ -15,6 +15,9 @@
 """Base pipeline to load data into inventory."""
 
 import abc
+import collections
+
+import concurrent.futures
 
 from google.cloud.security.common.data_access import errors as dao_errors
 from google.cloud.security.common.gcp_api import errors as api_errors
@@ -23,6 +26,10 @@ from google.cloud.security.inventory import errors as inventory_errors
 
 LOGGER = log_util.get_logger(__name__)
 
+# The number of rows of each resource that _load_fanout() buffers before
+# loading them.
+FANOUT_BATCH_SIZE = 10000
+
 
 class BasePipeline(object):
     """Base client for a specified GCP API and credentials."""
@@ -33,7 +40,8 @@ class BasePipeline(object):
 
     MYSQL_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
-    def __init__(self, cycle_timestamp, global_configs, api_client, dao):
+    def __init__(self, cycle_timestamp, global_configs, api_client, dao,
+                 max_workers=1):
         """Constructor for the base pipeline.
 
         Args:
@@ -41,12 +49,16 @@ class BasePipeline(object):
             global_configs (dict): Global configurations.
             api_client (API): Forseti API client object.
             dao (dao): Forseti data access object.
+            max_workers (int): The number of API calls that
+                safe_api_calls() is allowed to run concurrently.
         """
         self.cycle_timestamp = cycle_timestamp
         self.global_configs = global_configs
         self.api_client = api_client
         self.dao = dao
+        self.max_workers = max(1, max_workers or 1)
         self.count = None
+        self.loaded_resource_names = set()
 
     @abc.abstractmethod
     def run(self):
@@ -92,6 +104,79 @@ class BasePipeline(object):
                 'Error calling API, may have incomplete results: %s.', e)
             return None
 
+    def safe_api_calls(self, method_name, args_list):
+        """Safely fetch resources from an API client, once per set of args.
+
+        The calls are made as the responses are consumed, so only a few
+        responses are held in memory at a time. When the pipeline is
+        configured with more than one worker, the calls are dispatched to a
+        bounded thread pool, which runs at most two calls per worker ahead
+        of the consumer. The API client's rate limiter is shared by all the
+        threads, so the API quota is still honored.
+
+        Args:
+            method_name (str): The method to call on the API client.
+            args_list (list): A list of tuples, each one holding the args
+                for a single call to the method.
+
+        Yields:
+            object: The response of each call, in the same order as
+                args_list. Calls that failed with an API error have a None
+                response.
+        """
+        args_list = list(args_list)
+        num_workers = min(self.max_workers, len(args_list))
+        if num_workers <= 1:
+            for args in args_list:
+                yield self.safe_api_call(method_name, *args)
+            return
+
+        LOGGER.debug('Calling %s %s times with %s workers.',
+                     method_name, len(args_list), num_workers)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_workers) as executor:
+            pending = collections.deque()
+            for args in args_list:
+                if len(pending) >= 2 * num_workers:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(
+                    self.safe_api_call, method_name, *args))
+            while pending:
+                yield pending.popleft().result()
+
+    def safe_batch_api_call(self, method_name, *args, **kwargs):
+        """Safely fetch resources from a batch method of an API client.
+
+        The batch method yields a (response, error) tuple per item, one
+        batch request at a time, and the responses are yielded as they
+        arrive. Items that failed with an API error are logged like in
+        safe_api_call().
+
+        Args:
+            method_name (str): The batch method to call on the API client.
+            *args (list): Args to pass to the method.
+            **kwargs (dict): Key word args to pass to the method.
+
+        Yields:
+            object: The response of each item, in the order of the items.
+                Items that failed have a None response. Nothing more is
+                yielded once a whole batch request failed.
+        """
+        try:
+            for response, error in getattr(self.api_client, method_name)(
+                    *args, **kwargs):
+                if isinstance(error, api_errors.ApiNotEnabledError):
+                    LOGGER.warn('Api not enabled on target project: %s.',
+                                error)
+                elif error:
+                    LOGGER.error(
+                        'Error calling API, may have incomplete results: '
+                        '%s.', error)
+                yield response
+        except api_errors.ApiExecutionError as e:
+            LOGGER.error(
+                'Error calling API, may have incomplete results: %s.', e)
+
     @staticmethod
     def _to_bool(value):
         """Transforms a value into a database boolean (or None).
@@ -139,6 +224,7 @@ class BasePipeline(object):
         Raises:
             LoadDataPipelineError: An error with loading data has occurred.
         """
+        self.loaded_resource_names.add(resource_name)
         if not data:
             LOGGER.warn('No %s data to load into Cloud SQL, continuing...',
                         resource_name)
@@ -150,6 +236,35 @@ class BasePipeline(object):
                 dao_errors.MySQLError) as e:
             raise inventory_errors.LoadDataPipelineError(e)
 
+    def _load_fanout(self, resource_names, rows):
+        """Loads the rows of several resources in a single pass.
+
+        The rows are buffered per resource, and a buffer is loaded as soon
+        as it holds FANOUT_BATCH_SIZE rows, so the rows can be loaded while
+        they are still being retrieved and transformed.
+
+        Args:
+            resource_names (list): The names of the resources to load. A
+                resource without any row is reported like in _load().
+            rows (iterable): (resource name, row) pairs.
+
+        Raises:
+            LoadDataPipelineError: An error with loading data has occurred.
+        """
+        batches = dict((resource_name, []) for resource_name in resource_names)
+        loaded = set()
+        for resource_name, row in rows:
+            batch = batches[resource_name]
+            batch.append(row)
+            if len(batch) >= FANOUT_BATCH_SIZE:
+                self._load(resource_name, batch)
+                batches[resource_name] = []
+                loaded.add(resource_name)
+
+        for resource_name in resource_names:
+            if batches[resource_name] or resource_name not in loaded:
+                self._load(resource_name, batches[resource_name])
+
     def _get_loaded_count(self):
         """Get the count of how many of a resource has been loaded."""
         try:
@@ -14,6 +14,10 @@
 
 """Pipeline to load appengine applications into Inventory."""
 
+import collections
+
+import concurrent.futures
+
 from google.cloud.security.common.data_access import project_dao as proj_dao
 from google.cloud.security.common.util import log_util
 from google.cloud.security.common.util import parser
@@ -21,6 +25,21 @@ from google.cloud.security.inventory.pipelines import base_pipeline
 
 LOGGER = log_util.get_logger(__name__)
 
+# The API method called at each level of the crawl, from the applications
+# down to the instances.
+APP_LEVEL = 0
+SERVICES_LEVEL = 1
+VERSIONS_LEVEL = 2
+INSTANCES_LEVEL = 3
+LEVEL_METHODS = ('get_app', 'list_services', 'list_versions',
+                 'list_instances')
+
+# A call of the crawl: the level of the call, and the ids of the parents of
+# the resources it lists.
+_CrawlTask = collections.namedtuple(
+    '_CrawlTask',
+    ['level', 'project_id', 'app_id', 'service_id', 'version_id'])
+
 
 class LoadAppenginePipeline(base_pipeline.BasePipeline):
     """Load all AppEngine applications for all projects."""
@@ -30,73 +49,146 @@ class LoadAppenginePipeline(base_pipeline.BasePipeline):
     VERSIONS_RESOURCE_NAME = 'appengine_versions'
     INSTANCES_RESOURCE_NAME = 'appengine_instances'
 
+    def _get_num_workers(self):
+        """Get how many API calls the crawl can run at once.
+
+        Returns:
+            int: max_workers, bounded by the AppEngine API calls per second
+                quota.
+        """
+        num_workers = self.max_workers
+        max_calls = self.global_configs.get(
+            'max_appengine_api_calls_per_second')
+        if max_calls:
+            num_workers = min(num_workers, max_calls)
+        return max(1, num_workers)
+
+    def _call(self, task):
+        """Call the API method of a crawl task.
+
+        Args:
+            task (_CrawlTask): The task to run.
+
+        Returns:
+            object: The response of the API, None if the call failed.
+        """
+        args = [task.project_id, task.service_id, task.version_id]
+        args = args[:max(1, task.level)]
+        return self.safe_api_call(LEVEL_METHODS[task.level], *args)
+
+    def _expand(self, task, response):
+        """Turn the response of a crawl task into rows and child tasks.
+
+        Args:
+            task (_CrawlTask): The task that was run.
+            response (object): The response of the task.
+
+        Returns:
+            tuple: The (resource name, row) pairs, where the application
+                rows are the raw applications, and the child tasks.
+        """
+        rows = []
+        children = []
+        if not response:
+            return rows, children
+
+        if task.level == APP_LEVEL:
+            rows.append((self.RESOURCE_NAME, (task.project_id, response)))
+            children.append(task._replace(level=SERVICES_LEVEL,
+                                          app_id=response.get('id')))
+        elif task.level == SERVICES_LEVEL:
+            for service in response:
+                service_id = service.get('id')
+                rows.append((self.SERVICES_RESOURCE_NAME,
+                             {'project_id': task.project_id,
+                              'app_id': task.app_id,
+                              'service_id': service_id,
+                              'service': parser.json_stringify(service)}))
+                children.append(task._replace(level=VERSIONS_LEVEL,
+                                              service_id=service_id))
+        elif task.level == VERSIONS_LEVEL:
+            for version in response:
+                version_id = version.get('id')
+                rows.append((self.VERSIONS_RESOURCE_NAME,
+                             {'project_id': task.project_id,
+                              'app_id': task.app_id,
+                              'service_id': task.service_id,
+                              'version_id': version_id,
+                              'version': parser.json_stringify(version)}))
+                children.append(task._replace(level=INSTANCES_LEVEL,
+                                              version_id=version_id))
+        else:
+            for instance in response:
+                rows.append((self.INSTANCES_RESOURCE_NAME,
+                             {'project_id': task.project_id,
+                              'app_id': task.app_id,
+                              'service_id': task.service_id,
+                              'version_id': task.version_id,
+                              'instance_id': instance.get('id'),
+                              'instance': parser.json_stringify(instance)}))
+        return rows, children
 
-    # pylint: disable=too-many-locals, too-many-nested-blocks
     def _retrieve(self):
         """Retrieve AppEngine applications from GCP.
 
-        Get all the projects in the current snapshot and retrieve the
-        AppEngine applications for each.
+        Get all the projects in the current snapshot and crawl their
+        AppEngine applications, services, versions and instances. The crawl
+        is a work queue: the response of each call queues the calls of the
+        level below. The deepest pending calls are run first, so that the
+        queue stays small. Each level can use at most half of the workers,
+        so that a level with many pending calls can't starve the others.
 
-        Returns:
-            dict: Mapping projects with their AppEngine applications:
-            {project_id: application}
+        Yields:
+            tuple: (resource name, row) as the responses arrive. The rows
+                of the applications are (project id, application) pairs.
         """
         projects = (
             proj_dao
             .ProjectDao(self.global_configs)
             .get_projects(self.cycle_timestamp))
-        apps = {}
-        loadable_services = []
-        loadable_versions = []
-        loadable_instances = []
-        for project in projects:
-            app = self.safe_api_call('get_app', project.id)
-            if app:
-                apps[project.id] = app
-
-                services = self.safe_api_call(
-                    'list_services', project.id)
-                if services:
-                    for service in services:
-                        app_id = app.get('id')
-                        service_id = service.get('id')
-                        loadable_services.append(
-                            {'project_id': project.id,
-                             'app_id': app_id,
-                             'service_id': service_id,
-                             'service': parser.json_stringify(service)})
-
-                        versions = self.safe_api_call(
-                            'list_versions', project.id, service_id)
-                        if versions:
-                            for version in versions:
-                                version_id = version.get('id')
-                                loadable_versions.append(
-                                    {'project_id': project.id,
-                                     'app_id': app_id,
-                                     'service_id': service_id,
-                                     'version_id': version_id,
-                                     'version': parser.json_stringify(version)})
-
-                                instances = self.safe_api_call(
-                                    'list_instances', project.id,
-                                    service_id, version_id)
-                                if instances:
-                                    for instance in instances:
-                                        instance_id = instance.get('id')
-                                        parser.json_stringify(instance)
-                                        loadable_instances.append(
-                                            {'project_id': project.id,
-                                             'app_id': app_id,
-                                             'service_id': service_id,
-                                             'version_id': version_id,
-                                             'instance_id': instance_id,
-                                             'instance':
-                                                 parser.json_stringify(
-                                                     instance)})
-        return apps, loadable_services, loadable_versions, loadable_instances
-    # pylint: enable=too-many-locals, too-many-nested-blocks
+        pending = [collections.deque() for _ in LEVEL_METHODS]
+        pending[APP_LEVEL].extend(
+            _CrawlTask(APP_LEVEL, project.id, None, None, None)
+            for project in projects)
+
+        num_workers = self._get_num_workers()
+        if num_workers == 1:
+            while any(pending):
+                level = max(level for level, tasks in enumerate(pending)
+                            if tasks)
+                task = pending[level].popleft()
+                rows, children = self._expand(task, self._call(task))
+                for row in rows:
+                    yield row
+                if children:
+                    pending[level + 1].extend(children)
+            return
+
+        level_cap = max(1, num_workers // 2)
+        running = {}
+        running_per_level = [0] * len(LEVEL_METHODS)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_workers) as executor:
+            while True:
+                for level in reversed(range(len(LEVEL_METHODS))):
+                    while (pending[level] and len(running) < num_workers and
+                           running_per_level[level] < level_cap):
+                        task = pending[level].popleft()
+                        running[executor.submit(self._call, task)] = task
+                        running_per_level[level] += 1
+                if not running:
+                    break
+
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    running_per_level[task.level] -= 1
+                    rows, children = self._expand(task, future.result())
+                    if children:
+                        pending[task.level + 1].extend(children)
+                    for row in rows:
+                        yield row
 
     def _transform(self, resource_from_api):
         """Create an iterator of AppEngine applications to load into database.
@@ -126,19 +218,34 @@ class LoadAppenginePipeline(base_pipeline.BasePipeline):
                    'gcr_domain': app.get('gcrDomain'),
                    'raw_application': parser.json_stringify(app)}
 
+    def _transform_rows(self, rows):
+        """Transform the application rows of the crawl.
+
+        Args:
+            rows (iterable): (resource name, row) pairs from _retrieve().
+
+        Yields:
+            tuple: (resource name, row) pairs, with loadable applications.
+        """
+        for resource_name, row in rows:
+            if resource_name == self.RESOURCE_NAME:
+                for app_row in self._transform(dict([row])):
+                    yield resource_name, app_row
+            else:
+                yield resource_name, row
+
     def run(self):
-        """Run the pipeline."""
-        apps, loadable_services, loadable_versions, loadable_instances = (
-            self._retrieve())
-
-        if apps:
-            loadable_apps = self._transform(apps)
-            self._load(self.RESOURCE_NAME, loadable_apps)
-            # TODO: Make _get_loaded_count() support multiple resources
-            # in a single pipeline.  This will be resolved when tackling
-            # Inventory v2.
-            self._load(self.SERVICES_RESOURCE_NAME, loadable_services)
-            self._load(self.VERSIONS_RESOURCE_NAME, loadable_versions)
-            self._load(self.INSTANCES_RESOURCE_NAME, loadable_instances)
+        """Run the pipeline.
+
+        The rows are loaded while the crawl is still running, instead of
+        once every response has been received.
+        """
+        rows = self._transform_rows(self._retrieve())
+        # TODO: Make _get_loaded_count() support multiple resources
+        # in a single pipeline.  This will be resolved when tackling
+        # Inventory v2.
+        self._load_fanout([self.RESOURCE_NAME, self.SERVICES_RESOURCE_NAME,
+                           self.VERSIONS_RESOURCE_NAME,
+                           self.INSTANCES_RESOURCE_NAME], rows)
 
         self._get_loaded_count()
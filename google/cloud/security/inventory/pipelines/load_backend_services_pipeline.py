@@ -88,10 +88,10 @@ class LoadBackendServicesPipeline(base_pipeline.BasePipeline):
         projects = (proj_dao
                     .ProjectDao(self.global_configs)
                     .get_projects(self.cycle_timestamp))
+        results = self.safe_api_calls(
+            'get_backend_services', [(project.id,) for project in projects])
         backend_services = {}
-        for project in projects:
-            project_backend_services = self.safe_api_call(
-                'get_backend_services', project.id)
+        for project, project_backend_services in zip(projects, results):
             if project_backend_services:
                 backend_services[project.id] = project_backend_services
 
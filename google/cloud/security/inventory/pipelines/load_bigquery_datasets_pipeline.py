@@ -14,12 +14,20 @@
 
 """Pipeline to load bigquery datasets data into Inventory."""
 
+import collections
+
+import concurrent.futures
+
 from google.cloud.security.common.util import log_util
 from google.cloud.security.common.util import parser
 from google.cloud.security.inventory.pipelines import base_pipeline
 
 LOGGER = log_util.get_logger(__name__)
 
+# The maximum number of listed datasets waiting for their access lists to be
+# retrieved, before the listing of datasets pauses.
+DATASET_QUEUE_SIZE = 1000
+
 
 class LoadBigqueryDatasetsPipeline(base_pipeline.BasePipeline):
     """Pipeline to load bigquery datasets data into Inventory."""
@@ -52,53 +60,98 @@ class LoadBigqueryDatasetsPipeline(base_pipeline.BasePipeline):
         """
         return self.safe_api_call('get_dataset_access', project_id, dataset_id)
 
-    def _retrieve_dataset_project_map(self, project_ids):
-        """Retrieve the bigquery datasets for all requested project ids.
+    def _retrieve_datasets(self, project_id):
+        """Retrieve the bigquery datasets of a project.
 
         Args:
-            project_ids (list): Project ids.
+            project_id (str): A project id.
 
         Returns:
-            list: A list of objects like:
-                [[{'datasetId': 'test', 'projectId': 'bq-test'},
-                 {'datasetId': 'test', 'projectId': 'bq-test'}],
+            list: The datasets of the project, like:
                 [{'datasetId': 'test', 'projectId': 'bq-test'},
-                 {'datasetId': 'test', 'projectId': 'bq-test'}]]
+                 {'datasetId': 'test', 'projectId': 'bq-test'}]
         """
-        dataset_project_map = []
-        for project_id in project_ids:
-            result = self.safe_api_call('get_datasets_for_projectid',
-                                        project_id)
-            if result:
-                dataset_project_map.append(result)
-        return dataset_project_map
+        return self.safe_api_call('get_datasets_for_projectid',
+                                  project_id) or []
+
+    def _get_num_workers(self):
+        """Get how many API calls the crawl can run at once.
 
-    def _retrieve_dataset_access_map(self, dataset_project_map):
-        """Iteriate through projects and their datasets to get ACLs.
+        Returns:
+            int: max_workers, bounded by the BigQuery API calls per second
+                quota.
+        """
+        num_workers = self.max_workers
+        max_calls = self.global_configs.get(
+            'max_bigquery_api_calls_per_100_seconds')
+        if max_calls:
+            num_workers = min(num_workers, max_calls // 100)
+        return max(1, num_workers)
+
+    def _retrieve_dataset_access_map(self, project_ids):
+        """Retrieve the access lists of the datasets of the projects.
+
+        With more than one worker, the datasets are listed and their access
+        lists are retrieved at the same time. The listed datasets wait in a
+        queue of up to DATASET_QUEUE_SIZE datasets, and up to half of the
+        workers list datasets while the queue has room.
 
         Args:
-            dataset_project_map (list): A list of projects and their datasets.
-                See the output of _retrieve_dataset_project_map().
+            project_ids (list): Project ids.
 
-        Returns:
-            list: A list of tuples in the form of:
-                [(project_id,
-                  dataset_id,
-                  {dataset_access_object}),
-                ...]
+        Yields:
+            tuple: (project_id, dataset_id, [dataset_access_object]) of each
+                dataset with an access list, as they are retrieved.
         """
-        dataset_project_access_map = []
-        for map_item in dataset_project_map:
-            for item in map_item:
-                project_id = item.get('projectId')
-                dataset_id = item.get('datasetId')
-                dataset_acl = self._retrieve_dataset_access(project_id,
-                                                            dataset_id)
-                if dataset_acl:
-                    dataset_project_access_map.append(
-                        (project_id, dataset_id, dataset_acl)
-                        )
-        return dataset_project_access_map
+        num_workers = self._get_num_workers()
+        if num_workers == 1:
+            for requested_project_id in project_ids:
+                for dataset in self._retrieve_datasets(requested_project_id):
+                    project_id = dataset.get('projectId')
+                    dataset_id = dataset.get('datasetId')
+                    dataset_acl = self._retrieve_dataset_access(project_id,
+                                                                dataset_id)
+                    if dataset_acl:
+                        yield project_id, dataset_id, dataset_acl
+            return
+
+        max_listings = max(1, num_workers // 2)
+        projects = collections.deque(project_ids)
+        datasets = collections.deque()
+        listings = {}
+        accesses = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_workers) as executor:
+            while True:
+                while (projects and len(listings) < max_listings and
+                       len(datasets) < DATASET_QUEUE_SIZE):
+                    listings[executor.submit(
+                        self._retrieve_datasets,
+                        projects.popleft())] = None
+                while (datasets and
+                       len(listings) + len(accesses) < num_workers):
+                    project_id, dataset_id = datasets.popleft()
+                    accesses[executor.submit(
+                        self._retrieve_dataset_access,
+                        project_id, dataset_id)] = (project_id, dataset_id)
+                if not listings and not accesses:
+                    break
+
+                done, _ = concurrent.futures.wait(
+                    listings.keys() + accesses.keys(),
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future in listings:
+                        del listings[future]
+                        datasets.extend(
+                            (dataset.get('projectId'),
+                             dataset.get('datasetId'))
+                            for dataset in future.result())
+                        continue
+                    project_id, dataset_id = accesses.pop(future)
+                    dataset_acl = future.result()
+                    if dataset_acl:
+                        yield project_id, dataset_id, dataset_acl
 
     def _transform(self, resource_from_api):
         """Yield an iterator of loadable groups.
@@ -133,9 +186,9 @@ class LoadBigqueryDatasetsPipeline(base_pipeline.BasePipeline):
         """Retrieve dataset access lists.
 
         Returns:
-            bigquery_dataset: A bigquery dataset access map.
-                See _retrieve_dataset_access_map() or
-                None if there are no bigquery projects.
+            iterable: The dataset access lists, retrieved as they are
+                iterated, see _retrieve_dataset_access_map(), or None if
+                there are no bigquery projects.
         """
         project_ids = self._retrieve_bigquery_projectids()
 
@@ -143,11 +196,13 @@ class LoadBigqueryDatasetsPipeline(base_pipeline.BasePipeline):
             LOGGER.info('No bigquery project ids found.')
             return None
 
-        dataset_project_map = self._retrieve_dataset_project_map(project_ids)
-        return self._retrieve_dataset_access_map(dataset_project_map)
+        return self._retrieve_dataset_access_map(project_ids)
 
     def run(self):
-        """Runs the actual data fetching pipeline."""
+        """Runs the actual data fetching pipeline.
+
+        The access lists are transformed and loaded as they are retrieved.
+        """
         dataset_project_access_map = self._retrieve()
 
         if dataset_project_access_map is not None:
@@ -106,9 +106,9 @@ class LoadFirewallRulesPipeline(base_pipeline.BasePipeline):
         projects = (proj_dao
                     .ProjectDao(self.global_configs)
                     .get_projects(self.cycle_timestamp))
-        for project in projects:
-            firewall_rules = self.safe_api_call('get_firewall_rules',
-                                                project.id)
+        results = self.safe_api_calls(
+            'get_firewall_rules', [(project.id,) for project in projects])
+        for project, firewall_rules in zip(projects, results):
             if firewall_rules:
                 firewall_rules_map[project.id] = firewall_rules
         return firewall_rules_map
@@ -78,14 +78,10 @@ class LoadFolderIamPoliciesPipeline(base_pipeline.BasePipeline):
         except da_errors.MySQLError as e:
             raise inventory_errors.LoadDataPipelineError(e)
 
-        iam_policies = []
-        for folder in folders:
-            iam_policy = self.safe_api_call('get_folder_iam_policies',
-                                            self.RESOURCE_NAME,
-                                            folder.id)
-            if iam_policy:
-                iam_policies.append(iam_policy)
-        return iam_policies
+        results = self.safe_api_calls(
+            'get_folder_iam_policies',
+            [(self.RESOURCE_NAME, folder.id) for folder in folders])
+        return [iam_policy for iam_policy in results if iam_policy]
 
     def run(self):
         """Runs the data pipeline."""
@@ -80,10 +80,10 @@ class LoadForwardingRulesPipeline(base_pipeline.BasePipeline):
         projects = (proj_dao
                     .ProjectDao(self.global_configs)
                     .get_projects(self.cycle_timestamp))
+        results = self.safe_api_calls(
+            'get_forwarding_rules', [(project.id,) for project in projects])
         forwarding_rules = {}
-        for project in projects:
-            project_fwd_rules = self.safe_api_call('get_forwarding_rules',
-                                                   project.id)
+        for project, project_fwd_rules in zip(projects, results):
             if project_fwd_rules:
                 forwarding_rules[project.id] = project_fwd_rules
         return forwarding_rules
@@ -77,10 +77,11 @@ class LoadInstanceGroupManagersPipeline(base_pipeline.BasePipeline):
         projects = (proj_dao
                     .ProjectDao(self.global_configs)
                     .get_projects(self.cycle_timestamp))
+        results = self.safe_api_calls(
+            'get_instance_group_managers',
+            [(project.id,) for project in projects])
         igms = {}
-        for project in projects:
-            project_igms = self.safe_api_call('get_instance_group_managers',
-                                              project.id)
+        for project, project_igms in zip(projects, results):
             if project_igms:
                 igms[project.id] = project_igms
         return igms
@@ -74,10 +74,10 @@ class LoadInstanceGroupsPipeline(base_pipeline.BasePipeline):
         projects = (proj_dao
                     .ProjectDao(self.global_configs)
                     .get_projects(self.cycle_timestamp))
+        results = self.safe_api_calls(
+            'get_instance_groups', [(project.id,) for project in projects])
         igs = {}
-        for project in projects:
-            project_igs = self.safe_api_call('get_instance_groups',
-                                             project.id)
+        for project, project_igs in zip(projects, results):
             if project_igs:
                 igs[project.id] = project_igs
         return igs
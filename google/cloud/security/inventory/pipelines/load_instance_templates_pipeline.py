@@ -67,10 +67,10 @@ class LoadInstanceTemplatesPipeline(base_pipeline.BasePipeline):
         projects = (proj_dao
                     .ProjectDao(self.global_configs)
                     .get_projects(self.cycle_timestamp))
+        results = self.safe_api_calls(
+            'get_instance_templates', [(project.id,) for project in projects])
         instance_templates = {}
-        for project in projects:
-            project_instance_templates = self.safe_api_call(
-                'get_instance_templates', project.id)
+        for project, project_instance_templates in zip(projects, results):
             if project_instance_templates:
                 instance_templates[project.id] = project_instance_templates
         return instance_templates
@@ -82,10 +82,10 @@ class LoadInstancesPipeline(base_pipeline.BasePipeline):
         projects = (proj_dao
                     .ProjectDao(self.global_configs)
                     .get_projects(self.cycle_timestamp))
+        results = self.safe_api_calls(
+            'get_instances', [(project.id,) for project in projects])
         instances = {}
-        for project in projects:
-            project_instances = self.safe_api_call('get_instances',
-                                                   project.id)
+        for project, project_instances in zip(projects, results):
             if project_instances:
                 instances[project.id] = project_instances
         return instances
@@ -79,14 +79,10 @@ class LoadOrgIamPoliciesPipeline(base_pipeline.BasePipeline):
         except da_errors.MySQLError as e:
             raise inventory_errors.LoadDataPipelineError(e)
 
-        iam_policies = []
-        for org in orgs:
-            iam_policy = self.safe_api_call('get_org_iam_policies',
-                                            self.RESOURCE_NAME,
-                                            org.id)
-            if iam_policy:
-                iam_policies.append(iam_policy)
-        return iam_policies
+        results = self.safe_api_calls(
+            'get_org_iam_policies',
+            [(self.RESOURCE_NAME, org.id) for org in orgs])
+        return [iam_policy for iam_policy in results if iam_policy]
 
     def run(self):
         """Runs the data pipeline."""
@@ -109,9 +109,11 @@ class LoadProjectsBucketsPipeline(base_pipeline.BasePipeline):
         except dao_errors.MySQLError as e:
             raise inventory_errors.LoadDataPipelineError(e)
         # Retrieve data from GCP.
+        results = self.safe_api_calls(
+            'get_buckets',
+            [(project_number,) for project_number in project_numbers])
         buckets_maps = []
-        for project_number in project_numbers:
-            buckets = self.safe_api_call('get_buckets', project_number)
+        for project_number, buckets in zip(project_numbers, results):
             if buckets:
                 buckets_map = {'project_number': project_number,
                                'buckets': buckets}
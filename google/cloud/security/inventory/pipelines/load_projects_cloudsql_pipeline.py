@@ -14,6 +14,7 @@
 
 """Pipeline to load project cloudsql data into Inventory."""
 
+import itertools
 import json
 
 from dateutil import parser as dateutil_parser
@@ -245,35 +246,33 @@ class LoadProjectsCloudsqlPipeline(base_pipeline.BasePipeline):
                         'time_to_retire': formatted_timetoretire
                     }
 
-    # pylint: disable=arguments-differ
-    def _transform(self, cloudsql_instances_map):
-        """returns a dictionary of generators for a different types of resources
+    def _transform(self, resource_from_api):
+        """Yield the rows of the instances and of their ip addresses and
+        authorized networks, in a single pass over the instances.
 
         Args:
-            cloudsql_instances_map (iterable): instances as per-project
+            resource_from_api (iterable): instances as per-project
                 dictionary.
                 Example: {'project_number': 11111,
                           'instances': instances_dict}
 
-        Returns:
-            dict: iterables as a per resource type
+        Yields:
+            tuple: (resource name, row) of each loadable row.
         """
-
-        data_dict = {}
-        data_dict[self.RESOURCE_NAME_INSTANCES] = \
-            self._transform_data(cloudsql_instances_map)
-        data_dict[self.RESOURCE_NAME_AUTHORIZEDNETWORKS] = \
-            self._transform_authorizednetworks(cloudsql_instances_map)
-        data_dict[self.RESOURCE_NAME_IPADDRESSES] = \
-            self._transform_ipaddresses(cloudsql_instances_map)
-
-        return data_dict
+        for instances_map in resource_from_api:
+            for row in self._transform_data([instances_map]):
+                yield self.RESOURCE_NAME_INSTANCES, row
+            for row in self._transform_ipaddresses([instances_map]):
+                yield self.RESOURCE_NAME_IPADDRESSES, row
+            for row in self._transform_authorizednetworks([instances_map]):
+                yield self.RESOURCE_NAME_AUTHORIZEDNETWORKS, row
 
     def _retrieve(self):
         """Retrieve the project cloudsql instances from GCP.
 
         Returns:
-            list: Instances as per-project dictionary.
+            iterable: Instances as per-project dictionary, fetched from the
+                API as they are iterated.
                 Example: [{project_number: project_number,
                           instances: instances_dict}]
 
@@ -287,14 +286,13 @@ class LoadProjectsCloudsqlPipeline(base_pipeline.BasePipeline):
         except dao_errors.MySQLError as e:
             raise inventory_errors.LoadDataPipelineError(e)
 
-        instances_maps = []
-        for project_number in project_numbers:
-            instances = self.safe_api_call('get_instances', project_number)
-            if instances:
-                instances_map = {'project_number': project_number,
-                                 'instances': instances}
-                instances_maps.append(instances_map)
-        return instances_maps
+        results = self.safe_api_calls(
+            'get_instances',
+            [(project_number,) for project_number in project_numbers])
+        return ({'project_number': project_number, 'instances': instances}
+                for project_number, instances in itertools.izip(
+                    project_numbers, results)
+                if instances)
 
     def _get_loaded_count(self):
         """Get the count of how many of a instances has been loaded."""
@@ -309,14 +307,10 @@ class LoadProjectsCloudsqlPipeline(base_pipeline.BasePipeline):
     def run(self):
         """Runs the load Cloudsql data pipeline."""
         instances_maps = self._retrieve()
-        loadable_instances_dict = self._transform(instances_maps)
-
-        self._load(self.RESOURCE_NAME_INSTANCES, \
-                loadable_instances_dict[self.RESOURCE_NAME_INSTANCES])
-        self._load(self.RESOURCE_NAME_IPADDRESSES, \
-                loadable_instances_dict[self.RESOURCE_NAME_IPADDRESSES])
-        self._load(self.RESOURCE_NAME_AUTHORIZEDNETWORKS, \
-                loadable_instances_dict[
-                    self.RESOURCE_NAME_AUTHORIZEDNETWORKS
-                    ])
+        loadable_instances = self._transform(instances_maps)
+
+        self._load_fanout([self.RESOURCE_NAME_INSTANCES,
+                           self.RESOURCE_NAME_IPADDRESSES,
+                           self.RESOURCE_NAME_AUTHORIZEDNETWORKS],
+                          loadable_instances)
         self._get_loaded_count()
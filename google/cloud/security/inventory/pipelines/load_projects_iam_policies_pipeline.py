@@ -14,6 +14,7 @@
 
 """Pipeline to load project IAM policies data into Inventory."""
 
+import itertools
 import json
 
 from google.cloud.security.common.data_access import errors as dao_errors
@@ -42,7 +43,8 @@ class LoadProjectsIamPoliciesPipeline(base_pipeline.BasePipeline):
                 https://cloud.google.com/resource-manager/reference/rest/Shared.Types/Policy
 
         Yields:
-            iterable: Loadable iam policies, as a per-org dictionary.
+            tuple: (resource name, row) of the loadable iam policy bindings,
+                followed by the raw iam policy, of each project.
         """
         for iam_policy_map in resource_from_api:
             iam_policy = iam_policy_map['iam_policy']
@@ -55,18 +57,27 @@ class LoadProjectsIamPoliciesPipeline(base_pipeline.BasePipeline):
                     role = binding.get('role', '')
                     if role.startswith('roles/'):
                         role = role.replace('roles/', '')
-                        yield {
+                        yield self.RESOURCE_NAME, {
                             'project_number': iam_policy_map['project_number'],
                             'role': role,
                             'member_type': member_type,
                             'member_name': member_name,
                             'member_domain': member_domain}
 
+            # A separate table is used to store the raw iam policies json
+            # because it is much faster than updating these individually
+            # into the projects table.
+            yield self.RAW_RESOURCE_NAME, {
+                'project_number': iam_policy_map['project_number'],
+                'iam_policy': json.dumps(iam_policy)}
+
     def _retrieve(self):
         """Retrieve the project IAM policies from GCP.
 
         Returns:
-            list: IAM policies as per-org dictionary.
+            iterable: IAM policies as per-project dictionary, fetched
+                from the API one batch request at a time as they are
+                iterated.
                 Example: [{project_number: project_number,
                           iam_policy: iam_policy}]
                 https://cloud.google.com/resource-manager/reference/rest/Shared.Types/Policy
@@ -82,17 +93,13 @@ class LoadProjectsIamPoliciesPipeline(base_pipeline.BasePipeline):
             raise inventory_errors.LoadDataPipelineError(e)
 
         # Retrieve data from GCP.
-        # Not using iterator since we will use the iam_policy_maps twice.
-        iam_policy_maps = []
-        for project_number in project_numbers:
-            iam_policy = self.safe_api_call('get_project_iam_policies',
-                                            self.RESOURCE_NAME,
-                                            project_number)
-            if iam_policy:
-                iam_policy_map = {'project_number': project_number,
-                                  'iam_policy': iam_policy}
-                iam_policy_maps.append(iam_policy_map)
-        return iam_policy_maps
+        results = self.safe_batch_api_call(
+            'get_project_iam_policies_batch', self.RESOURCE_NAME,
+            project_numbers)
+        return ({'project_number': project_number, 'iam_policy': iam_policy}
+                for project_number, iam_policy in itertools.izip(
+                    project_numbers, results)
+                if iam_policy)
 
     def run(self):
         """Runs the load IAM policies data pipeline."""
@@ -100,13 +107,7 @@ class LoadProjectsIamPoliciesPipeline(base_pipeline.BasePipeline):
 
         loadable_iam_policies = self._transform(iam_policy_maps)
 
-        self._load(self.RESOURCE_NAME, loadable_iam_policies)
-
-        # A separate table is used to store the raw iam policies json
-        # because it is much faster than updating these individually
-        # into the projects table.
-        for i in iam_policy_maps:
-            i['iam_policy'] = json.dumps(i['iam_policy'])
-        self._load(self.RAW_RESOURCE_NAME, iam_policy_maps)
+        self._load_fanout([self.RESOURCE_NAME, self.RAW_RESOURCE_NAME],
+                          loadable_iam_policies)
 
         self._get_loaded_count()
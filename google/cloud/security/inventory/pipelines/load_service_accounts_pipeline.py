@@ -39,19 +39,26 @@ class LoadServiceAccountsPipeline(base_pipeline.BasePipeline):
             proj_dao
             .ProjectDao(self.global_configs)
             .get_projects(self.cycle_timestamp))
+        results = self.safe_api_calls(
+            'get_service_accounts', [(project.id,) for project in projects])
         service_accounts_per_project = {}
-        for project in projects:
-            service_accounts = self.safe_api_call('get_service_accounts',
-                                                  project.id)
+        for project, service_accounts in zip(projects, results):
             if service_accounts:
-                for service_account in service_accounts:
-                    # TODO: also retrieve associated IAM policies, see:
-                    # https://cloud.google.com/iam/reference/rest/v1/projects.serviceAccounts
-                    keys = self.safe_api_call(
-                        'get_service_account_keys', service_account['name'])
-                    if keys:
-                        service_account['keys'] = keys
                 service_accounts_per_project[project.id] = service_accounts
+
+        # TODO: also retrieve associated IAM policies, see:
+        # https://cloud.google.com/iam/reference/rest/v1/projects.serviceAccounts
+        all_service_accounts = [
+            service_account
+            for service_accounts in service_accounts_per_project.values()
+            for service_account in service_accounts]
+        all_keys = self.safe_batch_api_call(
+            'get_service_account_keys_batch',
+            [service_account['name']
+             for service_account in all_service_accounts])
+        for service_account, keys in zip(all_service_accounts, all_keys):
+            if keys:
+                service_account['keys'] = keys
         return service_accounts_per_project
 
     def _transform(self, resource_from_api):
@@ -25,6 +25,8 @@ Usage:
 import importlib
 import inspect
 import sys
+
+import concurrent.futures
 import gflags as flags
 
 # pylint: disable=line-too-long
@@ -108,6 +110,35 @@ def _get_timestamp(global_configs, statuses=('SUCCESS', 'PARTIAL_SUCCESS')):
 
     return latest_timestamp
 
+def _run_pipelines(pipelines, max_workers):
+    """Run the notification pipelines.
+
+    The pipelines are independent, so they are run on a bounded thread pool
+    when more than one worker is configured. A failed pipeline is logged and
+    does not prevent the other pipelines from notifying.
+
+    Args:
+        pipelines (list): The pipelines to run.
+        max_workers (int): The maximum number of pipelines to run at
+            the same time.
+    """
+    if max_workers <= 1:
+        for pipeline in pipelines:
+            pipeline.run()
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers) as executor:
+        futures = {executor.submit(pipeline.run): pipeline
+                   for pipeline in pipelines}
+        for future in concurrent.futures.as_completed(futures):
+            pipeline = futures[future]
+            try:
+                future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                LOGGER.error('Pipeline %s for resource \'%s\' failed: %s',
+                             pipeline.__class__.__name__, pipeline.resource, e)
+
 def process(message):
     """Process messages about what notifications to send.
 
@@ -217,8 +248,8 @@ def main(_):
                                              pipeline['configuration']))
 
     # run the pipelines
-    for pipeline in pipelines:
-        pipeline.run()
+    _run_pipelines(pipelines,
+                   notifier_configs.get('max_concurrent_pipelines', 1))
 
 
 if __name__ == '__main__':
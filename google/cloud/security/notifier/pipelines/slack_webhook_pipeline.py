@@ -13,6 +13,9 @@
 # limitations under the License.
 """Slack webhook pipeline to perform notifications."""
 
+import time
+
+import concurrent.futures
 import requests
 
 # TODO: Investigate improving so we can avoid the pylint disable.
@@ -27,6 +30,15 @@ TEMP_DIR = '/tmp'
 VIOLATIONS_JSON_FMT = 'violations.{}.{}.{}.json'
 OUTPUT_TIMESTAMP_FMT = '%Y%m%dT%H%M%SZ'
 
+# Slack truncates the text of a message beyond this many characters.
+MAX_MESSAGE_LENGTH = 40000
+MESSAGE_SEPARATOR = '\n'
+
+# Retries of a post which is rate limited by Slack.
+MAX_RETRIES = 5
+INITIAL_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
 
 class SlackWebhookPipeline(bnp.BaseNotificationPipeline):
     """Slack webhook pipeline to perform notifications"""
@@ -72,16 +84,69 @@ class SlackWebhookPipeline(bnp.BaseNotificationPipeline):
 
         return self._dump_slack_output(payload)
 
+    def _batch(self, payloads):
+        """Aggregate payloads into messages.
+
+        Args:
+            payloads (iterable): The formatted violations.
+
+        Yields:
+            str: Messages of up to violations_per_message payloads, which
+                are not made longer than MAX_MESSAGE_LENGTH by batching.
+        """
+        violations_per_message = max(
+            1, self.pipeline_config.get('violations_per_message', 1))
+        batch = []
+        length = 0
+        for payload in payloads:
+            if batch and (
+                    len(batch) >= violations_per_message or
+                    length + len(MESSAGE_SEPARATOR) + len(payload) >
+                    MAX_MESSAGE_LENGTH):
+                yield MESSAGE_SEPARATOR.join(batch)
+                batch = []
+                length = 0
+            if batch:
+                length += len(MESSAGE_SEPARATOR)
+            batch.append(payload)
+            length += len(payload)
+        if batch:
+            yield MESSAGE_SEPARATOR.join(batch)
+
     def _send(self, **kwargs):
         """Sends a post to a Slack webhook url
 
+        A post which is rate limited is retried after the delay requested
+        by Slack in the Retry-After header, or with exponential backoff, up
+        to MAX_RETRIES posts. A post which still fails is logged as an
+        error.
+
         Args:
             **kwargs: Arbitrary keyword arguments.
-                payload: violation data for body of POST request\
+                payload: violation data for body of POST request
+                session: requests.Session to post with, optional
         """
         url = self.pipeline_config.get('webhook_url')
-        request = requests.post(url, json={'text': kwargs.get('payload')})
-
+        session = kwargs.get('session') or requests
+        delay = INITIAL_RETRY_DELAY
+        for attempt in range(1, MAX_RETRIES + 1):
+            request = session.post(url, json={'text': kwargs.get('payload')})
+            if request.status_code != 429 or attempt == MAX_RETRIES:
+                break
+            try:
+                retry_after = float(request.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                retry_after = delay
+            LOGGER.warn('Slack rate limited the notification, retrying in '
+                        '%s seconds.', retry_after)
+            time.sleep(min(retry_after, MAX_RETRY_DELAY))
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+        if not 200 <= request.status_code < 300:
+            LOGGER.error('Unable to send the Slack notification, the post '
+                         'failed with status %s: %s',
+                         request.status_code, request.text)
+            return
         LOGGER.info(request)
 
     def run(self):
@@ -90,6 +155,22 @@ class SlackWebhookPipeline(bnp.BaseNotificationPipeline):
             LOGGER.warn('No url found, not running Slack pipeline.')
             return
 
-        for violation in self.violations:
-            webhook_payload = self._compose(violation=violation)
-            self._send(payload=webhook_payload)
+        messages = self._batch(self._compose(violation=violation)
+                               for violation in self.violations)
+        max_workers = max(1, self.pipeline_config.get('max_workers', 1))
+        session = requests.Session()
+        try:
+            if max_workers == 1:
+                for message in messages:
+                    self._send(payload=message, session=session)
+                return
+
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers) as executor:
+                futures = [executor.submit(self._send, payload=message,
+                                           session=session)
+                           for message in messages]
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+        finally:
+            session.close()
@@ -28,6 +28,22 @@ from google.cloud.security.scanner.audit import errors as audit_errors
 
 LOGGER = log_util.get_logger(__name__)
 
+# Rule violation.
+# resource_type: string
+# resource_id: string
+# rule_name: string
+# rule_index: int
+# violation_type: BUCKET_VIOLATION
+# role: string
+# entity: string
+# email: string
+# domain: string
+# bucket: string
+RuleViolation = namedtuple('RuleViolation',
+                           ['resource_type', 'resource_id', 'rule_name',
+                            'rule_index', 'violation_type', 'role',
+                            'entity', 'email', 'domain', 'bucket'])
+
 
 class BucketsRulesEngine(bre.BaseRulesEngine):
     """Rules engine for bucket acls"""
@@ -241,18 +257,5 @@ class Rule(object):
                 domain=bucket_acl.domain,
                 bucket=bucket_acl.bucket)
 
-    # Rule violation.
-    # resource_type: string
-    # resource_id: string
-    # rule_name: string
-    # rule_index: int
-    # violation_type: BUCKET_VIOLATION
-    # role: string
-    # entity: string
-    # email: string
-    # domain: string
-    # bucket: string
-    RuleViolation = namedtuple('RuleViolation',
-                               ['resource_type', 'resource_id', 'rule_name',
-                                'rule_index', 'violation_type', 'role',
-                                'entity', 'email', 'domain', 'bucket'])
+    # Defined at module level, so that violations can be pickled.
+    RuleViolation = RuleViolation
@@ -160,7 +160,7 @@ class RuleBook(bre.BaseRuleBook):
         self.rule_groups_map = {}
         self.org_policy_rules_map = {}
         self.org_res_rel_dao = org_resource_rel_dao.OrgResourceRelDao(
-            global_configs)
+            global_configs, use_hierarchy_index=True)
         self.snapshot_timestamp = snapshot_timestamp or None
         self._repository_lock = threading.RLock()
         if rule_defs:
@@ -20,6 +20,7 @@ determine whether there are violations.
 """
 
 import itertools
+import re
 import threading
 
 from google.cloud.security.common.data_access import org_resource_rel_dao
@@ -36,48 +37,188 @@ from google.cloud.security.scanner.audit import errors as audit_errors
 LOGGER = log_util.get_logger(__name__)
 
 
-def _check_whitelist_members(rule_members=None, policy_members=None):
+def _combine_patterns(patterns):
+    """Combine compiled patterns into a single alternation regex.
+
+    Args:
+        patterns (list): Compiled (anchored) regex patterns.
+
+    Returns:
+        RegexObject: A regex matching anything one of the patterns matches,
+            or None if there are no patterns.
+    """
+    if not patterns:
+        return None
+    return re.compile(
+        '|'.join('(?:{})'.format(p.pattern) for p in patterns),
+        flags=re.IGNORECASE)
+
+
+class MemberMatcher(object):
+    """Rule binding members, compiled for matching policy members.
+
+    Exact member names are kept in a hash set and the glob member names of
+    each member type are combined into one regex, so matching a policy
+    member costs a set lookup and at most one regex match, regardless of
+    how many members the rule binding has.
+    """
+
+    def __init__(self, rule_members):
+        """Initialize.
+
+        Args:
+            rule_members (list): The IamPolicyMembers of the rule binding.
+        """
+        self.rule_members = rule_members
+        self._match_all = False
+        self._any_name_types = set()
+        self._exact_names = set()
+        glob_patterns = {}
+        for rule_member in rule_members:
+            if rule_member.type == iam_policy.IamPolicyMember.ALL_USERS:
+                self._match_all = True
+            elif not rule_member.name:
+                self._any_name_types.add(rule_member.type)
+            elif '*' in rule_member.name:
+                glob_patterns.setdefault(rule_member.type, []).append(
+                    rule_member.name_pattern)
+            else:
+                self._exact_names.add(
+                    (rule_member.type, rule_member.name.lower()))
+        self._glob_patterns = {
+            member_type: _combine_patterns(patterns)
+            for (member_type, patterns) in glob_patterns.iteritems()}
+
+    def matches(self, policy_member):
+        """Determine if a policy member matches any of the rule members.
+
+        Args:
+            policy_member (IamPolicyMember): The policy binding member.
+
+        Returns:
+            bool: True if a rule member matches the policy member.
+        """
+        if self._match_all or policy_member.type in self._any_name_types:
+            return True
+        if not policy_member.name:
+            return False
+        if ((policy_member.type, policy_member.name.lower()) in
+                self._exact_names):
+            return True
+        pattern = self._glob_patterns.get(policy_member.type)
+        return bool(pattern and pattern.match(policy_member.name))
+
+    def find_missing(self, policy_members):
+        """Find the rule members that no policy member matches.
+
+        Args:
+            policy_members (list): IamPolicyMembers in the policy.
+
+        Returns:
+            list: The rule members not found in the policy members.
+        """
+        policy_types = set()
+        policy_names = set()
+        for policy_member in policy_members:
+            policy_types.add(policy_member.type)
+            if policy_member.name:
+                policy_names.add(
+                    (policy_member.type, policy_member.name.lower()))
+
+        missing_members = []
+        for rule_member in self.rule_members:
+            if rule_member.type == iam_policy.IamPolicyMember.ALL_USERS:
+                found = bool(policy_members)
+            elif not rule_member.name:
+                found = rule_member.type in policy_types
+            elif '*' not in rule_member.name:
+                found = ((rule_member.type, rule_member.name.lower()) in
+                         policy_names)
+            else:
+                found = any(rule_member.matches(m) for m in policy_members
+                            if m.name)
+            if not found:
+                missing_members.append(rule_member)
+        return missing_members
+
+
+class RuleMatcher(object):
+    """The bindings of a Rule, compiled for matching policy bindings.
+
+    Rule bindings with exact role names are indexed by role name; the
+    glob roles are screened with one combined regex before the individual
+    role patterns are tried.
+    """
+
+    def __init__(self, rule):
+        """Initialize.
+
+        Args:
+            rule (Rule): The rule to compile.
+        """
+        self.member_matchers = [
+            MemberMatcher(b.members) for b in rule.bindings]
+        self._exact_roles = {}
+        self._glob_roles = []
+        for (i, rule_binding) in enumerate(rule.bindings):
+            if '*' in rule_binding.role_name:
+                self._glob_roles.append((i, rule_binding.role_pattern))
+            else:
+                self._exact_roles.setdefault(
+                    rule_binding.role_name.lower(), []).append(i)
+        self._any_glob_role = _combine_patterns(
+            [pattern for (_, pattern) in self._glob_roles])
+
+    def find_binding_indexes(self, role_name):
+        """Find the rule bindings whose role matches a policy role.
+
+        Args:
+            role_name (str): The role name of the policy binding.
+
+        Returns:
+            list: The indexes of the matching rule bindings, in rule order.
+        """
+        indexes = list(self._exact_roles.get(role_name.lower(), []))
+        if self._any_glob_role and self._any_glob_role.match(role_name):
+            indexes.extend(i for (i, pattern) in self._glob_roles
+                           if pattern.match(role_name))
+            indexes.sort()
+        return indexes
+
+
+def _check_whitelist_members(member_matcher, policy_members):
     """Whitelist: Check that policy members ARE in rule members.
 
     If a policy member is NOT found in the rule members, add it to
     the violating members.
 
     Args:
-        rule_members (list): IamPolicyMembers allowed in the rule.
+        member_matcher (MemberMatcher): The compiled rule members.
         policy_members (list): IamPolicyMembers in the policy.
 
     Return:
         list: Policy members NOT found in the whitelist (rule members).
     """
-    violating_members = []
-    for policy_member in policy_members:
-        # check if policy_member is found in rule_members
-        if not any(r.matches(policy_member) for r in rule_members):
-            violating_members.append(policy_member)
-    return violating_members
-
-def _check_blacklist_members(rule_members=None, policy_members=None):
+    return [policy_member for policy_member in policy_members
+            if not member_matcher.matches(policy_member)]
+
+def _check_blacklist_members(member_matcher, policy_members):
     """Blacklist: Check that policy members ARE NOT in rule members.
 
     If a policy member is found in the rule members, add it to the
     violating members.
 
     Args:
-        rule_members (list): IamPolicyMembers allowed in the rule.
+        member_matcher (MemberMatcher): The compiled rule members.
         policy_members (list): IamPolicyMembers in the policy.
 
     Return:
         list: Policy members found in the blacklist (rule members).
     """
-    violating_members = [
-        policy_member
-        for policy_member in policy_members
-        for rule_member in rule_members
-        if rule_member.matches(policy_member)
-    ]
-    return violating_members
-
-def _check_required_members(rule_members=None, policy_members=None):
+    return [policy_member for policy_member in policy_members
+            if member_matcher.matches(policy_member)]
+
+def _check_required_members(member_matcher, policy_members):
     """Required: Check that rule members are in policy members.
 
     If a required rule member is NOT found in the policy members, add
@@ -86,18 +227,13 @@ def _check_required_members(rule_members=None, policy_members=None):
     rules vs rules as subset of policy).
 
     Args:
-        rule_members (list): IamPolicyMembers allowed in the rule.
+        member_matcher (MemberMatcher): The compiled rule members.
         policy_members (list): IamPolicyMembers in the policy.
 
     Return:
         list: Rule members not found in the policy (required-whitelist).
     """
-    violating_members = []
-    for rule_member in rule_members:
-        # check if rule_member is found in policy_members
-        if not any(rule_member.matches(m) for m in policy_members):
-            violating_members.append(rule_member)
-    return violating_members
+    return member_matcher.find_missing(policy_members)
 
 
 class IamRulesEngine(bre.BaseRulesEngine):
@@ -215,7 +351,7 @@ class IamRuleBook(bre.BaseRuleBook):
         if snapshot_timestamp:
             self.snapshot_timestamp = snapshot_timestamp
         self.org_res_rel_dao = org_resource_rel_dao.OrgResourceRelDao(
-            global_configs)
+            global_configs, use_hierarchy_index=True)
 
     def __eq__(self, other):
         """Equals.
@@ -309,6 +445,7 @@ class IamRuleBook(bre.BaseRuleBook):
 
         try:
             resources = rule_def.get('resource')
+            rule_matcher = None
 
             for resource in resources:
                 resource_ids = resource.get('resource_ids')
@@ -358,7 +495,9 @@ class IamRuleBook(bre.BaseRuleBook):
 
                     # If the rule isn't in the mapping, add it.
                     if rule not in resource_rules.rules:
-                        resource_rules.rules.add(rule)
+                        if rule_matcher is None:
+                            rule_matcher = RuleMatcher(rule)
+                        resource_rules.add_rule(rule, rule_matcher)
         finally:
             self._rules_sema.release()
 
@@ -490,6 +629,7 @@ class ResourceRules(object):
         self.rules = rules
         self.applies_to = scanner_rules.RuleAppliesTo.verify(applies_to)
         self.inherit_from_parents = inherit_from_parents
+        self._rule_matchers = {}
 
         self._rule_mode_methods = {
             scanner_rules.RuleMode.WHITELIST: _check_whitelist_members,
@@ -535,6 +675,32 @@ class ResourceRules(object):
                     self.resource, self.rules, self.applies_to,
                     self.inherit_from_parents)
 
+    def add_rule(self, rule, rule_matcher=None):
+        """Add a rule, along with its compiled matcher.
+
+        Args:
+            rule (Rule): The rule to add.
+            rule_matcher (RuleMatcher): The compiled rule; compiled here
+                if not given.
+        """
+        self.rules.add(rule)
+        self._rule_matchers[rule] = rule_matcher or RuleMatcher(rule)
+
+    def _get_rule_matcher(self, rule):
+        """Get the compiled matcher of a rule, compiling it if needed.
+
+        Args:
+            rule (Rule): The rule.
+
+        Returns:
+            RuleMatcher: The compiled rule.
+        """
+        rule_matcher = self._rule_matchers.get(rule)
+        if rule_matcher is None:
+            rule_matcher = RuleMatcher(rule)
+            self._rule_matchers[rule] = rule_matcher
+        return rule_matcher
+
     def find_mismatches(self, resource, policy_bindings):
         """Determine if the policy binding matches this rule's criteria.
 
@@ -581,21 +747,26 @@ class ResourceRules(object):
         violation_type = scanner_rules.VIOLATION_TYPE.get(
             rule.mode,
             scanner_rules.VIOLATION_TYPE['UNSPECIFIED'])
+        rule_matcher = self._get_rule_matcher(rule)
         found_role = False
         violating_bindings = {}
         # If the rule's binding role is found in the policy,
         # check the policy members to see if all rule binding
         # members are found.
         # Any outstanding rule bindings (role => members) should be reported.
-        for rule_binding in rule.bindings:
-            for policy_binding in policy_bindings:
-                violating_members = None
-                if rule_binding.role_pattern.match(policy_binding.role_name):
-                    found_role = True
-                    violating_members = (self._dispatch_rule_mode_check(
-                        mode=rule.mode,
-                        rule_members=rule_binding.members,
-                        policy_members=policy_binding.members))
+        matched_policy_bindings = [[] for _ in rule.bindings]
+        for policy_binding in policy_bindings:
+            for i in rule_matcher.find_binding_indexes(
+                    policy_binding.role_name):
+                matched_policy_bindings[i].append(policy_binding)
+
+        for (i, rule_binding) in enumerate(rule.bindings):
+            for policy_binding in matched_policy_bindings[i]:
+                found_role = True
+                violating_members = (self._dispatch_rule_mode_check(
+                    mode=rule.mode,
+                    member_matcher=rule_matcher.member_matchers[i],
+                    policy_members=policy_binding.members))
                 if violating_members:
                     violating_bindings[
                         rule_binding.role_name] = violating_members
@@ -628,17 +799,16 @@ class ResourceRules(object):
         violation_type = scanner_rules.VIOLATION_TYPE.get(
             rule.mode,
             scanner_rules.VIOLATION_TYPE['UNSPECIFIED'])
+        rule_matcher = self._get_rule_matcher(rule)
         for policy_binding in policy_bindings:
-            for rule_binding in rule.bindings:
-                # If the rule's role pattern matches the policy binding's
-                # role pattern, then check the members to see whether they
-                # match, according to the rule mode.
-                violating_members = None
-                if rule_binding.role_pattern.match(policy_binding.role_name):
-                    violating_members = (self._dispatch_rule_mode_check(
-                        mode=rule.mode,
-                        rule_members=rule_binding.members,
-                        policy_members=policy_binding.members))
+            # Check the members of each rule binding whose role pattern
+            # matches the policy binding's role, according to the rule mode.
+            for i in rule_matcher.find_binding_indexes(
+                    policy_binding.role_name):
+                violating_members = (self._dispatch_rule_mode_check(
+                    mode=rule.mode,
+                    member_matcher=rule_matcher.member_matchers[i],
+                    policy_members=policy_binding.members))
                 if violating_members:
                     yield scanner_rules.RuleViolation(
                         resource_type=resource.type,
@@ -649,18 +819,19 @@ class ResourceRules(object):
                         role=policy_binding.role_name,
                         members=tuple(violating_members))
 
-    def _dispatch_rule_mode_check(self, mode, rule_members=None,
+    def _dispatch_rule_mode_check(self, mode, member_matcher,
                                   policy_members=None):
         """Determine which rule mode method to execute for rule audit.
 
         Args:
             mode (str): The rule mode.
-            rule_members (list): The rule binding members.
+            member_matcher (MemberMatcher): The compiled rule binding
+                members.
             policy_members (list): The policy binding members.
 
         Returns:
             list: The result of calling the dispatched method.
         """
         return self._rule_mode_methods[mode](
-            rule_members=rule_members,
-            policy_members=policy_members)
+            member_matcher,
+            policy_members or [])
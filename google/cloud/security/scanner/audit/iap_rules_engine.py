@@ -107,7 +107,7 @@ class IapRuleBook(bre.BaseRuleBook):
             self.add_rules(rule_defs)
         self.snapshot_timestamp = snapshot_timestamp
         self.org_res_rel_dao = org_resource_rel_dao.OrgResourceRelDao(
-            global_configs)
+            global_configs, use_hierarchy_index=True)
         self.project_dao = project_dao.ProjectDao(global_configs)
 
     def add_rules(self, rule_defs):
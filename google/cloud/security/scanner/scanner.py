@@ -17,17 +17,24 @@ Usage:
 
   Run scanner:
   $ forseti_scanner --forseti_config
+
+  Run the scanners in parallel, using all the cores:
+  $ forseti_scanner --forseti_config --parallel
 """
+import multiprocessing
 import sys
 
 import gflags as flags
 
 from google.apputils import app
+from google.cloud.security.common.data_access import _db_connector
 from google.cloud.security.common.data_access import dao
 from google.cloud.security.common.data_access import errors as db_errors
+from google.cloud.security.common.data_access import read_cache
 from google.cloud.security.common.util import file_loader
 from google.cloud.security.common.util import log_util
 from google.cloud.security.scanner import scanner_builder
+from google.cloud.security.scanner.scanners import base_scanner
 
 
 # Setup flags
@@ -49,11 +56,25 @@ try:
 except flags.DuplicateFlagError:
     pass
 
+flags.DEFINE_boolean(
+    'parallel', False,
+    'Run the scanners in a pool of worker processes, and split the '
+    'resources of the large scanners across the workers.')
+flags.DEFINE_integer(
+    'parallel_workers', None,
+    'Number of worker processes in parallel mode. Defaults to the '
+    'number of CPUs.')
+
 
 LOGGER = log_util.get_logger(__name__)
 SCANNER_OUTPUT_CSV_FMT = 'scanner_output.{}.csv'
 OUTPUT_TIMESTAMP_FMT = '%Y%m%dT%H%M%SZ'
 
+# The scanners run by the worker processes. Set right before the workers
+# are forked, so that they inherit the scanners instead of having them
+# pickled.
+_PARALLEL_SCANNERS = []
+
 
 def _get_timestamp(global_configs, statuses=('SUCCESS', 'PARTIAL_SUCCESS')):
     """Get latest snapshot timestamp.
@@ -74,6 +95,70 @@ def _get_timestamp(global_configs, statuses=('SUCCESS', 'PARTIAL_SUCCESS')):
 
     return latest_timestamp
 
+def _run_scanner(scanner):
+    """Run a scanner, logging any error.
+
+    Args:
+        scanner (BaseScanner): The scanner to run.
+
+    Returns:
+        bool: True if the scanner ran successfully, otherwise False.
+    """
+    # pylint: disable=bare-except
+    try:
+        scanner.run()
+        return True
+    except:
+        LOGGER.error('Error running scanner: %s',
+                     scanner.__class__.__name__, exc_info=True)
+        return False
+    finally:
+        _db_connector.release_connections()
+    # pylint: enable=bare-except
+
+def _run_parallel_scanner(index):
+    """Run one of the scanners in a worker process.
+
+    Args:
+        index (int): The index of the scanner in _PARALLEL_SCANNERS.
+
+    Returns:
+        bool: True if the scanner ran successfully, otherwise False.
+    """
+    return _run_scanner(_PARALLEL_SCANNERS[index])
+
+def _run_scanners_in_parallel(scanners, num_workers):
+    """Run the scanners using a pool of worker processes.
+
+    The shardable scanners run one at a time, each splitting its resources
+    across num_workers processes. The other scanners are independent of
+    each other and run concurrently, one per worker process.
+
+    Args:
+        scanners (list): The scanners to run.
+        num_workers (int): The number of worker processes.
+    """
+    sharded_scanners = [s for s in scanners
+                        if isinstance(s, base_scanner.ShardableScanner)]
+    other_scanners = [s for s in scanners
+                      if not isinstance(s, base_scanner.ShardableScanner)]
+
+    for scanner in sharded_scanners:
+        scanner.num_shards = num_workers
+        _run_scanner(scanner)
+
+    if not other_scanners:
+        return
+
+    _PARALLEL_SCANNERS[:] = other_scanners
+    pool = multiprocessing.Pool(min(num_workers, len(other_scanners)))
+    try:
+        pool.map(_run_parallel_scanner, range(len(other_scanners)))
+    finally:
+        pool.terminate()
+        pool.join()
+        del _PARALLEL_SCANNERS[:]
+
 def main(_):
     """Run the scanners.
 
@@ -101,18 +186,22 @@ def main(_):
         LOGGER.warn('No snapshot timestamp found. Exiting.')
         sys.exit()
 
+    cache = read_cache.configure(scanner_configs, snapshot_timestamp)
+
     runnable_scanners = scanner_builder.ScannerBuilder(
         global_configs, scanner_configs, snapshot_timestamp).build()
 
-    # pylint: disable=bare-except
-    for scanner in runnable_scanners:
-        try:
-            scanner.run()
-        except:
-            LOGGER.error('Error running scanner: %s',
-                         scanner.__class__.__name__, exc_info=True)
-    # pylint: enable=bare-except
-
+    if FLAGS.parallel:
+        num_workers = FLAGS.parallel_workers or multiprocessing.cpu_count()
+        LOGGER.info('Running %s scanners with %s worker processes.',
+                    len(runnable_scanners), num_workers)
+        _run_scanners_in_parallel(runnable_scanners, num_workers)
+    else:
+        for scanner in runnable_scanners:
+            _run_scanner(scanner)
+
+    if cache:
+        cache.log_stats()
     LOGGER.info('Scan complete!')
 
 
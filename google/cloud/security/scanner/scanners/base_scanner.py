@@ -15,6 +15,8 @@
 """Base scanner."""
 
 import abc
+import itertools
+import multiprocessing
 import os
 import shutil
 
@@ -26,6 +28,27 @@ from google.cloud.security.common.util import log_util
 
 LOGGER = log_util.get_logger(__name__)
 
+# The scanner and the shards of a sharded run. Set right before the worker
+# processes are forked, so the workers inherit them instead of having them
+# pickled.
+_SHARDED_RUN = {}
+
+
+def _find_violations_in_shard(shard_index):
+    """Find the violations in one shard of the current sharded run.
+
+    Args:
+        shard_index (int): The index of the shard.
+
+    Returns:
+        list: The violations found in the shard.
+    """
+    scanner = _SHARDED_RUN['scanner']
+    # pylint: disable=protected-access
+    return scanner._find_violations_in_items(
+        _SHARDED_RUN['shards'][shard_index])
+    # pylint: enable=protected-access
+
 
 class BaseScanner(object):
     """This is a base class skeleton for scanners."""
@@ -68,7 +91,10 @@ class BaseScanner(object):
             vdao = violation_dao.ViolationDao(self.global_configs)
             (inserted_row_count, violation_errors) = vdao.insert_violations(
                 violations,
-                snapshot_timestamp=self.snapshot_timestamp)
+                snapshot_timestamp=self.snapshot_timestamp,
+                batch_size=self.scanner_configs.get(
+                    'violations_insert_batch_size',
+                    violation_dao.DEFAULT_INSERT_BATCH_SIZE))
         except db_errors.MySQLError as err:
             LOGGER.error('Error importing violations to database: %s\n%s',
                          err, violations)
@@ -118,3 +144,72 @@ class BaseScanner(object):
         else:
             # Otherwise, just copy it to the output path.
             shutil.copy(csv_name, full_output_path)
+
+
+class ShardableScanner(BaseScanner):
+    """Base class for the scanners that can split their resources across
+    worker processes, see _find_sharded_violations().
+    """
+
+    def __init__(self, global_configs, scanner_configs, snapshot_timestamp,
+                 rules):
+        """Initialization.
+
+        Args:
+            global_configs (dict): Global configurations.
+            scanner_configs (dict): Scanner configurations.
+            snapshot_timestamp (str): Timestamp, formatted as YYYYMMDDTHHMMSSZ.
+            rules (str): Fully-qualified path and filename of the rules file.
+        """
+        super(ShardableScanner, self).__init__(
+            global_configs,
+            scanner_configs,
+            snapshot_timestamp,
+            rules)
+        self.num_shards = 1
+
+    @abc.abstractmethod
+    def _find_violations_in_items(self, items):
+        """Find the violations in a list of resources.
+
+        Args:
+            items (list): The resources to scan.
+
+        Returns:
+            list: The violations found in the resources.
+        """
+        pass
+
+    def _find_sharded_violations(self, items):
+        """Find violations, splitting the resources across processes.
+
+        The resources are split into up to num_shards contiguous shards,
+        each scanned by _find_violations_in_items() in a forked worker
+        process, and the violations are merged back in resource order.
+
+        Args:
+            items (iterable): The resources to scan.
+
+        Returns:
+            list: All violations.
+        """
+        items = list(items)
+        num_shards = min(self.num_shards, len(items))
+        if num_shards <= 1:
+            return self._find_violations_in_items(items)
+
+        shard_size = -(-len(items) // num_shards)
+        shards = [items[i:i + shard_size]
+                  for i in range(0, len(items), shard_size)]
+        LOGGER.info('Scanning %s resources in %s shards.',
+                    len(items), len(shards))
+
+        _SHARDED_RUN.update(scanner=self, shards=shards)
+        pool = multiprocessing.Pool(len(shards))
+        try:
+            results = pool.map(_find_violations_in_shard, range(len(shards)))
+        finally:
+            pool.terminate()
+            pool.join()
+            _SHARDED_RUN.clear()
+        return list(itertools.chain.from_iterable(results))
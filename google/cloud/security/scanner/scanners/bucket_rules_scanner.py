@@ -26,8 +26,9 @@ from google.cloud.security.scanner.scanners import base_scanner
 LOGGER = log_util.get_logger(__name__)
 
 
-class BucketsAclScanner(base_scanner.BaseScanner):
+class BucketsAclScanner(base_scanner.ShardableScanner):
     """Pipeline to Bucket acls data from DAO"""
+
     def __init__(self, global_configs, scanner_configs, snapshot_timestamp,
                  rules):
         """Initialization.
@@ -92,11 +93,21 @@ class BucketsAclScanner(base_scanner.BaseScanner):
         Returns:
             list: All violations.
         """
-        bucket_data = itertools.chain(*bucket_data)
-        all_violations = []
         LOGGER.info('Finding bucket acl violations...')
+        return self._find_sharded_violations(itertools.chain(*bucket_data))
+
+    def _find_violations_in_items(self, items):
+        """Find violations in a shard of the bucket acls.
+
+        Args:
+            items (list): The (bucket, bucket acl) tuples to find
+                violations in.
 
-        for (bucket, bucket_acl) in bucket_data:
+        Returns:
+            list: All violations.
+        """
+        all_violations = []
+        for (bucket, bucket_acl) in items:
             LOGGER.debug('%s => %s', bucket, bucket_acl)
             violations = self.rules_engine.find_policy_violations(
                 bucket_acl)
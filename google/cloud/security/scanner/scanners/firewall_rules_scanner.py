@@ -14,7 +14,6 @@
 """Scanner for the firewall rule engine."""
 
 from datetime import datetime
-import itertools
 import os
 import sys
 
@@ -31,7 +30,7 @@ from google.cloud.security.scanner.scanners import base_scanner
 LOGGER = log_util.get_logger(__name__)
 
 
-class FirewallPolicyScanner(base_scanner.BaseScanner):
+class FirewallPolicyScanner(base_scanner.ShardableScanner):
     """Scanner for firewall data."""
 
     SCANNER_OUTPUT_CSV_FMT = 'scanner_output_firewall.{}.csv'
@@ -156,10 +155,20 @@ class FirewallPolicyScanner(base_scanner.BaseScanner):
         Returns:
             list: A list of all violations
         """
-        policies = itertools.chain(policies)
-        all_violations = []
         LOGGER.info('Finding firewall policy violations...')
-        for policy in policies:
+        return self._find_sharded_violations(policies)
+
+    def _find_violations_in_items(self, items):
+        """Find violations in a shard of the policies.
+
+        Args:
+            items (list): The policies to find violations in.
+
+        Returns:
+            list: A list of all violations
+        """
+        all_violations = []
+        for policy in items:
             resource_id = policy.project_id
             resource = resource_util.create_resource(
                 resource_id=resource_id, resource_type='project')
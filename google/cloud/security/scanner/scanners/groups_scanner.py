@@ -14,7 +14,9 @@
 
 """Scanner for Google Groups."""
 
-from Queue import Queue
+from collections import defaultdict
+from collections import deque
+import time
 
 import anytree
 import yaml
@@ -212,33 +214,56 @@ class GroupsScanner(base_scanner.BaseScanner):
 
         return starting_node
 
-    def _get_recursive_members(self, starting_node, timestamp):
+    def _get_members_by_group(self, timestamp):
+        """Load the members of all the groups, indexed by group id.
+
+        Args:
+            timestamp (str): Snapshot timestamp, formatted as YYYYMMDDTHHMMSSZ.
+
+        Returns:
+            dict: The list of members of each group, keyed by group id.
+        """
+        members_by_group = defaultdict(list)
+        for member in self.dao.get_all_group_members('group_members',
+                                                     timestamp):
+            members_by_group[member.get('group_id')].append(member)
+        return members_by_group
+
+    @staticmethod
+    def _get_recursive_members(starting_node, members_by_group):
         """Get all the recursive members of a group.
 
+        A group nested in one of its own ancestors is added as a member,
+        but its members are not added again, so that cycles terminate.
+
         Args:
             starting_node (node): Member node from which to start getting
                 the recursive members.
-            timestamp (str): Snapshot timestamp, formatted as YYYYMMDDTHHMMSSZ.
+            members_by_group (dict): The list of members of each group,
+                keyed by group id.
 
         Returns:
             node: Member node with all its recursive members.
         """
-        queue = Queue()
-        queue.put(starting_node)
-
-        while not queue.empty():
-            queued_node = queue.get()
-            members = self.dao.get_group_members('group_members',
-                                                 queued_node.member_id,
-                                                 timestamp)
-            for member in members:
+        queue = deque([(starting_node,
+                        frozenset([starting_node.member_id]))])
+
+        while queue:
+            queued_node, ancestor_ids = queue.popleft()
+            for member in members_by_group.get(queued_node.member_id, []):
                 member_node = MemberNode(member.get('member_id'),
                                          member.get('member_email'),
                                          member.get('member_type'),
                                          member.get('member_status'),
                                          queued_node)
-                if member_node.member_type == 'GROUP':
-                    queue.put(member_node)
+                if member_node.member_type != 'GROUP':
+                    continue
+                if member_node.member_id in ancestor_ids:
+                    LOGGER.warn('Group %s is nested in itself.',
+                                member_node.member_email)
+                    continue
+                queue.append((member_node,
+                              ancestor_ids | {member_node.member_id}))
 
         return starting_node
 
@@ -253,14 +278,23 @@ class GroupsScanner(base_scanner.BaseScanner):
         """
         root = MemberNode(MY_CUSTOMER, MY_CUSTOMER)
 
+        started = time.time()
         all_groups = self.dao.get_all_groups('groups', timestamp)
+        members_by_group = self._get_members_by_group(timestamp)
+        LOGGER.info('Loaded %s groups and their members in %.2f seconds.',
+                    len(all_groups), time.time() - started)
+
+        started = time.time()
         for group in all_groups:
             group_node = MemberNode(group.get('group_id'),
                                     group.get('group_email'),
                                     'group',
                                     'ACTIVE',
                                     root)
-            group_node = self._get_recursive_members(group_node, timestamp)
+            group_node = self._get_recursive_members(group_node,
+                                                     members_by_group)
+        LOGGER.info('Built the group tree in %.2f seconds.',
+                    time.time() - started)
 
         LOGGER.debug(anytree.RenderTree(
             root, style=anytree.AsciiStyle()).by_attr('member_email'))
@@ -287,9 +321,11 @@ class GroupsScanner(base_scanner.BaseScanner):
         with open(self.rules, 'r') as f:
             group_rules = yaml.load(f)
 
+        started = time.time()
         root = self._apply_all_rules(root, group_rules)
-
         all_violations = self._find_violations(root)
+        LOGGER.info('Evaluated the group rules in %.2f seconds.',
+                    time.time() - started)
 
         self._output_results(all_violations)
 
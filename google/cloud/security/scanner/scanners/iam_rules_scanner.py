@@ -34,7 +34,7 @@ from google.cloud.security.scanner.scanners import base_scanner
 LOGGER = log_util.get_logger(__name__)
 
 
-class IamPolicyScanner(base_scanner.BaseScanner):
+class IamPolicyScanner(base_scanner.ShardableScanner):
     """Scanner for IAM data."""
 
     SCANNER_OUTPUT_CSV_FMT = 'scanner_output_iam.{}.csv'
@@ -155,10 +155,21 @@ class IamPolicyScanner(base_scanner.BaseScanner):
         Returns:
             list: A list of all violations
         """
-        policies = itertools.chain(*policies)
-        all_violations = []
         LOGGER.info('Finding IAM policy violations...')
-        for (resource, policy) in policies:
+        return self._find_sharded_violations(itertools.chain(*policies))
+
+    def _find_violations_in_items(self, items):
+        """Find violations in a shard of the policies.
+
+        Args:
+            items (list): The (resource, policy) tuples to find
+                violations in.
+
+        Returns:
+            list: A list of all violations
+        """
+        all_violations = []
+        for (resource, policy) in items:
             LOGGER.debug('%s => %s', resource, policy)
             violations = self.rules_engine.find_policy_violations(
                 resource, policy)
@@ -15,6 +15,7 @@
 """Scanner for the Identity-Aware Proxy rules engine."""
 import collections
 from datetime import datetime
+import itertools
 import os
 
 # pylint: disable=line-too-long
@@ -26,6 +27,7 @@ from google.cloud.security.common.data_access import instance_dao
 from google.cloud.security.common.data_access import instance_group_dao
 from google.cloud.security.common.data_access import instance_group_manager_dao
 from google.cloud.security.common.data_access import instance_template_dao
+from google.cloud.security.common.gcp_type import firewall_rule as firewall_rule_type
 from google.cloud.security.common.gcp_type import instance_group as instance_group_type
 from google.cloud.security.common.gcp_type import instance as instance_type
 from google.cloud.security.common.gcp_type import instance_template as instance_template_type
@@ -49,6 +51,35 @@ NetworkPort = collections.namedtuple(
     ['network', 'port'])
 
 
+# An ingress firewall rule, pre-parsed for the IAP checks: the ports of
+# the tcp 'allowed' and 'denied' entries as IntervalSets, the target tags
+# and the sources (ranges and tags) as frozensets.
+_IngressRule = collections.namedtuple(
+    '_IngressRule',
+    ['priority', 'target_tags', 'allowed_ports', 'denied_ports', 'sources'])
+
+
+def _tcp_port_set(firewall_entries):
+    """Get the tcp ports matched by firewall 'allowed' or 'denied' entries.
+
+    Args:
+        firewall_entries (list): The 'allowed' or 'denied' dicts of a
+            FirewallRule.
+
+    Returns:
+        IntervalSet: The union of the ports of the tcp entries.
+    """
+    port_ranges = []
+    for firewall_entry in firewall_entries or []:
+        if firewall_entry.get('IPProtocol') not in (
+                None, 6, '6', 'tcp', 'all'):
+            continue
+        ports = firewall_rule_type.port_set(
+            [str(port) for port in firewall_entry.get('ports') or []])
+        port_ranges.extend(ports.ranges)
+    return firewall_rule_type.IntervalSet(port_ranges)
+
+
 class _RunData(object):
     """Information needed to compute IAP properties."""
 
@@ -74,6 +105,9 @@ class _RunData(object):
         }
         self.backend_services = backend_services
         self.firewall_rules = firewall_rules
+        self.ingress_rules_by_network = self._index_ingress_rules(
+            firewall_rules)
+        self.allowed_sources_cache = {}
         self.instances_by_key = dict((instance.key, instance)
                                      for instance in instances)
         self.instance_groups_by_key = dict((instance_group.key, instance_group)
@@ -100,6 +134,34 @@ class _RunData(object):
                 self.instance_templates_by_group_key[
                     instance_group_key] = instance_template
 
+    @staticmethod
+    def _index_ingress_rules(firewall_rules):
+        """Index the ingress firewall rules by network.
+
+        Args:
+            firewall_rules (list): FirewallRule
+
+        Returns:
+            dict: Lists of _IngressRule, from the least to the most
+                important priority, keyed by network Key.
+        """
+        rules_by_network = collections.defaultdict(list)
+        for firewall_rule in firewall_rules:
+            if firewall_rule.direction and firewall_rule.direction != 'INGRESS':
+                continue
+            firewall_network = network_type.Key.from_url(
+                firewall_rule.network, project_id=firewall_rule.project_id)
+            rules_by_network[firewall_network].append(_IngressRule(
+                priority=firewall_rule.priority,
+                target_tags=frozenset(firewall_rule.target_tags),
+                allowed_ports=_tcp_port_set(firewall_rule.allowed),
+                denied_ports=_tcp_port_set(firewall_rule.denied),
+                sources=frozenset(firewall_rule.source_ranges +
+                                  firewall_rule.source_tags)))
+        for rules in rules_by_network.itervalues():
+            rules.sort(key=lambda rule: rule.priority, reverse=True)
+        return rules_by_network
+
     @staticmethod
     def instance_group_network_port(backend_service, instance_group):
         """Which network and port is used for a service's backends?
@@ -159,75 +221,32 @@ class _RunData(object):
             tag (str): instance tag for destination instance
 
         Returns:
-            set: allowed source networks and tags
+            frozenset: allowed source networks and tags
         """
-        allowed_sources = set()
+        cache_key = (network_port, tag)
+        if cache_key in self.allowed_sources_cache:
+            return self.allowed_sources_cache[cache_key]
 
-        def firewall_entry_applies(firewall_entry):
-            """Does a firewall entry match the current source?
-
-            Args:
-                firewall_entry (dict): An 'allowed' or 'denied' dict from
-                                       a FirewallRule.
-
-            Returns:
-                bool: whether the entry is relevant to the source being
-                      evaluated
-            """
-            if firewall_entry.get('IPProtocol') not in (
-                    None, 6, '6', 'tcp', 'all'):
-                return False
-            if not firewall_entry.get('ports'):
-                return True
-            for fw_port_range in firewall_entry.get('ports'):
-                fw_port_range = str(fw_port_range)
-                if '-' in fw_port_range:
-                    range_ends = fw_port_range.split('-')
-                    fw_port_min = int(range_ends[0])
-                    fw_port_max = int(range_ends[1])
-                else:
-                    fw_port_min = int(fw_port_range)
-                    fw_port_max = int(fw_port_range)
-                if (network_port.port >= fw_port_min and
-                        network_port.port <= fw_port_max):
-                    return True
-            return False
+        port = network_port.port
+        relevant_rules = [
+            rule for rule
+            in self.ingress_rules_by_network.get(network_port.network, [])
+            if not rule.target_tags or tag in rule.target_tags]
 
-        relevant_rules_by_priority = collections.defaultdict(lambda: [])
-        for firewall_rule in self.firewall_rules:
-            firewall_network = network_type.Key.from_url(
-                firewall_rule.network, project_id=firewall_rule.project_id)
-            if firewall_network != network_port.network:
-                continue
-
-            if (firewall_rule.target_tags and
-                    tag not in firewall_rule.target_tags):
-                continue
-
-            if firewall_rule.direction and firewall_rule.direction != 'INGRESS':
-                continue
-
-            relevant_rules_by_priority[firewall_rule.priority].append(
-                firewall_rule)
-        priorities = relevant_rules_by_priority.keys()
-        priorities.sort(reverse=True)
-        for priority in priorities:
+        allowed_sources = set()
+        for _, rules in itertools.groupby(relevant_rules,
+                                          lambda rule: rule.priority):
+            rules = list(rules)
             # DENY at a given priority takes precedence over ALLOW
-            for firewall_rule in relevant_rules_by_priority[priority]:
-                for allowed in firewall_rule.allowed or []:
-                    if firewall_entry_applies(allowed):
-                        allowed_sources.update(
-                            firewall_rule.source_ranges or [])
-                        allowed_sources.update(
-                            firewall_rule.source_tags or [])
-                        continue
-            for firewall_rule in relevant_rules_by_priority[priority]:
-                for denied in firewall_rule.denied or []:
-                    if firewall_entry_applies(denied):
-                        allowed_sources.difference_update(
-                            firewall_rule.source_ranges or [])
-                        allowed_sources.difference_update(
-                            firewall_rule.source_tags or [])
+            for rule in rules:
+                if rule.allowed_ports.covers(port, port):
+                    allowed_sources.update(rule.sources)
+            for rule in rules:
+                if rule.denied_ports.covers(port, port):
+                    allowed_sources.difference_update(rule.sources)
+
+        allowed_sources = frozenset(allowed_sources)
+        self.allowed_sources_cache[cache_key] = allowed_sources
         return allowed_sources
 
     def tags_for_instance_group(self, instance_group):
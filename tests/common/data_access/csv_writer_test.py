@@ -14,6 +14,8 @@
 
 """Tests the CSV Writer."""
 
+import os
+
 from tests.unittest_utils import ForsetiTestCase
 import mock
 import unittest
@@ -46,6 +48,55 @@ class CsvWriterTest(ForsetiTestCase):
         called_args, called_kwargs = mock_os.remove.call_args_list[1]
         self.assertEquals(csv_filename, called_args[0])
 
+    @mock.patch.object(csv_writer, 'CSV_FIELDNAME_MAP', {'foo': ['bar']})
+    def test_write_csv_chunks_by_rows(self):
+        """Test that the data is split in chunks of max_rows."""
+        data = [{'bar': i} for i in range(7)]
+
+        chunks = []
+        for csv_file, row_count in csv_writer.write_csv_chunks(
+                'foo', data, max_rows=3):
+            with open(csv_file.name) as f:
+                chunks.append((f.read().splitlines(), row_count))
+
+        self.assertEquals(
+            [(['0', '1', '2'], 3), (['3', '4', '5'], 3), (['6'], 1)],
+            chunks)
+
+    @mock.patch.object(csv_writer, 'CSV_FIELDNAME_MAP', {'foo': ['bar']})
+    def test_write_csv_chunks_by_bytes(self):
+        """Test that the data is split in chunks of about max_bytes."""
+        data = [{'bar': 'x' * 9} for _ in range(5)]
+
+        row_counts = [row_count for _, row_count in
+                      csv_writer.write_csv_chunks('foo', data, max_bytes=20)]
+
+        self.assertEquals([2, 2, 1], row_counts)
+
+    @mock.patch.object(csv_writer, 'CSV_FIELDNAME_MAP', {'foo': ['bar']})
+    def test_write_csv_chunks_removes_files(self):
+        """Test that the chunk files are removed, also when prefetching."""
+        data = [{'bar': i} for i in range(10)]
+
+        for prefetch in (False, True):
+            filenames = []
+            chunks = csv_writer.write_csv_chunks(
+                'foo', data, max_rows=2, prefetch=prefetch)
+            for csv_file, _ in chunks:
+                filenames.append(csv_file.name)
+                if len(filenames) == 3:
+                    break
+            chunks.close()
+
+            self.assertEquals(3, len(filenames))
+            for filename in filenames:
+                self.assertFalse(os.path.exists(filename))
+
+    @mock.patch.object(csv_writer, 'CSV_FIELDNAME_MAP', {'foo': ['bar']})
+    def test_write_csv_chunks_with_no_data(self):
+        """Test that no chunk is written for empty data."""
+        self.assertEquals([], list(csv_writer.write_csv_chunks('foo', [])))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -71,6 +71,199 @@ class DaoTest(ForsetiTestCase):
 
         self.assertEqual(expected_tablename, actual_tablename)
 
+    @mock.patch.object(dao.csv_writer, 'write_csv_chunks')
+    def test_load_data_loads_each_chunk(self, mock_write_csv_chunks):
+        """Test that load_data loads and commits every csv chunk."""
+        chunk1 = mock.MagicMock()
+        chunk1.name = '/tmp/chunk1'
+        chunk2 = mock.MagicMock()
+        chunk2.name = '/tmp/chunk2'
+        mock_write_csv_chunks.return_value = (
+            chunk for chunk in [(chunk1, 100), (chunk2, 42)])
+        conn_mock = mock.MagicMock()
+        cursor_mock = mock.MagicMock()
+        self.dao.conn = conn_mock
+        self.dao.conn.cursor.return_value = cursor_mock
+
+        row_count = self.dao.load_data(
+            self.resource_projects, self.fake_timestamp, [])
+
+        self.assertEquals(142, row_count)
+        self.assertEquals(2, cursor_mock.execute.call_count)
+        self.assertEquals(2, conn_mock.commit.call_count)
+        executed_sql = cursor_mock.execute.call_args_list[1][0][0]
+        self.assertIn('/tmp/chunk2', executed_sql)
+        self.assertIn('projects_12345', executed_sql)
+
+    def test_create_snapshot_table_incremental(self):
+        """Test that incremental snapshot tables are views of the history."""
+        cursor_mock = mock.MagicMock()
+        self.dao.conn = mock.MagicMock()
+        self.dao.conn.cursor.return_value = cursor_mock
+        self.dao.incremental_snapshots = True
+
+        actual_tablename = self.dao.create_snapshot_table(
+            self.resource_projects, self.fake_timestamp)
+
+        self.assertEqual('projects_12345', actual_tablename)
+        create_history_sql = cursor_mock.execute.call_args_list[0][0][0]
+        create_view_sql = cursor_mock.execute.call_args_list[1][0][0]
+        self.assertIn('CREATE TABLE IF NOT EXISTS `projects_history`',
+                      create_history_sql)
+        self.assertIn('CREATE VIEW `projects_12345`', create_view_sql)
+        self.assertIn("added_cycle <= '12345'", create_view_sql)
+
+    @mock.patch.object(dao.csv_writer, 'CSV_FIELDNAME_MAP',
+                       {'projects': ['project_id']})
+    @mock.patch.object(dao.csv_writer, 'write_csv_chunks')
+    def test_load_data_incremental_loads_new_rows(self,
+                                                  mock_write_csv_chunks):
+        """Test that only new rows are loaded into the history table."""
+        project_1 = {'project_id': 'project-1'}
+        project_2 = {'project_id': 'project-2'}
+        delta = dao.snapshot_history.CycleDelta([])
+        previous_fingerprint = list(delta.filter_new_rows(
+            ['project_id'], [project_1]))[0][0]
+
+        loaded_rows = []
+        def _write_csv_chunks(resource_name, data, **kwargs):
+            loaded_rows.extend(data)
+            chunk = mock.MagicMock()
+            chunk.name = '/tmp/chunk1'
+            return (c for c in [(chunk, len(loaded_rows))])
+        mock_write_csv_chunks.side_effect = _write_csv_chunks
+        self.dao.conn = mock.MagicMock()
+        self.dao.incremental_snapshots = True
+        self.dao.execute_sql_with_fetch = mock.MagicMock(
+            return_value=[{'row_fingerprint': previous_fingerprint}])
+
+        row_count = self.dao.load_data(
+            self.resource_projects, 'load_ts', [project_1, project_2])
+
+        self.assertEquals(1, row_count)
+        self.assertEquals('project-2', loaded_rows[0]['project_id'])
+        self.assertEquals('load_ts', loaded_rows[0]['added_cycle'])
+        executed_sql = self.dao.conn.cursor().execute.call_args[0][0]
+        self.assertIn('projects_history', executed_sql)
+        self.assertIn('(project_id,row_fingerprint,added_cycle)',
+                      executed_sql)
+        dao.snapshot_history.pop_cycle_delta(self.resource_projects,
+                                             'load_ts')
+
+    def _fake_history_fetch(self, live_fingerprints, history_tables):
+        """Fake the queries of complete_incremental_snapshot().
+
+        Args:
+            live_fingerprints (dict): The live fingerprints of each resource.
+            history_tables (list): The names of the existing history tables.
+
+        Returns:
+            function: A fake execute_sql_with_fetch().
+        """
+        def _fetch(resource_name, sql, values):
+            if sql == dao.snapshot_history_sql.SELECT_HISTORY_TABLES:
+                return [{'TABLE_NAME': name} for name in history_tables]
+            return [{'row_fingerprint': fingerprint}
+                    for fingerprint in live_fingerprints.get(resource_name, [])]
+        return _fetch
+
+    def test_complete_incremental_snapshot_removes_unseen_rows(self):
+        """Test that rows not loaded in the cycle are marked as removed."""
+        self.dao.incremental_snapshots = True
+        self.dao.execute_sql_with_commit = mock.MagicMock()
+        self.dao.execute_many_with_commit = mock.MagicMock()
+        self.dao.execute_sql_with_fetch = mock.MagicMock(
+            side_effect=self._fake_history_fetch(
+                {'projects': ['abc']}, ['projects_history']))
+        self.dao.mark_incremental_loads_complete(['projects'], 'complete_ts')
+
+        self.dao.complete_incremental_snapshot('complete_ts')
+
+        self.dao.execute_many_with_commit.assert_any_call(
+            'projects',
+            dao.snapshot_history_sql.UPDATE_REMOVED_ROW.format(
+                'projects_history'),
+            [('complete_ts', 'abc')])
+        self.dao.execute_many_with_commit.assert_any_call(
+            'snapshot_changes', dao.snapshot_history_sql.INSERT_CHANGE,
+            [('complete_ts', 'projects', 'abc', 'REMOVED')])
+        self.assertEquals(2, self.dao.execute_many_with_commit.call_count)
+
+    @mock.patch.object(dao.csv_writer, 'CSV_FIELDNAME_MAP',
+                       {'instances': ['instance_id'],
+                        'projects': ['project_id']})
+    @mock.patch.object(dao.csv_writer, 'write_csv_chunks')
+    def test_complete_incremental_snapshot_keeps_rows_of_unloaded_resources(
+            self, mock_write_csv_chunks):
+        """Test that disabled and failed pipelines don't remove any row.
+
+        Setup:
+            * projects is loaded by a successful pipeline.
+            * instances is loaded by a pipeline that fails after its load.
+            * groups is disabled, and its history table does not exist.
+            * buckets is disabled, and its history table exists.
+
+        Expect:
+            * Only the unseen rows of projects are marked as removed.
+            * The added rows of instances are recorded in the change log.
+        """
+        def _write_csv_chunks(resource_name, data, **kwargs):
+            row_count = len(list(data))
+            return (c for c in [(mock.MagicMock(), row_count)])
+        mock_write_csv_chunks.side_effect = _write_csv_chunks
+        self.dao.conn = mock.MagicMock()
+        self.dao.incremental_snapshots = True
+        self.dao.execute_sql_with_commit = mock.MagicMock()
+        self.dao.execute_many_with_commit = mock.MagicMock()
+        self.dao.execute_sql_with_fetch = mock.MagicMock(
+            side_effect=self._fake_history_fetch(
+                {'projects': ['old-project'],
+                 'instances': ['old-instance'],
+                 'buckets': ['old-bucket']},
+                ['projects_history', 'instances_history',
+                 'buckets_history']))
+
+        self.dao.load_data('projects', 'complete_ts',
+                           [{'project_id': 'project-1'}])
+        self.dao.load_data('instances', 'complete_ts',
+                           [{'instance_id': 'instance-1'}])
+        self.dao.mark_incremental_loads_complete(['projects'], 'complete_ts')
+        self.dao.complete_incremental_snapshot('complete_ts')
+
+        update_calls = [
+            call for call in self.dao.execute_many_with_commit.call_args_list
+            if call[0][1].strip().startswith('UPDATE')]
+        self.assertEquals(1, len(update_calls))
+        self.assertEquals('projects', update_calls[0][0][0])
+        self.assertEquals([('complete_ts', 'old-project')],
+                          update_calls[0][0][2])
+        change_calls = [
+            call[0][2]
+            for call in self.dao.execute_many_with_commit.call_args_list
+            if call[0][0] == 'snapshot_changes']
+        instance_changes = [change for changes in change_calls
+                            for change in changes
+                            if change[1] == 'instances']
+        self.assertEquals(['ADDED'],
+                          [change[3] for change in instance_changes])
+
+    def test_execute_many_with_commit_rolls_back_on_error(self):
+        """Test that a failed executemany is rolled back and raised."""
+        conn_mock = mock.MagicMock()
+        cursor_mock = mock.MagicMock()
+        cursor_mock.executemany.side_effect = dao.DataError('error')
+        self.dao.conn = conn_mock
+        self.dao.conn.cursor.return_value = cursor_mock
+
+        with self.assertRaises(errors.MySQLError):
+            self.dao.execute_many_with_commit(
+                'violations', 'INSERT', [('a',), ('b',)])
+
+        cursor_mock.executemany.assert_called_once_with(
+            'INSERT', [('a',), ('b',)])
+        conn_mock.rollback.assert_called_once_with()
+        conn_mock.commit.assert_not_called()
+
     def test_get_latest_snapshot_timestamp(self):
         """Test create_snapshot_table.
 
@@ -0,0 +1,252 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the database connector and its connection pool."""
+
+import threading
+
+from tests.unittest_utils import ForsetiTestCase
+import mock
+import MySQLdb
+import unittest
+
+from google.cloud.security.common.data_access import _db_connector
+from google.cloud.security.common.data_access import errors
+
+
+FAKE_CONNECT_KWARGS = {'host': 'foo', 'user': 'bar', 'db': 'baz'}
+
+
+class ConnectionPoolTest(ForsetiTestCase):
+    """Tests for the ConnectionPool."""
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_connection_is_shared_within_a_thread(self, mock_connect):
+        """Test that a thread reuses its checked out connection."""
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS)
+
+        self.assertIs(pool.get_connection(), pool.get_connection())
+        self.assertEquals(1, mock_connect.call_count)
+        mock_connect.assert_called_with(**FAKE_CONNECT_KWARGS)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_released_connection_is_reused(self, mock_connect):
+        """Test that released connections go back to the pool."""
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS)
+        connections = []
+
+        def _use_connection():
+            connections.append(pool.get_connection())
+            pool.release()
+
+        for _ in range(3):
+            thread = threading.Thread(target=_use_connection)
+            thread.start()
+            thread.join()
+
+        self.assertEquals(1, mock_connect.call_count)
+        self.assertEquals(1, len(set(connections)))
+
+    @mock.patch.object(_db_connector.os, 'getpid')
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_forked_pool_opens_new_connections(self, mock_connect,
+                                               mock_getpid):
+        """Test that a forked child doesn't reuse the parent connections."""
+        mock_getpid.return_value = 100
+        mock_connect.side_effect = [mock.Mock(), mock.Mock()]
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS)
+        parent_conn = pool.get_connection()
+
+        mock_getpid.return_value = 101
+        child_conn = pool.get_connection()
+
+        self.assertIsNot(parent_conn, child_conn)
+        self.assertIs(child_conn, pool.get_connection())
+        self.assertEquals(2, mock_connect.call_count)
+        self.assertFalse(parent_conn.close.called)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_threads_use_separate_connections(self, mock_connect):
+        """Test that concurrent threads get their own connection."""
+        mock_connect.side_effect = lambda **kwargs: mock.MagicMock()
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS)
+        main_conn = pool.get_connection()
+        thread_conns = []
+
+        thread = threading.Thread(
+            target=lambda: thread_conns.append(pool.get_connection()))
+        thread.start()
+        thread.join()
+
+        self.assertEquals(2, mock_connect.call_count)
+        self.assertIsNot(main_conn, thread_conns[0])
+
+    @mock.patch.object(_db_connector, 'POOL_TIMEOUT_SECONDS', 0)
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_exhausted_pool_raises(self, mock_connect):
+        """Test that an error is raised when no connection is available."""
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS, max_size=1)
+        pool.get_connection()
+        raised = []
+
+        def _get_connection():
+            try:
+                pool.get_connection()
+            except errors.MySQLError as e:
+                raised.append(e)
+
+        thread = threading.Thread(target=_get_connection)
+        thread.start()
+        thread.join()
+
+        self.assertEquals(1, len(raised))
+
+    @mock.patch.object(_db_connector, 'PING_INTERVAL_SECONDS', -1)
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_dead_connection_is_replaced(self, mock_connect):
+        """Test that a connection failing the ping is reconnected."""
+        dead_conn = mock.MagicMock()
+        dead_conn.ping.side_effect = MySQLdb.OperationalError(
+            2006, 'MySQL server has gone away')
+        live_conn = mock.MagicMock()
+        mock_connect.side_effect = [dead_conn, live_conn]
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS)
+
+        pool.get_connection()
+
+        self.assertIs(live_conn, pool.get_connection())
+        self.assertTrue(dead_conn.close.called)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_idle_connection_is_recycled(self, mock_connect):
+        """Test that connections idle for too long are replaced."""
+        mock_connect.side_effect = lambda **kwargs: mock.MagicMock()
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS,
+                                            recycle_seconds=-1)
+        old_conn = pool.get_connection()
+        pool.release()
+
+        new_conn = pool.get_connection()
+
+        self.assertIsNot(old_conn, new_conn)
+        self.assertTrue(old_conn.close.called)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_released_connection_is_rolled_back(self, mock_connect):
+        """Test that a connection ends its transaction when released."""
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS)
+        conn = pool.get_connection()
+
+        pool.release()
+
+        conn.rollback.assert_called_once_with()
+        self.assertIs(conn, pool.get_connection())
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_connection_failing_to_roll_back_is_dropped(self, mock_connect):
+        """Test that a connection that can't roll back isn't reused."""
+        mock_connect.side_effect = lambda **kwargs: mock.MagicMock()
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS, max_size=1)
+        old_conn = pool.get_connection()
+        old_conn.rollback.side_effect = MySQLdb.OperationalError(
+            2013, 'Lost connection to MySQL server during query')
+
+        pool.release()
+
+        self.assertIsNot(old_conn, pool.get_connection())
+        self.assertTrue(old_conn.close.called)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_discarded_connection_is_replaced(self, mock_connect):
+        """Test that a discarded connection is closed and replaced."""
+        mock_connect.side_effect = lambda **kwargs: mock.MagicMock()
+        pool = _db_connector.ConnectionPool(FAKE_CONNECT_KWARGS, max_size=1)
+        old_conn = pool.get_connection()
+
+        pool.discard()
+
+        self.assertIsNot(old_conn, pool.get_connection())
+        self.assertTrue(old_conn.close.called)
+        self.assertEquals(2, mock_connect.call_count)
+
+
+class DbConnectorTest(ForsetiTestCase):
+    """Tests for the DbConnector."""
+
+    def setUp(self):
+        self.global_configs = {'db_host': 'connector_test_host',
+                               'db_user': 'foo',
+                               'db_name': 'bar'}
+        _db_connector._POOLS.clear()
+
+    def tearDown(self):
+        _db_connector._POOLS.clear()
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_connectors_share_the_pool(self, mock_connect):
+        """Test that DbConnectors in one thread share one connection."""
+        first = _db_connector.DbConnector(self.global_configs)
+        second = _db_connector.DbConnector(self.global_configs)
+
+        self.assertIs(first.conn, second.conn)
+        self.assertEquals(1, mock_connect.call_count)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_connect_error_is_raised(self, mock_connect):
+        """Test that connect errors are raised as MySQLError."""
+        mock_connect.side_effect = MySQLdb.OperationalError(
+            2003, "Can't connect to MySQL server")
+
+        with self.assertRaises(errors.MySQLError):
+            _db_connector.DbConnector(self.global_configs)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_connection_error_drops_the_connection(self, mock_connect):
+        """Test that the next query after a connection error reconnects."""
+        mock_connect.side_effect = lambda **kwargs: mock.MagicMock()
+        connector = _db_connector.DbConnector(self.global_configs)
+        old_conn = connector.conn
+
+        connector._recover_connection(MySQLdb.OperationalError(
+            2013, 'Lost connection to MySQL server during query'))
+
+        self.assertIsNot(old_conn, connector.conn)
+        self.assertTrue(old_conn.close.called)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_query_error_rolls_back(self, mock_connect):
+        """Test that other errors roll back and keep the connection."""
+        connector = _db_connector.DbConnector(self.global_configs)
+        conn = connector.conn
+
+        connector._recover_connection(MySQLdb.ProgrammingError(
+            1146, "Table 'bar.foo' doesn't exist"))
+
+        conn.rollback.assert_called_once_with()
+        self.assertIs(conn, connector.conn)
+
+    @mock.patch.object(MySQLdb, 'connect')
+    def test_release_connections(self, mock_connect):
+        """Test that the thread's connections go back to their pools."""
+        connector = _db_connector.DbConnector(self.global_configs)
+        conn = connector.conn
+
+        _db_connector.release_connections()
+
+        conn.rollback.assert_called_once_with()
+        self.assertIs(conn, connector.conn)
+
+
+if __name__ == '__main__':
+    unittest.main()
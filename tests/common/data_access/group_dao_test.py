@@ -55,6 +55,18 @@ class GroupDaoTest(ForsetiTestCase):
             self.dao.get_group_members(
                 self.resource_name, self.fake_group_id, self.fake_timestamp)
 
+    @mock.patch.object(dao.Dao, 'execute_sql_with_fetch', autospec=True)
+    def test_get_all_group_members(self, mock_fetch):
+        """Test get_all_group_members() reads the whole table at once."""
+        mock_fetch.return_value = ({'group_id': '11111'},
+                                   {'group_id': '22222'})
+        members = self.dao.get_all_group_members(
+            'group_members', self.fake_timestamp)
+
+        self.assertEqual(mock_fetch.return_value, members)
+        self.assertEqual(1, mock_fetch.call_count)
+        self.assertIn('group_members_22222', mock_fetch.call_args[0][2])
+
     @mock.patch.object(group_dao.GroupDao, 'get_group_members', autospec=True)
     @mock.patch.object(group_dao.GroupDao, 'get_group_id', autospec=True)
     def test_get_recursive_members_of_group(self, mock_get_group_id,
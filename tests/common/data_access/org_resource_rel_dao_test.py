@@ -23,6 +23,7 @@ from google.cloud.security.common.data_access import folder_dao
 from google.cloud.security.common.data_access import org_resource_rel_dao
 from google.cloud.security.common.data_access import organization_dao
 from google.cloud.security.common.data_access import project_dao
+from google.cloud.security.common.data_access.errors import MySQLError
 from google.cloud.security.common.gcp_type import folder
 from google.cloud.security.common.gcp_type import organization
 from google.cloud.security.common.gcp_type import project
@@ -117,6 +118,106 @@ class OrgResourceRelDaoTest(ForsetiTestCase):
             [],
             actual3)
 
+    @mock.patch.object(project_dao.ProjectDao, 'get_projects')
+    @mock.patch.object(folder_dao.FolderDao, 'get_folders')
+    @mock.patch.object(organization_dao.OrganizationDao, 'get_organizations')
+    @mock.patch.object(project_dao.ProjectDao, 'get_project')
+    @mock.patch.object(folder_dao.FolderDao, 'get_folder')
+    @mock.patch.object(organization_dao.OrganizationDao, 'get_organization')
+    def test_find_ancestors_with_hierarchy_index(
+            self,
+            mock_get_org,
+            mock_get_folder,
+            mock_get_project,
+            mock_get_orgs,
+            mock_get_folders,
+            mock_get_projects):
+        """Ancestors are resolved from the index without per-item lookups."""
+        mock_get_orgs.return_value = [self.fake_org]
+        mock_get_folders.return_value = [
+            self.fake_folder1, self.fake_folder2]
+        mock_get_projects.return_value = [self.fake_project1]
+        self.org_res_rel_dao._use_hierarchy_index = True
+
+        unloaded_project = project.Project(project_id='project-1')
+        actual_project = self.org_res_rel_dao.find_ancestors(
+            unloaded_project, self.fake_timestamp)
+        actual_folder = self.org_res_rel_dao.find_ancestors(
+            self.fake_folder2, self.fake_timestamp)
+        actual_org = self.org_res_rel_dao.find_ancestors(
+            self.fake_org, self.fake_timestamp)
+
+        self.assertEqual(
+            [self.fake_folder2, self.fake_folder1, self.fake_org],
+            actual_project)
+        self.assertEqual([self.fake_folder1, self.fake_org], actual_folder)
+        self.assertEqual([], actual_org)
+        self.assertEqual(1, mock_get_orgs.call_count)
+        self.assertEqual(1, mock_get_folders.call_count)
+        self.assertEqual(1, mock_get_projects.call_count)
+        self.assertFalse(mock_get_org.called)
+        self.assertFalse(mock_get_folder.called)
+        self.assertFalse(mock_get_project.called)
+
+    @mock.patch.object(project_dao.ProjectDao, 'get_projects')
+    @mock.patch.object(folder_dao.FolderDao, 'get_folders')
+    @mock.patch.object(organization_dao.OrganizationDao, 'get_organizations')
+    @mock.patch.object(project_dao.ProjectDao, 'get_project')
+    @mock.patch.object(folder_dao.FolderDao, 'get_folder')
+    @mock.patch.object(organization_dao.OrganizationDao, 'get_organization')
+    def test_find_ancestors_falls_back_when_index_incomplete(
+            self,
+            mock_get_org,
+            mock_get_folder,
+            mock_get_project,
+            mock_get_orgs,
+            mock_get_folders,
+            mock_get_projects):
+        """Resources missing from the index are looked up individually."""
+        mock_get_orgs.return_value = [self.fake_org]
+        mock_get_folders.side_effect = MySQLError('folders', 'no table')
+        mock_get_projects.return_value = [self.fake_project1]
+        mock_get_org.return_value = self.fake_org
+        mock_get_folder.side_effect = [self.fake_folder2, self.fake_folder1]
+        self.org_res_rel_dao._use_hierarchy_index = True
+
+        actual = self.org_res_rel_dao.find_ancestors(
+            self.fake_project1, self.fake_timestamp)
+
+        self.assertEqual(
+            [self.fake_folder2, self.fake_folder1, self.fake_org], actual)
+        self.assertEqual(2, mock_get_folder.call_count)
+
+
+class ResourceHierarchyIndexTest(ForsetiTestCase):
+    """Test ResourceHierarchyIndex."""
+
+    def test_find_ancestors_memoizes_chains(self):
+        """Chains of shared ancestors are reused."""
+        org = organization.Organization(organization_id=1)
+        fldr = folder.Folder(folder_id=11, parent=org)
+        project1 = project.Project(project_id='p1', parent=fldr)
+        project2 = project.Project(project_id='p2', parent=fldr)
+        index = org_resource_rel_dao.ResourceHierarchyIndex(
+            [org, fldr, project1, project2])
+
+        self.assertEqual(4, len(index))
+        self.assertEqual([fldr, org], index.find_ancestors(project1))
+        self.assertEqual([fldr, org], index.find_ancestors(project2))
+        self.assertEqual([org], index.find_ancestors(fldr))
+        self.assertIsNone(index.find_ancestors(
+            project.Project(project_id='unknown')))
+
+    def test_find_ancestors_stops_on_cycle(self):
+        """A cyclic hierarchy does not loop forever."""
+        folder1 = folder.Folder(folder_id=1)
+        folder2 = folder.Folder(folder_id=2, parent=folder1)
+        folder1._parent = folder2
+        index = org_resource_rel_dao.ResourceHierarchyIndex(
+            [folder1, folder2])
+
+        self.assertEqual([folder1], index.find_ancestors(folder2))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,111 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the snapshot read cache."""
+import unittest
+
+import mock
+
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.security.common.data_access import _db_connector
+from google.cloud.security.common.data_access import dao
+from google.cloud.security.common.data_access import read_cache
+
+FAKE_TIMESTAMP = '20001225T120000Z'
+PROJECT_SQL = 'SELECT * FROM projects_{} WHERE project_id = %s;'.format(
+    FAKE_TIMESTAMP)
+FAKE_ROWS = ({'project_id': 'foo', 'project_number': 1},)
+
+
+class ReadCacheTest(ForsetiTestCase):
+    """Test the ReadCache."""
+
+    def setUp(self):
+        """Set up."""
+        self.cache = read_cache.ReadCache(FAKE_TIMESTAMP, 1024 * 1024)
+
+    def test_rows_are_fetched_once(self):
+        """Verify that the rows of a query are only fetched once."""
+        fetch = mock.MagicMock(return_value=FAKE_ROWS)
+        for _ in range(3):
+            self.assertEquals(
+                FAKE_ROWS, self.cache.get(PROJECT_SQL, ('foo',), fetch))
+        fetch.assert_called_once_with()
+
+        self.cache.get(PROJECT_SQL, ('bar',), fetch)
+        self.assertEquals(2, fetch.call_count)
+        self.assertEquals(2, self.cache.hits)
+        self.assertEquals(2, self.cache.misses)
+
+    def test_least_recently_used_rows_are_evicted(self):
+        """Verify that the cache is kept under its memory budget."""
+        self.cache.max_bytes = read_cache._estimate_size(FAKE_ROWS) * 2
+        fetch = mock.MagicMock(return_value=FAKE_ROWS)
+        self.cache.get(PROJECT_SQL, ('foo',), fetch)
+        self.cache.get(PROJECT_SQL, ('bar',), fetch)
+        self.cache.get(PROJECT_SQL, ('foo',), fetch)
+        self.cache.get(PROJECT_SQL, ('baz',), fetch)
+        self.assertEquals(3, fetch.call_count)
+
+        self.cache.get(PROJECT_SQL, ('foo',), fetch)
+        self.assertEquals(3, fetch.call_count)
+        self.cache.get(PROJECT_SQL, ('bar',), fetch)
+        self.assertEquals(4, fetch.call_count)
+        self.assertLessEqual(self.cache.size, self.cache.max_bytes)
+
+    def test_is_cacheable(self):
+        """Verify that only the reads of the snapshot tables are cached."""
+        self.assertTrue(self.cache.is_cacheable(PROJECT_SQL))
+        self.assertFalse(self.cache.is_cacheable(
+            'SELECT * FROM projects_19991225T120000Z;'))
+        self.assertFalse(self.cache.is_cacheable(
+            'SELECT * FROM violations_{};'.format(FAKE_TIMESTAMP)))
+        self.assertFalse(self.cache.is_cacheable(
+            'DELETE FROM projects_{};'.format(FAKE_TIMESTAMP)))
+
+    def test_configure(self):
+        """Verify that the cache is only enabled when configured."""
+        self.assertIsNone(read_cache.configure(
+            {'read_cache_max_mb': 0}, FAKE_TIMESTAMP))
+        self.assertIsNone(read_cache.READ_CACHE)
+
+        cache = read_cache.configure({}, FAKE_TIMESTAMP)
+        self.assertIs(cache, read_cache.READ_CACHE)
+        self.assertEquals(FAKE_TIMESTAMP, cache.timestamp)
+        self.assertEquals(
+            read_cache.DEFAULT_MAX_MEGABYTES * 1024 * 1024, cache.max_bytes)
+        read_cache.configure({'read_cache_max_mb': 0}, FAKE_TIMESTAMP)
+
+    @mock.patch.object(_db_connector.DbConnector, '__init__', autospec=True)
+    def test_daos_share_the_cache(self, mock_db_connector):
+        """Verify that the DAOs read the snapshot through the cache."""
+        mock_db_connector.return_value = None
+        conn = mock.MagicMock()
+        conn.cursor.return_value.fetchall.return_value = FAKE_ROWS
+        daos = [dao.Dao(), dao.Dao()]
+        for a_dao in daos:
+            a_dao.conn = conn
+
+        with mock.patch.object(read_cache, 'READ_CACHE', self.cache):
+            for a_dao in daos:
+                self.assertEquals(FAKE_ROWS, a_dao.execute_sql_with_fetch(
+                    'projects', PROJECT_SQL, ('foo',)))
+        self.assertEquals(1, conn.cursor.return_value.execute.call_count)
+
+        daos[0].execute_sql_with_fetch('projects', PROJECT_SQL, ('foo',))
+        self.assertEquals(2, conn.cursor.return_value.execute.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
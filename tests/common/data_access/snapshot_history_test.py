@@ -0,0 +1,116 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the incremental snapshot history."""
+
+import unittest
+
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.security.common.data_access import snapshot_history
+from google.cloud.security.common.data_access.sql_queries import create_tables
+
+FIELDNAMES = ['project_id', 'raw_project']
+PROJECT_1 = {'project_id': 'project-1', 'raw_project': '{"name": "p1"}'}
+PROJECT_2 = {'project_id': 'project-2', 'raw_project': '{"name": "p2"}'}
+PROJECT_2_CHANGED = {'project_id': 'project-2',
+                     'raw_project': '{"name": "p2", "labels": {}}'}
+
+
+class SnapshotHistoryTest(ForsetiTestCase):
+    """Tests for the snapshot history."""
+
+    def test_history_tables_keep_columns_and_drop_unique_keys(self):
+        """Test the history table of every snapshot table."""
+        for name in dir(create_tables):
+            if not name.startswith('CREATE_'):
+                continue
+            create_table_sql = getattr(create_tables, name)
+            history_sql = snapshot_history.get_create_history_table_sql(
+                create_table_sql, 'foo_history')
+
+            self.assertIn('CREATE TABLE IF NOT EXISTS', history_sql)
+            self.assertIn('foo_history', history_sql)
+            self.assertNotIn('UNIQUE KEY', history_sql)
+            self.assertEquals(1, history_sql.count('PRIMARY KEY'))
+            self.assertEquals(
+                snapshot_history.get_column_names(create_table_sql) +
+                ['row_fingerprint', 'added_cycle', 'removed_cycle'],
+                snapshot_history.get_column_names(history_sql))
+
+    def test_history_table_primary_key(self):
+        """Test the primary key of history tables with and without ids."""
+        projects_sql = snapshot_history.get_create_history_table_sql(
+            create_tables.CREATE_PROJECT_TABLE, 'projects_history')
+        folders_sql = snapshot_history.get_create_history_table_sql(
+            create_tables.CREATE_FOLDERS_TABLE, 'folders_history')
+
+        self.assertIn('PRIMARY KEY (`id`)', projects_sql)
+        self.assertIn('PRIMARY KEY (`row_fingerprint`, `added_cycle`)',
+                      folders_sql)
+
+    def test_history_table_indexes_fingerprints(self):
+        """Test that removed rows can be looked up by their fingerprint."""
+        projects_sql = snapshot_history.get_create_history_table_sql(
+            create_tables.CREATE_PROJECT_TABLE, 'projects_history')
+
+        self.assertIn('KEY `row_fingerprint` (`row_fingerprint`, '
+                      '`removed_cycle`)', projects_sql)
+
+    def test_unchanged_rows_are_filtered_out(self):
+        """Test that only added and changed rows are returned."""
+        previous = snapshot_history.CycleDelta([])
+        previous_rows = previous.filter_new_rows(
+            FIELDNAMES, [PROJECT_1, PROJECT_2])
+        previous_fingerprints = [fp for fp, _ in previous_rows]
+
+        delta = snapshot_history.CycleDelta(previous_fingerprints)
+        new_rows = list(delta.filter_new_rows(
+            FIELDNAMES, [PROJECT_1, PROJECT_2_CHANGED]))
+
+        self.assertEquals([PROJECT_2_CHANGED], [row for _, row in new_rows])
+        self.assertEquals([new_rows[0][0]], delta.added_fingerprints)
+        self.assertEquals([previous_fingerprints[1]],
+                          delta.get_removed_fingerprints())
+
+    def test_duplicate_rows_get_distinct_fingerprints(self):
+        """Test that identical rows are all kept."""
+        delta = snapshot_history.CycleDelta([])
+        new_rows = list(delta.filter_new_rows(
+            FIELDNAMES, [PROJECT_1, PROJECT_1]))
+
+        self.assertEquals(2, len(new_rows))
+        self.assertEquals(2, len(set(fp for fp, _ in new_rows)))
+
+    def test_cycle_delta_is_shared_until_popped(self):
+        """Test that a resource has a single delta per cycle."""
+        calls = []
+        def _get_previous_fingerprints():
+            calls.append(1)
+            return ['abc']
+
+        delta = snapshot_history.get_cycle_delta(
+            'projects', '20170130T192053Z', _get_previous_fingerprints)
+        same_delta = snapshot_history.get_cycle_delta(
+            'projects', '20170130T192053Z', _get_previous_fingerprints)
+
+        self.assertIs(delta, same_delta)
+        self.assertEquals(1, len(calls))
+        self.assertIs(delta, snapshot_history.pop_cycle_delta(
+            'projects', '20170130T192053Z'))
+        self.assertIsNone(snapshot_history.pop_cycle_delta(
+            'projects', '20170130T192053Z'))
+
+
+if __name__ == '__main__':
+    unittest.main()
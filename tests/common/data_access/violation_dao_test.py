@@ -214,8 +214,8 @@ class ViolationDaoTest(ForsetiTestCase):
 
         def insert_violation_side_effect(*args, **kwargs):
             if args[2] == self.expected_fake_violations[1]:
-                raise MySQLdb.DataError(
-                    self.resource_name, mock.MagicMock())
+                raise errors.MySQLError(
+                    self.resource_name, MySQLdb.DataError())
             else:
                 return mock.DEFAULT
 
@@ -231,6 +231,56 @@ class ViolationDaoTest(ForsetiTestCase):
         self.assertEqual(expected, actual)
         self.assertEquals(1, violation_dao.LOGGER.error.call_count)
 
+    def test_insert_violations_in_batches(self):
+        """Test insert_violations() inserts batches with one statement."""
+        self.dao.create_snapshot_table = mock.MagicMock(
+            return_value=self.fake_table_name)
+        self.dao.execute_sql_with_commit = mock.MagicMock()
+        self.dao.execute_many_with_commit = mock.MagicMock()
+
+        actual = self.dao.insert_violations(
+            self.fake_flattened_violations,
+            self.fake_snapshot_timestamp,
+            batch_size=2)
+
+        self.assertEqual((3, []), actual)
+        self.dao.execute_sql_with_commit.assert_not_called()
+        self.assertEqual(2, self.dao.execute_many_with_commit.call_count)
+        batches = [call[0][2] for call in
+                   self.dao.execute_many_with_commit.call_args_list]
+        self.assertEqual(
+            [self.expected_fake_violations[:2],
+             self.expected_fake_violations[2:]],
+            batches)
+
+    def test_insert_violations_in_batches_with_error(self):
+        """Test a failed batch is retried row by row to find the errors."""
+        self.dao.create_snapshot_table = mock.MagicMock(
+            return_value=self.fake_table_name)
+        self.dao.execute_many_with_commit = mock.MagicMock(
+            side_effect=errors.MySQLError(self.resource_name,
+                                          mock.MagicMock()))
+        violation_dao.LOGGER = mock.MagicMock()
+
+        def insert_violation_side_effect(*args, **kwargs):
+            if args[2] == self.expected_fake_violations[1]:
+                raise errors.MySQLError(
+                    self.resource_name, MySQLdb.DataError())
+            else:
+                return mock.DEFAULT
+
+        self.dao.execute_sql_with_commit = mock.MagicMock(
+            side_effect=insert_violation_side_effect)
+
+        actual = self.dao.insert_violations(
+            self.fake_flattened_violations,
+            self.fake_snapshot_timestamp,
+            batch_size=100)
+
+        self.assertEqual((2, [self.expected_fake_violations[1]]), actual)
+        self.assertEqual(1, self.dao.execute_many_with_commit.call_count)
+        self.assertEqual(3, self.dao.execute_sql_with_commit.call_count)
+
     def test_get_all_violations_no_type(self):
         """Test get_all_violations() with no type."""
         expected = [
@@ -16,6 +16,8 @@
 
 import unittest
 import mock
+from oauth2client import client
+from oauth2client.contrib import gce
 
 from tests import unittest_utils
 from tests.common.gcp_api.test_data import fake_key_file
@@ -44,6 +46,53 @@ class ApiHelpersTest(unittest_utils.ForsetiTestCase):
                     f, fake_key_file.FAKE_REQUIRED_SCOPES,
                     'user@forseti.testing')
 
+    @mock.patch('oauth2client.crypt.Signer.from_string',
+                return_value=object())
+    def test_get_credentials_id_of_delegated_credentials(self,
+                                                         signer_factory):
+        """Validate that each delegated account has its own identity."""
+        with unittest_utils.create_temp_file(fake_key_file.FAKE_KEYFILE) as f:
+            admin_credentials = api_helpers.credential_from_keyfile(
+                f, fake_key_file.FAKE_REQUIRED_SCOPES, 'admin@forseti.testing')
+            same_credentials = api_helpers.credential_from_keyfile(
+                f, fake_key_file.FAKE_REQUIRED_SCOPES, 'admin@forseti.testing')
+            user_credentials = api_helpers.credential_from_keyfile(
+                f, fake_key_file.FAKE_REQUIRED_SCOPES, 'user@forseti.testing')
+
+        self.assertEqual(api_helpers.get_credentials_id(admin_credentials),
+                         api_helpers.get_credentials_id(same_credentials))
+        self.assertNotEqual(api_helpers.get_credentials_id(admin_credentials),
+                            api_helpers.get_credentials_id(user_credentials))
+
+    def test_get_credentials_id_of_user_credentials(self):
+        """Validate that users of one OAuth client have their own identity."""
+        def _create_credentials(id_token):
+            return client.OAuth2Credentials(
+                'token', 'client-id', 'secret', 'refresh', None,
+                'https://accounts.google.com/o/oauth2/token', 'forseti',
+                id_token=id_token)
+
+        first_user = _create_credentials({'sub': '1'})
+        second_user = _create_credentials({'sub': '2'})
+
+        self.assertNotEqual(api_helpers.get_credentials_id(first_user),
+                            api_helpers.get_credentials_id(second_user))
+        self.assertIsNone(
+            api_helpers.get_credentials_id(_create_credentials(None)))
+
+    def test_get_credentials_id_of_gce_credentials(self):
+        """Validate that GCE credentials need a service account email."""
+        self.assertIsNone(
+            api_helpers.get_credentials_id(gce.AppAssertionCredentials()))
+        self.assertEqual(
+            'gce:forseti@project.iam.gserviceaccount.com',
+            api_helpers.get_credentials_id(gce.AppAssertionCredentials(
+                email='forseti@project.iam.gserviceaccount.com')))
+
+    def test_get_credentials_id_of_unknown_credentials(self):
+        """Validate that unknown credentials have no identity."""
+        self.assertIsNone(api_helpers.get_credentials_id(mock.MagicMock()))
+
 
 if __name__ == '__main__':
     unittest.main()
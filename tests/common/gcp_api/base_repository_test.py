@@ -14,10 +14,13 @@
 
 """Tests the base repository classes."""
 import datetime
+import json
 import threading
 import unittest
 from googleapiclient import discovery
+from googleapiclient import errors
 from googleapiclient import http
+import httplib2
 import mock
 import oauth2client
 from oauth2client import client
@@ -27,6 +30,7 @@ from tests import unittest_utils
 from google.cloud import security as forseti_security
 from google.cloud.security.common.gcp_api import _base_repository as base
 from google.cloud.security.common.gcp_api import _supported_apis
+from google.cloud.security.common.gcp_api import errors as api_errors
 
 
 class BaseRepositoryTest(unittest_utils.ForsetiTestCase):
@@ -210,6 +214,35 @@ class BaseRepositoryTest(unittest_utils.ForsetiTestCase):
         self.assertEqual(repo_client.gcp_services['v1'], repo.gcp_service)
         self.assertNotEqual(repo_client.gcp_services['v2'], repo.gcp_service)
 
+    @mock.patch.dict(base._SERVICE_REGISTRY, clear=True)
+    @mock.patch.object(discovery, 'build', autospec=True)
+    def test_service_objects_are_shared(self, mock_discovery_build):
+        """Verify that a service object is built once per credentials."""
+        mock_discovery_build.side_effect = lambda **kwargs: mock.Mock()
+        credentials = self.get_test_credential()
+        credentials.id_token = {'sub': 'forseti-user'}
+        same_credentials = self.get_test_credential()
+        same_credentials.id_token = {'sub': 'forseti-user'}
+
+        repo_client = base.BaseRepositoryClient(
+            'zoo', credentials=credentials, versions=['v1'])
+        same_client = base.BaseRepositoryClient(
+            'zoo', credentials=same_credentials, versions=['v1'])
+        other_client = base.BaseRepositoryClient(
+            'zoo', credentials=self.get_test_service_account(),
+            versions=['v1'])
+        unshared_client = base.BaseRepositoryClient(
+            'zoo', credentials=credentials, versions=['v1'],
+            share_service=False)
+
+        self.assertIs(repo_client.gcp_services['v1'],
+                      same_client.gcp_services['v1'])
+        self.assertIsNot(repo_client.gcp_services['v1'],
+                         other_client.gcp_services['v1'])
+        self.assertIsNot(repo_client.gcp_services['v1'],
+                         unshared_client.gcp_services['v1'])
+        self.assertEqual(3, mock_discovery_build.call_count)
+
     def test_multiple_threads_unique_http_objects(self):
         """Validate that each thread gets its unique http object.
 
@@ -285,6 +318,67 @@ class BaseRepositoryTest(unittest_utils.ForsetiTestCase):
 
         self.assertEqual(http_objects[0], http_objects[1])
 
+    @mock.patch.object(base.time, 'sleep')
+    def test_execute_batch_retries_failed_requests(self, mock_sleep):
+        """Verify that only the retryable failed requests are sent again,
+        before the next batch is sent."""
+        def _http_error(status, error_reason=None):
+            content = json.dumps({'error': {'errors': [
+                {'domain': 'usageLimits', 'reason': error_reason}]}})
+            return errors.HttpError(
+                httplib2.Response({'status': status,
+                                   'content-type': 'application/json'}),
+                content)
+
+        outcomes = {
+            'a': [({'name': 'a'}, None)],
+            'b': [(None, _http_error(503)), ({'name': 'b'}, None)],
+            'c': [(None, _http_error(403, 'accessNotConfigured'))],
+            'd': [(None, _http_error(404))],
+        }
+        batches = []
+
+        class FakeBatch(object):
+
+            def __init__(self, callback):
+                self.callback = callback
+                self.requests = []
+                batches.append(self)
+
+            def add(self, request, request_id):
+                self.requests.append((request, request_id))
+
+            def execute(self, http):
+                for request, request_id in self.requests:
+                    response, error = outcomes[request].pop(0)
+                    self.callback(request_id, response, error)
+
+        gcp_service_mock = mock.Mock()
+        gcp_service_mock.new_batch_http_request.side_effect = FakeBatch
+        gcp_service_mock.fake_component.return_value.get.side_effect = (
+            lambda name: name)
+        repo = base.GCPRepository(
+            gcp_service=gcp_service_mock,
+            credentials=mock.Mock(spec=client.Credentials),
+            component='fake_component')
+
+        results = repo.execute_batch(
+            'get', [{'name': name} for name in 'abcd'], 'fake_resource',
+            batch_size=3)
+        self.assertEqual([], batches)
+        results = list(results)
+
+        self.assertEqual([3, 1, 1], [len(b.requests) for b in batches])
+        self.assertEqual([('b', '0')], batches[1].requests)
+        self.assertEqual([('d', '0')], batches[2].requests)
+        self.assertEqual([({'name': 'a'}, None), ({'name': 'b'}, None)],
+                         results[:2])
+        self.assertIsNone(results[2][0])
+        self.assertIsInstance(results[2][1], api_errors.ApiNotEnabledError)
+        self.assertIsNone(results[3][0])
+        self.assertIsInstance(results[3][1], api_errors.ApiExecutionError)
+        self.assertEqual(1, mock_sleep.call_count)
+
 
 if __name__ == '__main__':
     unittest.main()
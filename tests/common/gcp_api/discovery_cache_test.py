@@ -0,0 +1,109 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the discovery document cache."""
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+import mock
+
+from tests import unittest_utils
+from google.cloud.security.common.gcp_api import _discovery_cache
+
+FAKE_URL = 'https://www.googleapis.com/discovery/v1/apis/compute/v1/rest'
+FAKE_DOCUMENT = '{"name": "compute", "version": "v1"}'
+
+
+class DiscoveryCacheTest(unittest_utils.ForsetiTestCase):
+    """Test the DiscoveryCache."""
+
+    def setUp(self):
+        """Set up."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = _discovery_cache.DiscoveryCache(
+            cache_dir=os.path.join(self.cache_dir, 'v1'), ttl=60)
+
+    def tearDown(self):
+        """Tear down."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_get_missing_document(self):
+        """Verify that a document that was never cached is not found."""
+        self.assertIsNone(self.cache.get(FAKE_URL))
+
+    def test_document_is_cached_on_disk(self):
+        """Verify that a new cache reads the documents cached on disk."""
+        self.cache.set(FAKE_URL, FAKE_DOCUMENT)
+
+        new_cache = _discovery_cache.DiscoveryCache(
+            cache_dir=self.cache.cache_dir, ttl=60)
+        self.assertEqual(FAKE_DOCUMENT, new_cache.get(FAKE_URL))
+        self.assertEqual(
+            ['https___www.googleapis.com_discovery_v1_apis_compute_v1_rest'
+             '.json'],
+            os.listdir(self.cache.cache_dir))
+
+    def test_cache_dir_is_private(self):
+        """Verify that the cache directory is only accessible by its user."""
+        self.cache.set(FAKE_URL, FAKE_DOCUMENT)
+
+        self.assertEqual(
+            0700, stat.S_IMODE(os.stat(self.cache.cache_dir).st_mode))
+
+    def test_shared_cache_dir_is_not_used(self):
+        """Verify that a directory other users can write to is not used."""
+        self.cache.set(FAKE_URL, FAKE_DOCUMENT)
+        os.chmod(self.cache.cache_dir, 0777)
+
+        new_cache = _discovery_cache.DiscoveryCache(
+            cache_dir=self.cache.cache_dir, ttl=60)
+        self.assertIsNone(new_cache.get(FAKE_URL))
+        new_cache.set('https://other', FAKE_DOCUMENT)
+        self.assertEqual(1, len(os.listdir(self.cache.cache_dir)))
+
+    @mock.patch.object(_discovery_cache.os, 'getuid')
+    def test_cache_dir_of_other_user_is_not_used(self, mock_getuid):
+        """Verify that a directory owned by another user is not used."""
+        self.cache.set(FAKE_URL, FAKE_DOCUMENT)
+        mock_getuid.return_value = os.stat(self.cache.cache_dir).st_uid + 1
+
+        new_cache = _discovery_cache.DiscoveryCache(
+            cache_dir=self.cache.cache_dir, ttl=60)
+        self.assertIsNone(new_cache.get(FAKE_URL))
+
+    @mock.patch.object(_discovery_cache.time, 'time')
+    def test_expired_document_is_not_returned(self, mock_time):
+        """Verify that documents older than the ttl are fetched again."""
+        mock_time.return_value = os.path.getmtime(self.cache_dir)
+        self.cache.set(FAKE_URL, FAKE_DOCUMENT)
+        self.assertEqual(FAKE_DOCUMENT, self.cache.get(FAKE_URL))
+
+        mock_time.return_value += 3600
+        self.assertIsNone(self.cache.get(FAKE_URL))
+
+    def test_unwritable_cache_dir_is_ignored(self):
+        """Verify that a failure to write the cache is not an error."""
+        not_a_dir = os.path.join(self.cache_dir, 'file')
+        open(not_a_dir, 'w').close()
+        cache = _discovery_cache.DiscoveryCache(cache_dir=not_a_dir)
+
+        cache.set(FAKE_URL, FAKE_DOCUMENT)
+        self.assertEqual(FAKE_DOCUMENT, cache.get(FAKE_URL))
+
+
+if __name__ == '__main__':
+    unittest.main()
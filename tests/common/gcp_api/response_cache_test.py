@@ -0,0 +1,157 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the API response cache."""
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from googleapiclient import errors
+import httplib2
+import mock
+
+from tests import unittest_utils
+from google.cloud.security.common.gcp_api import response_cache
+
+FAKE_URI = 'https://www.googleapis.com/storage/v1/b/bucket-1/iam'
+FAKE_POLICY = {'etag': 'CAE=', 'bindings': []}
+FAKE_CREDENTIALS = 'service_account:forseti@project.iam.gserviceaccount.com'
+
+
+def _create_request(method='GET', uri=FAKE_URI):
+    """Create a fake HttpRequest."""
+    request = mock.MagicMock()
+    request.method = method
+    request.uri = uri
+    request.body = None
+    request.headers = {}
+    request.methodId = 'storage.buckets.getIamPolicy'
+    return request
+
+
+def _not_modified(request):
+    """Fake a 304 response from the API."""
+    raise errors.HttpError(httplib2.Response({'status': 304}), '')
+
+
+class ResponseCacheTest(unittest_utils.ForsetiTestCase):
+    """Test the ResponseCache."""
+
+    def setUp(self):
+        """Set up."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = response_cache.ResponseCache(
+            os.path.join(self.cache_dir, 'cache.db'))
+
+    def tearDown(self):
+        """Tear down."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_not_modified_response_is_returned_from_cache(self):
+        """Verify that a 304 response returns the cached response."""
+        self.assertEquals(FAKE_POLICY, self.cache.execute(
+            _create_request(), lambda request: FAKE_POLICY, FAKE_CREDENTIALS))
+
+        sent_headers = []
+        def _execute_request(request):
+            sent_headers.append(dict(request.headers))
+            _not_modified(request)
+
+        request = _create_request()
+        self.assertEquals(FAKE_POLICY,
+                          self.cache.execute(request, _execute_request,
+                                             FAKE_CREDENTIALS))
+        self.assertEquals([{'If-None-Match': 'CAE='}], sent_headers)
+        self.assertEquals({}, request.headers)
+        self.assertEquals(
+            {'storage': {response_cache.MISS: 1,
+                         response_cache.REVALIDATED: 1}},
+            self.cache.get_stats())
+
+    def test_fresh_response_is_returned_without_request(self):
+        """Verify that a response younger than the max age is reused."""
+        self.cache.max_age = 3600
+        self.cache.execute(_create_request(), lambda request: FAKE_POLICY,
+                           FAKE_CREDENTIALS)
+
+        execute_request = mock.MagicMock()
+        self.assertEquals(FAKE_POLICY, self.cache.execute(
+            _create_request(), execute_request, FAKE_CREDENTIALS))
+        execute_request.assert_not_called()
+        self.assertEquals(1, self.cache.get_stats()['storage'][
+            response_cache.HIT])
+
+    def test_cache_is_persisted(self):
+        """Verify that a new cache reads the responses cached on disk."""
+        self.cache.execute(_create_request(), lambda request: FAKE_POLICY,
+                           FAKE_CREDENTIALS)
+
+        new_cache = response_cache.ResponseCache(self.cache.path)
+        self.assertEquals(FAKE_POLICY, new_cache.execute(
+            _create_request(), _not_modified, FAKE_CREDENTIALS))
+
+    def test_responses_are_not_shared_across_credentials(self):
+        """Verify that each credentials identity has its own responses."""
+        self.cache.max_age = 3600
+        self.cache.execute(_create_request(), lambda request: FAKE_POLICY,
+                           FAKE_CREDENTIALS)
+
+        execute_request = mock.MagicMock(return_value={'bindings': []})
+        self.assertEquals({'bindings': []}, self.cache.execute(
+            _create_request(), execute_request, FAKE_CREDENTIALS + ':admin'))
+        execute_request.assert_called_once_with(mock.ANY)
+
+    def test_cache_file_is_private(self):
+        """Verify that only the current user can read the cache file."""
+        self.assertEquals(
+            0600, stat.S_IMODE(os.stat(self.cache.path).st_mode))
+
+    @mock.patch.object(response_cache.os, 'getuid')
+    def test_cache_file_of_other_user_is_not_used(self, mock_getuid):
+        """Verify that a cache file owned by another user is refused."""
+        mock_getuid.return_value = os.stat(self.cache.path).st_uid + 1
+
+        self.assertIsNone(response_cache.configure(
+            {'api_response_cache_file': self.cache.path}))
+
+    def test_uncacheable_requests(self):
+        """Verify that POST requests and paged responses are not cached."""
+        paged_response = {'items': [], 'nextPageToken': 'abc'}
+        self.cache.execute(_create_request(method='POST'),
+                           lambda request: FAKE_POLICY, FAKE_CREDENTIALS)
+        self.cache.execute(_create_request(uri=FAKE_URI + '/list'),
+                           lambda request: paged_response, FAKE_CREDENTIALS)
+
+        for request in (_create_request(method='POST'),
+                        _create_request(uri=FAKE_URI + '/list')):
+            with self.assertRaises(errors.HttpError):
+                self.cache.execute(request, _not_modified, FAKE_CREDENTIALS)
+
+    def test_configure(self):
+        """Verify that the cache is only enabled when configured."""
+        self.assertIsNone(response_cache.configure({}))
+        self.assertIsNone(response_cache.RESPONSE_CACHE)
+
+        path = os.path.join(self.cache_dir, 'configured.db')
+        cache = response_cache.configure({'api_response_cache_file': path,
+                                          'api_response_cache_max_age': 60})
+        self.assertIs(cache, response_cache.RESPONSE_CACHE)
+        self.assertEquals(60, cache.max_age)
+        response_cache.configure({})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1529,5 +1529,56 @@ class FirewallActionTest(ForsetiTestCase):
         action_2 = firewall_rule.FirewallAction(**action_2_dict)
         self.assertEqual(expected, action_1.is_equivalent(action_2))
 
+
+class IntervalSetTest(ForsetiTestCase):
+    """Tests for IntervalSet."""
+
+    def test_ranges_are_merged(self):
+        """Tests that overlapping and adjacent ranges are merged."""
+        interval_set = firewall_rule.IntervalSet(
+            [(20, 30), (5, 9), (1, 2), (3, 3), (25, 40)])
+        self.assertEqual(((1, 3), (5, 9), (20, 40)), interval_set.ranges)
+
+    @parameterized.parameterized.expand([
+        ([(6, 8), (25, 26)], [(1, 3), (5, 9), (20, 30)], True),
+        ([(4, 6)], [(1, 3), (5, 9), (20, 30)], False),
+        ([(8, 21)], [(1, 3), (5, 9), (20, 30)], False),
+        ([], [(1, 3)], True),
+        ([(1, 3)], [], False),
+    ])
+    def test_issubset(self, ranges_1, ranges_2, expected):
+        """Tests that issubset returns the correct value."""
+        self.assertEqual(expected, firewall_rule.IntervalSet(ranges_1).issubset(
+            firewall_rule.IntervalSet(ranges_2)))
+
+    @parameterized.parameterized.expand([
+        ([(10, 20)], [(1, 3), (5, 9), (20, 30)], True),
+        ([(10, 19), (31, 40)], [(1, 3), (5, 9), (20, 30)], False),
+        ([], [(1, 3)], False),
+    ])
+    def test_overlaps(self, ranges_1, ranges_2, expected):
+        """Tests that overlaps returns the correct value."""
+        self.assertEqual(expected, firewall_rule.IntervalSet(ranges_1).overlaps(
+            firewall_rule.IntervalSet(ranges_2)))
+
+    @parameterized.parameterized.expand([
+        (['22', '21', '23-25'], ((21, 25),)),
+        (['80', '443'], ((80, 80), (443, 443))),
+        (['1-65535'], ((0, 65535),)),
+        (['all'], ((0, 65535),)),
+        ('all', ((0, 65535),)),
+        (None, ((0, 65535),)),
+    ])
+    def test_port_set(self, ports, expected):
+        """Tests that ports are parsed into ranges."""
+        self.assertEqual(expected, firewall_rule.port_set(ports).ranges)
+
+    def test_ip_set(self):
+        """Tests that ip addresses and ranges are parsed into ranges."""
+        ips = firewall_rule.ip_set(['10.0.0.1', '10.0.0.0/31', '10.0.1.0/24'])
+        self.assertEqual(((167772160, 167772161), (167772416, 167772671)),
+                         ips.ranges)
+
+
 if __name__ == '__main__':
     unittest.main()
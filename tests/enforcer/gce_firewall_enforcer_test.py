@@ -48,6 +48,22 @@ class HelperFunctionTest(ForsetiTestCase):
                                               'mytestnet'))
 
 
+class FakeBatch(object):
+    """A fake BatchHttpRequest, answering each request from a response map."""
+
+    def __init__(self, responses, callback):
+        self.responses = responses
+        self.callback = callback
+        self.request_ids = []
+
+    def add(self, request, request_id):
+        self.request_ids.append(request_id)
+
+    def execute(self):
+        for request_id in self.request_ids:
+            self.callback(request_id, self.responses[request_id].pop(0), None)
+
+
 class ComputeFirewallAPI(ForsetiTestCase):
     """Tests for the ComputeFirewallAPI class."""
 
@@ -100,7 +116,7 @@ class ComputeFirewallAPI(ForsetiTestCase):
         Setup:
           * Create mock pending response.
           * Create mock completed response.
-          * Set compute.globalOperations.get to return mock completed response.
+          * Set the batch request to return mock completed response.
 
         Expected results:
           * wait_for_any_to_complete will return the completed and running
@@ -123,15 +139,18 @@ class ComputeFirewallAPI(ForsetiTestCase):
             'status': 'PENDING'
         }
 
-        self.gce_service.globalOperations().get().execute.side_effect = [
-            completed_response, running_response
-        ]
+        self.gce_service.new_batch_http_request.side_effect = (
+            lambda callback: FakeBatch({
+                'operation-1400179586831': [completed_response],
+                'operation-1400179586832': [running_response]
+            }, callback))
 
         (completed, running) = self.firewall_api.wait_for_any_to_complete(
             constants.TEST_PROJECT, pending_responses)
 
         self.assertEqual([completed_response], completed)
         self.assertEqual([running_response], running)
+        self.gce_service.new_batch_http_request.assert_called_once()
 
     def test_wait_for_any_to_complete_empty_responses_list(self):
         """Testing waiting for requests until any finish executing.
@@ -193,7 +212,8 @@ class ComputeFirewallAPI(ForsetiTestCase):
         Setup:
           * Create mock pending responses.
           * Create mock completed responses.
-          * Set compute.globalOperations.get to return mock completed response.
+          * Set the batch request to return one completed response, and
+            compute.globalOperations.get to return the other one.
 
         Expected results:
           * wait_for_all_to_complete will return the completed and running
@@ -215,14 +235,58 @@ class ComputeFirewallAPI(ForsetiTestCase):
             'status': 'DONE'
         }]
 
+        self.gce_service.new_batch_http_request.side_effect = (
+            lambda callback: FakeBatch({
+                'operation-1400179586831': [completed_responses[0]],
+                'operation-1400179586832': [pending_responses[1]]
+            }, callback))
         self.gce_service.globalOperations().get().execute.side_effect = [
-            completed_responses[0], pending_responses[1], completed_responses[1]
+            completed_responses[1]
         ]
 
         completed = self.firewall_api.wait_for_all_to_complete(
             constants.TEST_PROJECT, pending_responses)
         self.assertEqual(completed_responses, completed)
 
+    @mock.patch.object(fe, 'time')
+    def test_wait_for_any_to_complete_backs_off(self, mock_time):
+        """Testing that a running operation is polled less and less often.
+
+        Setup:
+          * Set compute.globalOperations.get to return a pending response
+            three times, then a completed response.
+
+        Expected results:
+          * wait_for_any_to_complete sleeps for growing intervals between
+            polls, and returns the completed response.
+        """
+        pending_response = {
+            'name': 'operation-1400179586831',
+            'status': 'PENDING'
+        }
+        completed_response = {
+            'name': 'operation-1400179586831',
+            'status': 'DONE'
+        }
+        self.gce_service.globalOperations().get().execute.side_effect = [
+            pending_response, pending_response, pending_response,
+            completed_response
+        ]
+        clock = [1000.0]
+        mock_time.time.side_effect = lambda: clock[0]
+        mock_time.sleep.side_effect = (
+            lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+
+        (completed, running) = self.firewall_api.wait_for_any_to_complete(
+            constants.TEST_PROJECT, [pending_response])
+
+        self.assertEqual([completed_response], completed)
+        self.assertEqual([], running)
+        sleeps = [call[0][0] for call in mock_time.sleep.call_args_list]
+        self.assertEqual(3, len(sleeps))
+        self.assertTrue(sleeps[0] < sleeps[1] < sleeps[2])
+        self.assertFalse(self.firewall_api._operation_polls)
+
 
 class FirewallRulesTest(ForsetiTestCase):
     """Tests for the FirewallRules class."""
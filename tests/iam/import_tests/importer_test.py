@@ -105,6 +105,46 @@ class ImporterTest(ForsetiTestCase):
                          'PARTIAL_SUCCESS',
                          'Model state should be set to PARTIAL_SUCCESS')
 
+    def test_bulk_import_rows(self):
+        """Test if the rows collected in memory are written to the model."""
+
+        EXPLAIN_CONNECT = 'sqlite:///:memory:'
+        FORSETI_CONNECT = 'sqlite:///{}'.format(
+            get_db_file_path('forseti_1_basic.db'))
+
+        self.service_config = ServiceConfig(EXPLAIN_CONNECT,
+                                            FORSETI_CONNECT)
+        self.source = 'FORSETI'
+        self.model_manager = self.service_config.model_manager
+        self.model_name = self.model_manager.create(name=self.source)
+
+        scoped_session, data_access = self.model_manager.get(self.model_name)
+        with scoped_session as session:
+
+            importer_cls = importer.by_source(self.source)
+            import_runner = importer_cls(
+                session,
+                self.model_manager.model(self.model_name, expunge=False),
+                data_access,
+                self.service_config)
+            import_runner.run()
+
+            resources = session.query(data_access.TBL_RESOURCE).all()
+            self.assertEqual(len(import_runner.resource_rows), len(resources))
+            for resource in resources:
+                if resource.type != 'organization':
+                    self.assertTrue(
+                        resource.full_name.startswith(
+                            resource.parent.full_name))
+
+            role_names = set(
+                role.name for role in session.query(data_access.TBL_ROLE))
+            bindings = session.query(data_access.TBL_BINDING).all()
+            self.assertEqual(len(import_runner.binding_rows), len(bindings))
+            for binding in bindings:
+                self.assertTrue(binding.members)
+                self.assertIn(binding.role_name, role_names)
+
     def test_missing_group_collection(self):
         """Test if a missing group membership table is handled"""
         EXPLAIN_CONNECT = 'sqlite:///:memory:'
@@ -17,12 +17,15 @@
 from tests.unittest_utils import ForsetiTestCase
 import uuid
 import os
+import threading
 from collections import defaultdict
 from sqlalchemy.orm.exc import NoResultFound
 import unittest
 
+from google.cloud.security.iam.authz_graph import AuthorizationGraph
 from google.cloud.security.iam.utils import full_to_type_name
 from google.cloud.security.iam.dao import ModelManager, session_creator, create_engine
+from google.cloud.security.iam.dao import transitive_closure
 from google.cloud.security.common.util.threadpool import ThreadPool
 from tests.iam.unit_tests.test_models import RESOURCE_EXPANSION_1, RESOURCE_EXPANSION_2,\
     MEMBER_TESTING_1, RESOURCE_PATH_TESTING_1, ROLES_PERMISSIONS_TESTING_1,\
@@ -540,6 +543,74 @@ class DaoTest(ForsetiTestCase):
             denormed_set,
             'Denormalized should be equivalent to transitive closure')
 
+    def test_denorm_group_in_group_in_memory(self):
+        """Test the in memory group_in_group denormalization."""
+        session_maker, data_access = session_creator('test')
+        session = session_maker()
+        client = ModelCreatorClient(session, data_access)
+        _ = ModelCreator(GROUP_IN_GROUP_TESTING_1, client)
+
+        data_access.denorm_group_in_group(session)
+        entries = session.query(data_access.TBL_GROUP_IN_GROUP).all()
+        expected = set([(i.parent, i.member) for i in entries])
+
+        row_count = data_access.denorm_group_in_group_in_memory(session)
+        entries = session.query(data_access.TBL_GROUP_IN_GROUP).all()
+        self.assertEqual(expected, set([(i.parent, i.member) for i in entries]))
+        self.assertEqual(len(expected), row_count)
+
+    def test_transitive_closure_with_cycles(self):
+        """Test that groups in a cycle are members of themselves."""
+        graph = {
+            'a': set(['b']),
+            'b': set(['c']),
+            'c': set(['a', 'd']),
+            'd': set(['e']),
+            'f': set(['f']),
+            }
+
+        self.assertEqual({
+            'a': set(['a', 'b', 'c', 'd', 'e']),
+            'b': set(['a', 'b', 'c', 'd', 'e']),
+            'c': set(['a', 'b', 'c', 'd', 'e']),
+            'd': set(['e']),
+            'f': set(['f']),
+            }, transitive_closure(graph))
+
+    def test_incremental_group_in_group(self):
+        """Test that playground edits keep group_in_group up to date."""
+        session_maker, data_access = session_creator('test')
+        session = session_maker()
+        client = ModelCreatorClient(session, data_access)
+        _ = ModelCreator(GROUP_IN_GROUP_TESTING_1, client)
+        data_access.denorm_group_in_group_in_memory(session)
+
+        def get_group_in_group():
+            entries = session.query(data_access.TBL_GROUP_IN_GROUP).all()
+            return set([(i.parent, i.member) for i in entries])
+
+        def get_full_group_in_group():
+            data_access.denorm_group_in_group(session)
+            return get_group_in_group()
+
+        data_access.add_group_member(
+            session, 'group/g8', ['group/g2g1', 'group/g6'], denorm=True)
+        incremental = get_group_in_group()
+        self.assertIn(('group/g7', 'group/g8'), incremental)
+        self.assertEqual(get_full_group_in_group(), incremental)
+
+        data_access.del_group_member(
+            session, 'group/g4', 'group/g5', True, denorm=True)
+        incremental = get_group_in_group()
+        self.assertNotIn(('group/g7', 'group/g1'), incremental)
+        self.assertEqual(get_full_group_in_group(), incremental)
+
+        data_access.del_group_member(
+            session, 'group/g2', '', False, denorm=True)
+        incremental = get_group_in_group()
+        self.assertNotIn(('group/g3', 'group/g2g1'), incremental)
+        self.assertEqual(get_full_group_in_group(), incremental)
+
     def test_query_access_by_permission(self):
         """Test query_access_by_permission."""
         session_maker, data_access = session_creator('test')
@@ -863,6 +934,129 @@ class DaoTest(ForsetiTestCase):
             else:
                 self.assertFalse(f(session, frn, perm, member))
 
+    def _query_all(self, session, data_access):
+        """Answer the explain queries for every member, resource and permission."""
+        members = sorted(m.name for m in
+                         session.query(data_access.TBL_MEMBER).all())
+        resources = sorted(r.type_name for r in
+                           session.query(data_access.TBL_RESOURCE).all())
+        permissions = sorted(p.name for p in
+                             session.query(data_access.TBL_PERMISSION).all())
+        answers = {}
+        for member in members:
+            for permission in permissions:
+                answers[('member', member, permission)] = sorted(
+                    (role, sorted(resources)) for role, resources in
+                    data_access.query_access_by_member(
+                        session, member, [permission], True))
+                for resource in resources:
+                    answers[('check', member, permission, resource)] = (
+                        data_access.check_iam_policy(
+                            session, resource, permission, member))
+                    try:
+                        bindings, member_graph, ancestors = (
+                            data_access.explain_granted(
+                                session, member, resource, None, permission))
+                        answers[('explain', member, permission, resource)] = (
+                            sorted(bindings), member_graph, ancestors)
+                    except Exception:
+                        answers[('explain', member, permission, resource)] = (
+                            None)
+        for resource in resources:
+            for permission in permissions:
+                for expand_groups in (False, True):
+                    answers[('resource', resource, permission,
+                             expand_groups)] = {
+                                 role: set(members) for role, members in
+                                 data_access.query_access_by_resource(
+                                     session, resource, [permission],
+                                     expand_groups).iteritems()}
+        return answers
+
+    def test_load_graph(self):
+        """Test that the graph answers the queries like the database."""
+        session_maker, data_access = session_creator('test')
+        session = session_maker()
+        client = ModelCreatorClient(session, data_access)
+        _ = ModelCreator(EXPLAIN_GRANTED_1, client)
+
+        expected = self._query_all(session, data_access)
+        graph = data_access.load_graph(session)
+        self.assertIs(graph, data_access.graph)
+        self.assertEqual(expected, self._query_all(session, data_access))
+
+    def test_graph_follows_updates(self):
+        """Test that the graph is kept up to date by the model updates."""
+        session_maker, data_access = session_creator('test')
+        session = session_maker()
+        client = ModelCreatorClient(session, data_access)
+        _ = ModelCreator(EXPLAIN_GRANTED_1, client)
+        data_access.load_graph(session)
+
+        policy = data_access.get_iam_policy(session, 'r/res3')
+        policy['bindings']['admin'] = ['user/u2', 'group/g3g1']
+        del policy['bindings']['viewer']
+        data_access.set_iam_policy(session, 'r/res3', policy)
+        data_access.add_member(session, 'user/u5', ['group/g2'])
+        data_access.del_group_member(session, 'user/u3', 'group/g1', True)
+        data_access.del_group_member(session, 'group/g3g1', None, False)
+        data_access.add_role_by_name(session, 'deleter', ['delete'])
+        data_access.del_role_by_name(session, 'writer')
+        data_access.add_resource_by_name(session, 'r/res5', 'r/res2', False)
+        data_access.del_resource_by_name(session, 'r/res4')
+
+        answers = self._query_all(session, data_access)
+        data_access.graph = None
+        self.assertEqual(self._query_all(session, data_access), answers)
+
+    def test_graph_drops_rolled_back_updates(self):
+        """Test that the graph only follows the committed updates."""
+        session_maker, data_access = session_creator('test')
+        session = session_maker()
+        client = ModelCreatorClient(session, data_access)
+        _ = ModelCreator(EXPLAIN_GRANTED_1, client)
+        graph = data_access.load_graph(session)
+
+        data_access.add_resource_by_name(session, 'r/res5', 'r/res2', False)
+        self.assertEqual([], graph.get_resource_path('r/res5'))
+        session.rollback()
+        data_access.add_resource_by_name(session, 'r/res6', 'r/res2', False)
+        session.commit()
+
+        self.assertEqual([], graph.get_resource_path('r/res5'))
+        self.assertEqual(['r/res6', 'r/res2', 'r/res1'],
+                         graph.get_resource_path('r/res6'))
+
+    def test_graph_is_thread_safe(self):
+        """Test that the graph can be queried while it is updated."""
+        graph = AuthorizationGraph()
+        graph.add_resource('r/res1')
+        graph.add_member('user/u1')
+        errors = []
+
+        def update():
+            for i in range(2000):
+                graph.set_role('role{}'.format(i), ['perm{}'.format(i)])
+                graph.set_bindings('r/res1', {'role{}'.format(i):
+                                              ['user/u1']})
+
+        def query():
+            try:
+                for _ in range(2000):
+                    graph.get_roles_by_permission_names([])
+                    graph.get_bindings(['r/res1'], set(['role1']),
+                                       set(['user/u1']))
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=update),
+                   threading.Thread(target=query)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+
     def test_denormalize(self):
         """Test denormalization."""
         session_maker, data_access = session_creator('test', None, None, False)
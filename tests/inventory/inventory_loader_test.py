@@ -15,12 +15,14 @@
 """Inventory loader script test."""
 
 from datetime import datetime
+import threading
 
 import mock
 import MySQLdb
 import unittest
 
 from tests.unittest_utils import ForsetiTestCase
+from google.cloud.security.common.data_access import _db_connector
 from google.cloud.security.common.data_access import dao
 from google.cloud.security.common.data_access import errors
 from google.cloud.security.common.gcp_type import iam_policy
@@ -30,6 +32,51 @@ from google.cloud.security.common.gcp_type import resource
 from google.cloud.security.inventory import inventory_loader
 
 
+class FakeSnapshotConnection(object):
+    """A connection to a single table, isolating its transactions like
+    InnoDB's REPEATABLE READ: the first read of a transaction takes a
+    snapshot of the table, which the next reads of the transaction see.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.snapshot = None
+
+    def cursor(self, cursorclass=None):
+        return FakeSnapshotCursor(self)
+
+    def commit(self):
+        self.snapshot = None
+
+    def rollback(self):
+        self.snapshot = None
+
+    def ping(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeSnapshotCursor(object):
+    """A cursor inserting rows, or counting the rows of the snapshot."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = None
+
+    def execute(self, sql, values=None):
+        if sql.startswith('INSERT'):
+            self.conn.rows.append(values)
+            return
+        if self.conn.snapshot is None:
+            self.conn.snapshot = list(self.conn.rows)
+        self.result = (len(self.conn.snapshot),)
+
+    def fetchone(self):
+        return self.result
+
+
 class InventoryLoaderTest(ForsetiTestCase):
 
     @mock.patch.object(inventory_loader, 'FLAGS')
@@ -38,6 +85,112 @@ class InventoryLoaderTest(ForsetiTestCase):
         self.fake_timestamp = '123456'
         self.mock_logger = mock_logger
 
+    def _create_fake_pipeline(self, name, run_order, error=None):
+        pipeline = mock.MagicMock()
+        pipeline.__class__.__name__ = name
+        def _run():
+            run_order.append(name)
+            if error:
+                raise error
+        pipeline.run.side_effect = _run
+        return pipeline
+
+    @mock.patch.object(inventory_loader, 'LOGGER')
+    def test_run_pipelines_as_dag_follows_dependencies(self, mock_logger):
+        """Test that pipelines run after the pipeline they depend on."""
+        run_order = []
+        orgs = self._create_fake_pipeline('orgs', run_order)
+        projects = self._create_fake_pipeline('projects', run_order)
+        instances = self._create_fake_pipeline('instances', run_order)
+        buckets = self._create_fake_pipeline('buckets', run_order)
+        pipelines = [orgs, projects, instances, buckets]
+        dependencies = {orgs: None, projects: orgs,
+                        instances: projects, buckets: projects}
+
+        run_statuses = inventory_loader._run_pipelines_as_dag(
+            pipelines, dependencies, 4)
+
+        self.assertEquals([True, True, True, True], run_statuses)
+        self.assertEquals(['orgs', 'projects'], run_order[:2])
+        self.assertItemsEqual(['instances', 'buckets'], run_order[2:])
+
+    @mock.patch.object(inventory_loader, 'LOGGER')
+    def test_run_pipelines_as_dag_skips_children_of_failure(
+            self, mock_logger):
+        """Test that pipelines depending on a failed pipeline are skipped."""
+        run_order = []
+        orgs = self._create_fake_pipeline('orgs', run_order)
+        projects = self._create_fake_pipeline(
+            'projects', run_order, error=ValueError('error'))
+        groups = self._create_fake_pipeline('groups', run_order)
+        instances = self._create_fake_pipeline('instances', run_order)
+        pipelines = [orgs, projects, groups, instances]
+        dependencies = {orgs: None, projects: orgs,
+                        groups: orgs, instances: projects}
+
+        run_statuses = inventory_loader._run_pipelines_as_dag(
+            pipelines, dependencies, 4)
+
+        self.assertEquals([True, False, True, False], run_statuses)
+        self.assertNotIn('instances', run_order)
+        self.assertEquals('FAILURE', instances.status)
+
+    @mock.patch.object(inventory_loader, 'LOGGER')
+    def test_run_pipeline_marks_loads_complete_on_success(self, mock_logger):
+        """Test that only successful pipelines mark their loads complete."""
+        run_order = []
+        succeeded = self._create_fake_pipeline('projects', run_order)
+        failed = self._create_fake_pipeline(
+            'instances', run_order, error=ValueError('error'))
+
+        self.assertTrue(inventory_loader._run_pipeline(succeeded))
+        self.assertFalse(inventory_loader._run_pipeline(failed))
+
+        succeeded.dao.mark_incremental_loads_complete.assert_called_once_with(
+            succeeded.loaded_resource_names, succeeded.cycle_timestamp)
+        failed.dao.mark_incremental_loads_complete.assert_not_called()
+
+    @mock.patch.object(MySQLdb, 'connect')
+    @mock.patch.object(inventory_loader, 'LOGGER')
+    def test_child_pipeline_reads_rows_loaded_by_parent_thread(
+            self, mock_logger, mock_connect):
+        """Test that a pipeline doesn't read through the snapshot of the
+        pipeline run before it by the same thread."""
+        rows = []
+        mock_connect.side_effect = (
+            lambda **kwargs: FakeSnapshotConnection(rows))
+        self.addCleanup(_db_connector._POOLS.clear)
+        inventory_dao = dao.Dao({'db_host': 'inventory_loader_test_host',
+                                 'db_user': 'foo',
+                                 'db_name': 'bar'})
+        counts = []
+
+        def _count():
+            counts.append(inventory_dao.select_record_count(
+                'projects', self.fake_timestamp))
+
+        def _load():
+            inventory_dao.execute_sql_with_commit(
+                'projects', 'INSERT INTO projects_123456 VALUES (%s)',
+                ('project-1',))
+            _count()
+
+        orgs, projects, instances = [mock.MagicMock() for _ in range(3)]
+        orgs.run.side_effect = _count
+        projects.run.side_effect = _load
+        instances.run.side_effect = _count
+        for pipeline in (orgs, projects, instances):
+            pipeline.dao = inventory_dao
+
+        self.assertTrue(inventory_loader._run_pipeline(orgs))
+        thread = threading.Thread(
+            target=inventory_loader._run_pipeline, args=(projects,))
+        thread.start()
+        thread.join()
+        self.assertTrue(inventory_loader._run_pipeline(instances))
+
+        self.assertEquals([0, 1, 1], counts)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -119,6 +119,38 @@ class PipelineBuilderTest(ForsetiTestCase):
             fake_runnable_pipelines.TWO_RESOURCES_ARE_ENABLED,
             actual_runnable_pipelines)
 
+    def testPipelineDependenciesAreMapped(self):
+        # Enabled: CloudSQL, Firewall Rules
+        my_pipeline_builder = self._setup_pipeline_builder(
+            'inventory_two_resources_are_enabled.yaml')
+
+        actual_runnable_pipelines = my_pipeline_builder.build()
+
+        dependencies = {}
+        for pipeline in actual_runnable_pipelines:
+            parent = my_pipeline_builder.pipeline_dependencies[pipeline]
+            dependencies[pipeline.RESOURCE_NAME] = (
+                parent.RESOURCE_NAME if parent else None)
+        self.assertEqual(
+            {'organizations': None,
+             'folders': 'organizations',
+             'projects': 'folders',
+             'cloudsql': 'projects',
+             'firewall_rules': 'projects'},
+            dependencies)
+
+    def testMaxWorkersArePassedToPipelines(self):
+        # Enabled: CloudSQL, Firewall Rules (with 5 workers)
+        my_pipeline_builder = self._setup_pipeline_builder(
+            'inventory_two_resources_are_enabled.yaml')
+
+        actual_runnable_pipelines = my_pipeline_builder.build()
+
+        max_workers = {pipeline.RESOURCE_NAME: pipeline.max_workers
+                       for pipeline in actual_runnable_pipelines}
+        self.assertEqual(5, max_workers['firewall_rules'])
+        self.assertEqual(1, max_workers['projects'])
+
     def testThreeResourcesAreEnabledGroupMembers(self):
         # Enabled: CloudSQL, Firewall Rules, Group Members
         my_pipeline_builder = self._setup_pipeline_builder(
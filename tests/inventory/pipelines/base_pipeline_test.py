@@ -67,6 +67,19 @@ class BasePipelineTest(ForsetiTestCase):
             self.pipeline.cycle_timestamp,
             fake_projects.EXPECTED_LOADABLE_PROJECTS)
 
+    @mock.patch.object(base_pipeline, 'FANOUT_BATCH_SIZE', 2)
+    def test_load_fanout_loads_each_resource_in_batches(self):
+        """Test that the rows of several resources are loaded in batches."""
+
+        rows = [('foo', 1), ('bar', 'a'), ('foo', 2), ('foo', 3)]
+        self.pipeline._load_fanout(['foo', 'bar', 'baz'], iter(rows))
+
+        self.assertEquals(
+            [mock.call('foo', self.pipeline.cycle_timestamp, [1, 2]),
+             mock.call('foo', self.pipeline.cycle_timestamp, [3]),
+             mock.call('bar', self.pipeline.cycle_timestamp, ['a'])],
+            self.pipeline.dao.load_data.call_args_list)
+
     def test_load_errors_are_handled(self):
         """Test that errors are handled when loading."""
 
@@ -77,6 +90,75 @@ class BasePipelineTest(ForsetiTestCase):
             self.pipeline._load(self.pipeline.RESOURCE_NAME,
                                 fake_projects.EXPECTED_LOADABLE_PROJECTS)
 
+    def test_safe_api_calls_returns_results_in_order(self):
+        """Test that safe_api_calls returns results in the order of args."""
+        self.mock_crm.get_project.side_effect = (
+            lambda project_id: {'projectId': project_id})
+        args_list = [('project-%s' % i,) for i in range(20)]
+
+        for max_workers in (1, 8):
+            self.pipeline.max_workers = max_workers
+            results = self.pipeline.safe_api_calls('get_project', args_list)
+            self.assertEquals(
+                [{'projectId': args[0]} for args in args_list], list(results))
+
+    def test_safe_api_calls_streams_results(self):
+        """Test that safe_api_calls only calls ahead of the consumer by a
+        few calls."""
+        self.mock_crm.get_project.side_effect = (
+            lambda project_id: {'projectId': project_id})
+        args_list = [('project-%s' % i,) for i in range(20)]
+
+        for max_workers in (1, 2):
+            self.mock_crm.get_project.reset_mock()
+            self.pipeline.max_workers = max_workers
+            results = self.pipeline.safe_api_calls('get_project', args_list)
+            self.assertEquals({'projectId': 'project-0'}, next(results))
+            self.assertLessEqual(
+                self.mock_crm.get_project.call_count, 2 * max_workers)
+            results.close()
+
+    def test_safe_api_calls_handles_api_errors(self):
+        """Test that failed calls in safe_api_calls return None."""
+        def _get_project(project_id):
+            if project_id == 'project-2':
+                raise api_errors.ApiExecutionError(project_id,
+                                                   mock.MagicMock())
+            return {'projectId': project_id}
+
+        self.mock_crm.get_project.side_effect = _get_project
+        self.pipeline.max_workers = 4
+
+        results = self.pipeline.safe_api_calls(
+            'get_project', [('project-1',), ('project-2',), ('project-3',)])
+        self.assertEquals(
+            [{'projectId': 'project-1'}, None, {'projectId': 'project-3'}],
+            list(results))
+
+    def test_safe_batch_api_call_handles_api_errors(self):
+        """Test that failed items in safe_batch_api_call return None."""
+        self.mock_crm.get_project_iam_policies_batch.return_value = [
+            ({'etag': '1'}, None),
+            (None, api_errors.ApiExecutionError('projects', mock.MagicMock())),
+            (None, api_errors.ApiNotEnabledError('url', mock.MagicMock())),
+        ]
+
+        results = self.pipeline.safe_batch_api_call(
+            'get_project_iam_policies_batch', 'projects', ['1', '2', '3'])
+        self.assertEquals([{'etag': '1'}, None, None], list(results))
+
+    def test_safe_batch_api_call_handles_batch_errors(self):
+        """Test that safe_batch_api_call stops at a failed batch request."""
+        def _get_policies_batch(resource_name, project_ids):
+            yield {'etag': '1'}, None
+            raise api_errors.ApiExecutionError('projects', mock.MagicMock())
+        self.mock_crm.get_project_iam_policies_batch.side_effect = (
+            _get_policies_batch)
+
+        results = self.pipeline.safe_batch_api_call(
+            'get_project_iam_policies_batch', 'projects', ['1', '2', '3'])
+        self.assertEquals([{'etag': '1'}], list(results))
+
     def test_get_loaded_count(self):
         """Test the loaded count is gotten."""
 
@@ -69,11 +69,18 @@ class LoadAppenginePipelineTest(ForsetiTestCase):
             self, mock_get_projects, mock_conn):
         """Test that API is called to retrieve instances."""
         mock_get_projects.return_value = self.projects
-        self.pipeline._retrieve()
+        list(self.pipeline._retrieve())
         self.assertEqual(
             len(self.project_ids),
             self.pipeline.api_client.get_app.call_count)
 
+    def _retrieve_rows(self):
+        """Run _retrieve() and group the rows by resource name."""
+        rows = {}
+        for resource_name, row in self.pipeline._retrieve():
+            rows.setdefault(resource_name, []).append(row)
+        return rows
+
     @mock.patch.object(MySQLdb, 'connect')
     @mock.patch('google.cloud.security.inventory.pipelines.base_pipeline.BasePipeline.safe_api_call')
     @mock.patch('google.cloud.security.common.data_access.project_dao.ProjectDao.get_projects')
@@ -91,22 +98,53 @@ class LoadAppenginePipelineTest(ForsetiTestCase):
             fake_appengine_applications.FAKE_INSTANCES
         ]
 
-        actual_apps, loadable_services, loadable_versions, loadable_instances = (
-            self.pipeline._retrieve())
+        rows = self._retrieve_rows()
 
         self.assertEquals(
             fake_appengine_applications.FAKE_PROJECT_APPLICATIONS_MAP,
-            actual_apps)
-
+            dict(rows[self.pipeline.RESOURCE_NAME]))
         self.assertEquals(
             fake_appengine_applications.EXPECTED_LOADABLE_SERVICES,
-            loadable_services)
+            rows[self.pipeline.SERVICES_RESOURCE_NAME])
         self.assertEquals(
             fake_appengine_applications.EXPECTED_LOADABLE_VERSIONS,
-            loadable_versions)
+            rows[self.pipeline.VERSIONS_RESOURCE_NAME])
         self.assertEquals(
             fake_appengine_applications.EXPECTED_LOADABLE_INSTANCES,
-            loadable_instances)
+            rows[self.pipeline.INSTANCES_RESOURCE_NAME])
+
+    @mock.patch.object(MySQLdb, 'connect')
+    @mock.patch('google.cloud.security.common.data_access.project_dao.ProjectDao.get_projects')
+    def test_retrieve_concurrently(self, mock_get_projects, mock_conn):
+        """Test that the concurrent crawl calls every level of the tree."""
+        mock_get_projects.return_value = self.projects * 3
+        app = fake_appengine_applications.FAKE_PROJECT_APPLICATIONS_MAP[
+            self.project_ids[0]]
+        self.mock_appengine.get_app.return_value = app
+        self.mock_appengine.list_services.return_value = (
+            fake_appengine_applications.FAKE_SERVICES * 2)
+        self.mock_appengine.list_versions.return_value = (
+            fake_appengine_applications.FAKE_VERSIONS)
+        self.mock_appengine.list_instances.return_value = (
+            fake_appengine_applications.FAKE_INSTANCES)
+        self.pipeline.max_workers = 4
+
+        rows = self._retrieve_rows()
+
+        num_versions = 3 * 2 * len(fake_appengine_applications.FAKE_VERSIONS)
+        self.assertEquals(3, len(rows[self.pipeline.RESOURCE_NAME]))
+        self.assertEquals(6, len(rows[self.pipeline.SERVICES_RESOURCE_NAME]))
+        self.assertEquals(num_versions,
+                          len(rows[self.pipeline.VERSIONS_RESOURCE_NAME]))
+        self.assertEquals(
+            num_versions * len(fake_appengine_applications.FAKE_INSTANCES),
+            len(rows[self.pipeline.INSTANCES_RESOURCE_NAME]))
+        self.assertEquals(num_versions,
+                          self.mock_appengine.list_instances.call_count)
+        self.mock_appengine.list_instances.assert_called_with(
+            self.projects[0].id,
+            fake_appengine_applications.FAKE_SERVICES[0]['id'],
+            fake_appengine_applications.FAKE_VERSIONS[0]['id'])
 
     @mock.patch.object(
         load_appengine_pipeline.LoadAppenginePipeline,
@@ -127,9 +165,9 @@ class LoadAppenginePipelineTest(ForsetiTestCase):
             mock_load,
             mock_get_loaded_count):
         """Test that the subroutines are called by run."""
-        mock_retrieve.return_value = (
-            fake_appengine_applications.FAKE_PROJECT_APPLICATIONS_MAP, '', '',
-            '')
+        mock_retrieve.return_value = iter([
+            (self.pipeline.RESOURCE_NAME, app) for app in
+            fake_appengine_applications.FAKE_PROJECT_APPLICATIONS_MAP.items()])
         mock_transform.return_value = (
             fake_appengine_applications.EXPECTED_LOADABLE_APPLICATIONS)
         self.pipeline.run()
@@ -145,7 +183,37 @@ class LoadAppenginePipelineTest(ForsetiTestCase):
             self.pipeline.RESOURCE_NAME,
             fake_appengine_applications.EXPECTED_LOADABLE_APPLICATIONS)
         self.assertEquals(expected_args, called_args)
+        mock_get_loaded_count.assert_called_once_with()
 
+    @mock.patch.object(base_pipeline, 'FANOUT_BATCH_SIZE', 2)
+    @mock.patch.object(
+        load_appengine_pipeline.LoadAppenginePipeline,
+        '_get_loaded_count')
+    @mock.patch.object(
+        load_appengine_pipeline.LoadAppenginePipeline,
+        '_load')
+    @mock.patch.object(
+        load_appengine_pipeline.LoadAppenginePipeline,
+        '_retrieve')
+    def test_run_loads_rows_in_batches(
+            self, mock_retrieve, mock_load, mock_get_loaded_count):
+        """Test that run loads the rows while they are retrieved."""
+        services = [{'service_id': str(i)} for i in range(5)]
+        mock_retrieve.return_value = iter(
+            [(self.pipeline.RESOURCE_NAME, ('project1', {'id': 'project1'}))] +
+            [(self.pipeline.SERVICES_RESOURCE_NAME, service)
+             for service in services])
+
+        self.pipeline.run()
+
+        loaded = [(args[0], args[1]) for args, _ in mock_load.call_args_list
+                  if args[0] == self.pipeline.SERVICES_RESOURCE_NAME]
+        self.assertEquals(
+            [(self.pipeline.SERVICES_RESOURCE_NAME, services[0:2]),
+             (self.pipeline.SERVICES_RESOURCE_NAME, services[2:4]),
+             (self.pipeline.SERVICES_RESOURCE_NAME, services[4:5])],
+            loaded)
+        self.assertEquals(6, mock_load.call_count)
 
 if __name__ == '__main__':
       unittest.main()
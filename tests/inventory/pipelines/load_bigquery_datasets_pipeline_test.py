@@ -64,23 +64,20 @@ class LoadBigqueryDatasetsPipelineTest(ForsetiTestCase):
             fbq.EXPECTED_PROJECTIDS,
             return_value)
 
-    def test_retrieve_dataset_project_map_raises(self):
+    def test_retrieve_datasets_raises(self):
         self.pipeline.api_client.get_datasets_for_projectid.side_effect = (
             api_errors.ApiExecutionError('', mock.MagicMock()))
 
-        self.assertEqual(
-            [], self.pipeline._retrieve_dataset_project_map(['1', '2']))
+        self.assertEqual([], self.pipeline._retrieve_datasets('1'))
 
-    def test_retrieve_dataset_project_map(self):
-        self.pipeline.api_client.get_datasets_for_projectid.side_effect = [
-            fbq.GET_DATASETS_FOR_PROJECTIDS_RETURN,
-            fbq.GET_DATASETS_FOR_PROJECTIDS_RETURN
-        ]
+    def test_retrieve_datasets(self):
+        self.pipeline.api_client.get_datasets_for_projectid.return_value = (
+            fbq.GET_DATASETS_FOR_PROJECTIDS_RETURN)
 
-        return_value = self.pipeline._retrieve_dataset_project_map(['1', '2'])
+        return_value = self.pipeline._retrieve_datasets('1')
 
         self.assertListEqual(
-            fbq.DATASET_PROJECT_MAP_EXPECTED,
+            fbq.GET_DATASETS_FOR_PROJECTIDS_RETURN,
             return_value)
 
     def test_retrieve_dataset_access_raises(self):
@@ -105,12 +102,38 @@ class LoadBigqueryDatasetsPipelineTest(ForsetiTestCase):
     def test_get_dataset_access_map(self, mock_dataset_access):
         mock_dataset_access.return_value = (
             fbq.RETRIEVE_DATASET_ACCESS_RETURN)
+        self.pipeline.api_client.get_datasets_for_projectid.return_value = (
+            fbq.GET_DATASETS_FOR_PROJECTIDS_RETURN)
 
         return_value = self.pipeline._retrieve_dataset_access_map(
-            fbq.DATASET_PROJECT_MAP)
+            ['1', '2'])
 
         self.assertListEqual(fbq.DATASET_PROJECT_ACCESS_MAP_EXPECTED,
-                             return_value)
+                             list(return_value))
+
+    def test_get_dataset_access_map_concurrently(self):
+        self.pipeline.max_workers = 4
+        self.pipeline.api_client.get_datasets_for_projectid.side_effect = (
+            lambda project_id: [{'datasetId': 'd%s' % i,
+                                 'projectId': project_id}
+                                for i in range(3)])
+        self.pipeline.api_client.get_dataset_access.side_effect = (
+            lambda project_id, dataset_id: (
+                None if dataset_id == 'd0' else
+                fbq.GET_DATASET_ACCESS_RETURN))
+
+        with mock.patch.object(load_bigquery_datasets_pipeline,
+                               'DATASET_QUEUE_SIZE', 2):
+            return_value = list(
+                self.pipeline._retrieve_dataset_access_map(
+                    ['p%s' % i for i in range(5)]))
+
+        self.assertItemsEqual(
+            [('p%s' % p, 'd%s' % d, fbq.GET_DATASET_ACCESS_RETURN)
+             for p in range(5) for d in (1, 2)],
+            return_value)
+        self.assertEqual(
+            15, self.pipeline.api_client.get_dataset_access.call_count)
 
     def test_transform(self):
         return_values = []
@@ -124,7 +147,7 @@ class LoadBigqueryDatasetsPipelineTest(ForsetiTestCase):
         self.pipeline.api_client = mock.MagicMock()
         self.pipeline.api_client.get_dataset_access = mock.MagicMock()
         self.pipeline.api_client.get_datasets_for_projectid = mock.MagicMock()
-        self.pipeline._retrieve_dataset_project_map = mock.MagicMock()
+        self.pipeline._retrieve_dataset_access_map = mock.MagicMock()
 
         self.pipeline.api_client.get_bigquery_projectids.return_value = []
 
@@ -133,7 +156,7 @@ class LoadBigqueryDatasetsPipelineTest(ForsetiTestCase):
         self.assertEqual(None, return_value)
         self.pipeline.api_client.get_dataset_access.assert_not_called()
         self.pipeline.api_client.get_datasets_for_projectid.assert_not_called()
-        self.pipeline._retrieve_dataset_project_map.assert_not_called()
+        self.pipeline._retrieve_dataset_access_map.assert_not_called()
 
     def test_retrieve(self):
         self.pipeline.api_client.get_bigquery_projectids.return_value = (
@@ -152,7 +175,7 @@ class LoadBigqueryDatasetsPipelineTest(ForsetiTestCase):
         return_value = self.pipeline._retrieve()
 
         self.assertListEqual(fbq.DATASET_PROJECT_ACCESS_MAP_EXPECTED,
-                             return_value)
+                             list(return_value))
 
 
     @mock.patch.object(
@@ -57,13 +57,16 @@ class LoadProjectsCloudsqlPipelineTest(ForsetiTestCase):
         self.maxDiff = None
         loadable_cloudsql = dict()
 
-        for resource, data_map in self.pipeline._transform(\
-                fake_cloudsql.FAKE_CLOUDSQL_MAP).iteritems():
-           loadable_cloudsql[resource] = list(data_map)
+        for resource, row in self.pipeline._transform(
+                fake_cloudsql.FAKE_CLOUDSQL_MAP):
+            loadable_cloudsql.setdefault(resource, []).append(row)
 
-        actual_loaded_instances = loadable_cloudsql.values()[2]
-        actual_loaded_ipaddresses = loadable_cloudsql.values()[1]
-        actual_authorizednetworks = loadable_cloudsql.values()[0]
+        actual_loaded_instances = loadable_cloudsql[
+            self.pipeline.RESOURCE_NAME_INSTANCES]
+        actual_loaded_ipaddresses = loadable_cloudsql[
+            self.pipeline.RESOURCE_NAME_IPADDRESSES]
+        actual_authorizednetworks = loadable_cloudsql[
+            self.pipeline.RESOURCE_NAME_AUTHORIZEDNETWORKS]
 
         self.assertEquals(
             fake_cloudsql.EXPECTED_LOADED_INSTANCES,
@@ -80,7 +83,7 @@ class LoadProjectsCloudsqlPipelineTest(ForsetiTestCase):
 
         self.pipeline.dao.get_project_numbers.return_value = (
             self.FAKE_PROJECT_NUMBERS)
-        self.pipeline._retrieve()
+        list(self.pipeline._retrieve())
 
         self.pipeline.dao.get_project_numbers.assert_called_once_with(
             self.pipeline.PROJECTS_RESOURCE_NAME,
@@ -107,7 +110,7 @@ class LoadProjectsCloudsqlPipelineTest(ForsetiTestCase):
             api_errors.ApiExecutionError('error error', mock.MagicMock()))
 
         results = self.pipeline._retrieve()
-        self.assertEqual([], results)
+        self.assertEqual([], list(results))
         self.assertEqual(1, mock_logger.error.call_count)
 
     @mock.patch.object(
@@ -127,14 +130,13 @@ class LoadProjectsCloudsqlPipelineTest(ForsetiTestCase):
         """Test that the subroutines are called by run."""
         mock_retrieve.return_value = (
             fake_cloudsql.FAKE_CLOUDSQL_MAP)
-        mock_transform.return_value = ({
-            self.pipeline.RESOURCE_NAME_INSTANCES:
-                fake_cloudsql.EXPECTED_LOADED_INSTANCES,
-            self.pipeline.RESOURCE_NAME_IPADDRESSES:
-                fake_cloudsql.EXPECTED_LOADED_IPADDRESSES,
-            self.pipeline.RESOURCE_NAME_AUTHORIZEDNETWORKS:
-                fake_cloudsql.EXPECTED_LOADED_AUTHORIZEDNETWORKS
-        })
+        mock_transform.return_value = (
+            [(self.pipeline.RESOURCE_NAME_INSTANCES, row)
+             for row in fake_cloudsql.EXPECTED_LOADED_INSTANCES] +
+            [(self.pipeline.RESOURCE_NAME_IPADDRESSES, row)
+             for row in fake_cloudsql.EXPECTED_LOADED_IPADDRESSES] +
+            [(self.pipeline.RESOURCE_NAME_AUTHORIZEDNETWORKS, row)
+             for row in fake_cloudsql.EXPECTED_LOADED_AUTHORIZEDNETWORKS])
         self.pipeline.run()
 
         mock_retrieve.assert_called_once_with()
@@ -14,6 +14,7 @@
 
 """Tests the load_projects_iam_policies_pipeline."""
 
+import json
 import unittest
 import mock
 import ratelimiter
@@ -55,31 +56,29 @@ class LoadProjectsIamPoliciesPipelineTest(ForsetiTestCase):
             fake_iam_policies.FAKE_PROJECT_IAM_POLICY_MAP))
         self.assertEquals(
             fake_iam_policies.EXPECTED_LOADABLE_PROJECT_IAM_POLICY,
-            loadable_iam_policies)
+            [row for resource_name, row in loadable_iam_policies
+             if resource_name == self.pipeline.RESOURCE_NAME])
+        self.assertEquals(
+            [{'project_number': iam_policy_map['project_number'],
+              'iam_policy': json.dumps(iam_policy_map['iam_policy'])}
+             for iam_policy_map in
+             fake_iam_policies.FAKE_PROJECT_IAM_POLICY_MAP],
+            [row for resource_name, row in loadable_iam_policies
+             if resource_name == self.pipeline.RAW_RESOURCE_NAME])
 
     def test_api_is_called_to_retrieve_org_policies(self):
         """Test that api is called to retrieve org policies."""
 
         self.pipeline.dao.get_project_numbers.return_value = (
             self.FAKE_PROJECT_NUMBERS)
-        self.pipeline._retrieve()
+        list(self.pipeline._retrieve())
 
         self.pipeline.dao.get_project_numbers.assert_called_once_with(
             self.pipeline.RESOURCE_NAME, self.pipeline.cycle_timestamp)
 
-        self.assertEquals(
-            2, self.pipeline.api_client.get_project_iam_policies.call_count)
-        called_args, called_kwargs = (
-            self.pipeline.api_client.get_project_iam_policies.call_args_list[0])
-        expected_args = (self.pipeline.RESOURCE_NAME,
-                         self.FAKE_PROJECT_NUMBERS[0])
-        self.assertEquals(expected_args, called_args)
-
-        called_args, called_kwargs = (
-            self.pipeline.api_client.get_project_iam_policies.call_args_list[1])
-        expected_args = (self.pipeline.RESOURCE_NAME,
-                         self.FAKE_PROJECT_NUMBERS[1])
-        self.assertEquals(expected_args, called_args)
+        self.pipeline.api_client.get_project_iam_policies_batch\
+            .assert_called_once_with(self.pipeline.RESOURCE_NAME,
+                                     self.FAKE_PROJECT_NUMBERS)
 
     def test_dao_error_is_handled_when_retrieving(self):
         """Test that exceptions are handled when retrieving."""
@@ -101,12 +100,31 @@ class LoadProjectsIamPoliciesPipelineTest(ForsetiTestCase):
         """
         self.pipeline.dao.get_project_numbers.return_value = (
             self.FAKE_PROJECT_NUMBERS)
-        self.pipeline.api_client.get_project_iam_policies.side_effect = (
-            api_errors.ApiExecutionError('error error', mock.MagicMock()))
+        self.pipeline.api_client.get_project_iam_policies_batch\
+            .return_value = [
+                (None, api_errors.ApiExecutionError(
+                    'error error', mock.MagicMock())),
+                (None, api_errors.ApiNotEnabledError(
+                    'error error', mock.MagicMock()))]
+
+        results = self.pipeline._retrieve()
+        self.assertEqual([], list(results))
+        self.assertEqual(1, mock_logger.error.call_count)
+        self.assertEqual(1, mock_logger.warn.call_count)
+
+    @mock.patch.object(
+        load_projects_iam_policies_pipeline.base_pipeline, 'LOGGER')
+    def test_batch_error_is_handled_when_retrieving(self, mock_logger):
+        """Test that a failure of the whole batch is handled."""
+        self.pipeline.dao.get_project_numbers.return_value = (
+            self.FAKE_PROJECT_NUMBERS)
+        self.pipeline.api_client.get_project_iam_policies_batch\
+            .side_effect = api_errors.ApiExecutionError(
+                'error error', mock.MagicMock())
 
         results = self.pipeline._retrieve()
-        self.assertEqual([], results)
-        self.assertEqual(2, mock_logger.error.call_count)
+        self.assertEqual([], list(results))
+        self.assertEqual(1, mock_logger.error.call_count)
 
     @mock.patch.object(
         load_projects_iam_policies_pipeline.LoadProjectsIamPoliciesPipeline,
@@ -126,8 +144,16 @@ class LoadProjectsIamPoliciesPipelineTest(ForsetiTestCase):
 
         mock_retrieve.return_value = (
             fake_iam_policies.FAKE_PROJECT_IAM_POLICY_MAP)
+        raw_iam_policies = [
+            {'project_number': iam_policy_map['project_number'],
+             'iam_policy': json.dumps(iam_policy_map['iam_policy'])}
+            for iam_policy_map in
+            fake_iam_policies.FAKE_PROJECT_IAM_POLICY_MAP]
         mock_transform.return_value = (
-            fake_iam_policies.EXPECTED_LOADABLE_PROJECT_IAM_POLICY)
+            [(self.pipeline.RESOURCE_NAME, row) for row in
+             fake_iam_policies.EXPECTED_LOADABLE_PROJECT_IAM_POLICY] +
+            [(self.pipeline.RAW_RESOURCE_NAME, row)
+             for row in raw_iam_policies])
         self.pipeline.run()
 
         mock_retrieve.assert_called_once_with()
@@ -147,8 +173,7 @@ class LoadProjectsIamPoliciesPipelineTest(ForsetiTestCase):
         # The raw json data is loaded.
         called_args, called_kwargs = mock_load.call_args_list[1]
         expected_args = (
-            self.pipeline.RAW_RESOURCE_NAME,
-            fake_iam_policies.FAKE_PROJECT_IAM_POLICY_MAP)
+            self.pipeline.RAW_RESOURCE_NAME, raw_iam_policies)
         self.assertEquals(expected_args, called_args)
 
         mock_get_loaded_count.assert_called_once
@@ -88,12 +88,13 @@ class LoadServiceAccountsPipelineTest(ForsetiTestCase):
         service_account_keys = []
         for s in service_accounts:
             service_account_keys.append(
-                fake_service_accounts.FAKE_SERVICE_ACCOUNT_KEYS[s[0]['name']])
+                (fake_service_accounts.FAKE_SERVICE_ACCOUNT_KEYS[s[0]['name']],
+                 None))
 
         self.pipeline.api_client.get_service_accounts = mock.MagicMock(
             side_effect=service_accounts)
-        self.pipeline.api_client.get_service_account_keys = mock.MagicMock(
-            side_effect=service_account_keys)
+        self.pipeline.api_client.get_service_account_keys_batch = (
+            mock.MagicMock(return_value=service_account_keys))
 
         actual = self.pipeline._retrieve()
 
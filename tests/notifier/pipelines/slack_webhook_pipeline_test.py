@@ -62,6 +62,89 @@ class SlackWebhookPipelineTest(ForsetiTestCase):
 
             slack_pipeline._compose.assert_not_called()
 
+    def test_batch_violations_in_messages(self):
+        """Test that violations are batched up to the size limits."""
+        with mock.patch.object(slack_webhook_pipeline.SlackWebhookPipeline, '__init__', lambda x: None):
+            slack_pipeline = slack_webhook_pipeline.SlackWebhookPipeline()
+            slack_pipeline.pipeline_config = {'violations_per_message': 2}
+            self.assertEqual(['a\nb', 'c'],
+                             list(slack_pipeline._batch(['a', 'b', 'c'])))
+
+            slack_pipeline.pipeline_config = {'violations_per_message': 10}
+            with mock.patch.object(slack_webhook_pipeline,
+                                   'MAX_MESSAGE_LENGTH', 5):
+                self.assertEqual(['aa\nbb', 'cc'],
+                                 list(slack_pipeline._batch(
+                                     ['aa', 'bb', 'cc'])))
+
+            slack_pipeline.pipeline_config = {}
+            self.assertEqual(['a', 'b'],
+                             list(slack_pipeline._batch(['a', 'b'])))
+
+    @mock.patch.object(slack_webhook_pipeline.time, 'sleep')
+    def test_send_retries_rate_limited_posts(self, mock_sleep):
+        """Test that a rate limited post is retried after Retry-After."""
+        rate_limited = mock.MagicMock(status_code=429,
+                                      headers={'Retry-After': '3'})
+        sent = mock.MagicMock(status_code=200, headers={})
+        session = mock.MagicMock()
+        session.post.side_effect = [rate_limited, sent]
+
+        with mock.patch.object(slack_webhook_pipeline.SlackWebhookPipeline, '__init__', lambda x: None):
+            slack_pipeline = slack_webhook_pipeline.SlackWebhookPipeline()
+            slack_pipeline.pipeline_config = {'webhook_url': 'https://hook'}
+            slack_pipeline._send(payload='text', session=session)
+
+        self.assertEqual(2, session.post.call_count)
+        session.post.assert_called_with('https://hook',
+                                        json={'text': 'text'})
+        mock_sleep.assert_called_once_with(3.0)
+
+    @mock.patch.object(slack_webhook_pipeline, 'LOGGER')
+    @mock.patch.object(slack_webhook_pipeline.time, 'sleep')
+    def test_send_logs_posts_still_failing(self, mock_sleep, mock_logger):
+        """Test that the last rate limited post is not followed by a sleep,
+        and that a failed post is logged as an error."""
+        rate_limited = mock.MagicMock(status_code=429, headers={})
+        session = mock.MagicMock()
+        session.post.return_value = rate_limited
+
+        with mock.patch.object(slack_webhook_pipeline.SlackWebhookPipeline, '__init__', lambda x: None):
+            slack_pipeline = slack_webhook_pipeline.SlackWebhookPipeline()
+            slack_pipeline.pipeline_config = {'webhook_url': 'https://hook'}
+            slack_pipeline._send(payload='text', session=session)
+
+            session.post.return_value = mock.MagicMock(status_code=404)
+            slack_pipeline._send(payload='text', session=session)
+
+        self.assertEqual(slack_webhook_pipeline.MAX_RETRIES + 1,
+                         session.post.call_count)
+        self.assertEqual(slack_webhook_pipeline.MAX_RETRIES - 1,
+                         mock_sleep.call_count)
+        self.assertEqual(2, mock_logger.error.call_count)
+        mock_logger.info.assert_not_called()
+
+    @mock.patch.object(slack_webhook_pipeline.requests, 'Session')
+    def test_run_sends_batches_concurrently(self, mock_session):
+        """Test that run posts every batch with the shared session."""
+        with mock.patch.object(slack_webhook_pipeline.SlackWebhookPipeline, '__init__', lambda x: None):
+            slack_pipeline = slack_webhook_pipeline.SlackWebhookPipeline()
+            slack_pipeline.pipeline_config = {'webhook_url': 'https://hook',
+                                              'violations_per_message': 2,
+                                              'max_workers': 4}
+            slack_pipeline.violations = [{'id': i} for i in range(5)]
+            slack_pipeline._compose = lambda violation: str(violation['id'])
+            slack_pipeline._send = mock.MagicMock()
+            slack_pipeline.run()
+
+        session = mock_session.return_value
+        self.assertItemsEqual(
+            [mock.call(payload='0\n1', session=session),
+             mock.call(payload='2\n3', session=session),
+             mock.call(payload='4', session=session)],
+            slack_pipeline._send.call_args_list)
+        session.close.assert_called_once_with()
+
 
 if __name__ == '__main__':
     unittest.main()
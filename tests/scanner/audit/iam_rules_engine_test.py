@@ -1406,5 +1406,68 @@ class IamRulesEngineTest(ForsetiTestCase):
         self.assertItemsEqual(expected_violations, actual_violations)
 
 
+class RuleMatcherTest(ForsetiTestCase):
+    """Tests for the compiled rule matchers."""
+
+    def test_member_matcher_matches_exact_and_glob_members(self):
+        """Exact, glob and allUsers rule members match like the originals."""
+        rule_members = [IamPolicyMember.create_from(m) for m in [
+            'user:foo@company.com',
+            'user:*@other.com',
+            'serviceAccount:*@*.gserviceaccount.com',
+        ]]
+        matcher = ire.MemberMatcher(rule_members)
+        policy_members = [IamPolicyMember.create_from(m) for m in [
+            'user:FOO@company.com',
+            'user:bar@company.com',
+            'user:bar@other.com',
+            'group:bar@other.com',
+            'serviceAccount:1@iam.gserviceaccount.com',
+            'serviceAccount:@iam.gserviceaccount.com',
+        ]]
+
+        for policy_member in policy_members:
+            self.assertEqual(
+                any(r.matches(policy_member) for r in rule_members),
+                matcher.matches(policy_member),
+                policy_member)
+
+        all_users = ire.MemberMatcher(
+            [IamPolicyMember.create_from('allUsers')])
+        self.assertTrue(all_users.matches(policy_members[3]))
+
+    def test_member_matcher_find_missing(self):
+        """Required rule members missing from the policy are returned."""
+        rule_members = [IamPolicyMember.create_from(m) for m in [
+            'user:foo@company.com',
+            'user:*@other.com',
+            'group:admins@company.com',
+        ]]
+        policy_members = [IamPolicyMember.create_from(m) for m in [
+            'user:Foo@company.com',
+            'user:bar@other.com',
+        ]]
+        matcher = ire.MemberMatcher(rule_members)
+
+        self.assertEqual([rule_members[2]],
+                         matcher.find_missing(policy_members))
+
+    def test_rule_matcher_find_binding_indexes(self):
+        """Rule bindings matching a role are returned in rule order."""
+        rule_bindings = [IamPolicyBinding.create_from(b) for b in [
+            {'role': 'roles/*', 'members': ['user:a@company.com']},
+            {'role': 'roles/owner', 'members': ['user:b@company.com']},
+            {'role': 'roles/*Admin', 'members': ['user:c@company.com']},
+        ]]
+        rule = scanner_rules.Rule('test rule', 0, rule_bindings,
+                                  mode='whitelist')
+        matcher = ire.RuleMatcher(rule)
+
+        self.assertEqual([0, 1], matcher.find_binding_indexes('roles/Owner'))
+        self.assertEqual(
+            [0, 2], matcher.find_binding_indexes('roles/storage.admin'))
+        self.assertEqual([], matcher.find_binding_indexes('owner'))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -71,7 +71,8 @@ class GroupsScannerTest(ForsetiTestCase):
     def test_build_group_tree(self, mock_dao):
 
         mock_dao.get_all_groups.return_value = fake_data.ALL_GROUPS
-        mock_dao.get_group_members.side_effect = fake_data.ALL_GROUP_MEMBERS
+        mock_dao.get_all_group_members.return_value = (
+            fake_data.ALL_GROUP_MEMBERS)
 
         scanner = groups_scanner.GroupsScanner({}, {}, '', '')
         scanner.dao = mock_dao
@@ -79,6 +80,21 @@ class GroupsScannerTest(ForsetiTestCase):
 
         self.assertEquals(fake_data.EXPECTED_MEMBERS_IN_TREE,
                           self._render_ascii(root, 'member_email'))
+        self.assertEquals(1, mock_dao.get_all_group_members.call_count)
+
+    @mock.patch('google.cloud.security.scanner.scanners.groups_scanner.group_dao.GroupDao', spec=True)
+    def test_build_group_tree_with_cycle(self, mock_dao):
+
+        mock_dao.get_all_groups.return_value = fake_data.CYCLIC_GROUPS
+        mock_dao.get_all_group_members.return_value = (
+            fake_data.CYCLIC_GROUP_MEMBERS)
+
+        scanner = groups_scanner.GroupsScanner({}, {}, '', '')
+        scanner.dao = mock_dao
+        root = scanner._build_group_tree('')
+
+        self.assertEquals(fake_data.EXPECTED_CYCLIC_MEMBERS_IN_TREE,
+                          self._render_ascii(root, 'member_email'))
 
     @mock.patch('google.cloud.security.scanner.scanners.groups_scanner.group_dao.GroupDao', spec=True)
     def test_apply_rule(self, mock_dao):
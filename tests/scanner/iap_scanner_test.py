@@ -434,6 +434,25 @@ class IapScannerTest(ForsetiTestCase):
             set(['10.0.2.0/24', 'applies_all']),
             self.data.firewall_allowed_sources(self.network_port(8084), 'tag'))
 
+    def test_ingress_rules_by_network(self):
+        rules = self.data.ingress_rules_by_network[
+            self.network_port(80).network]
+        ingress_rules = [
+            rule for rule in self.firewall_rules.values()
+            if rule.network == 'global/networks/default' and
+            rule.direction != 'EGRESS']
+        self.assertEqual(len(ingress_rules), len(rules))
+        priorities = [rule.priority for rule in rules]
+        self.assertEqual(sorted(priorities, reverse=True), priorities)
+        self.assertEqual(2, len(self.data.ingress_rules_by_network))
+
+    def test_firewall_allowed_sources_is_memoized(self):
+        sources = self.data.firewall_allowed_sources(
+            self.network_port(8080), 'tag')
+        self.data.ingress_rules_by_network.clear()
+        self.assertIs(sources, self.data.firewall_allowed_sources(
+            self.network_port(8080), 'tag'))
+
     def test_tags_for_instance_group(self):
         self.assertEqual(
             set(['tag_i1', 'tag_it1']),
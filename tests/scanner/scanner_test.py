@@ -23,6 +23,7 @@ from tests.unittest_utils import ForsetiTestCase
 from google.cloud.security.common.data_access import errors
 from google.cloud.security.scanner import scanner
 from google.cloud.security.scanner.audit import iam_rules_engine as ire
+from google.cloud.security.scanner.scanners import base_scanner
 from google.cloud.security.scanner.scanners import iam_rules_scanner as irs
 from tests.inventory.pipelines.test_data import fake_iam_policies
 
@@ -180,6 +181,36 @@ class ScannerRunnerTest(ForsetiTestCase):
         self.assertEqual(1, scanner.LOGGER.error.call_count)
         self.assertIsNone(actual)
 
+    @mock.patch.object(scanner.multiprocessing, 'Pool')
+    def test_run_scanners_in_parallel(self, mock_pool):
+        """Test that shardable scanners are sharded, others run in a pool."""
+        sharded_scanner = mock.Mock(spec=base_scanner.ShardableScanner,
+                                    num_shards=1)
+        other_scanners = [mock.Mock(spec=base_scanner.BaseScanner)
+                          for _ in range(2)]
+
+        def _map(func, indexes):
+            return [func(i) for i in indexes]
+        mock_pool.return_value.map.side_effect = _map
+
+        scanner._run_scanners_in_parallel(
+            [other_scanners[0], sharded_scanner, other_scanners[1]], 4)
+
+        self.assertEqual(4, sharded_scanner.num_shards)
+        sharded_scanner.run.assert_called_once_with()
+        mock_pool.assert_called_once_with(2)
+        for other_scanner in other_scanners:
+            other_scanner.run.assert_called_once_with()
+        self.assertEqual([], scanner._PARALLEL_SCANNERS)
+
+    def test_run_scanner_logs_errors(self):
+        """Test that a failing scanner doesn't stop the other scanners."""
+        failing_scanner = mock.Mock()
+        failing_scanner.run.side_effect = SystemExit(1)
+
+        self.assertFalse(scanner._run_scanner(failing_scanner))
+        self.assertEqual(1, self.scanner.LOGGER.error.call_count)
+
 
 if __name__ == '__main__':
     unittest.main()
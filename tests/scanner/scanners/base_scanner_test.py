@@ -0,0 +1,68 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the BaseScanner."""
+
+import os
+import unittest
+
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.security.scanner.scanners import base_scanner
+
+
+class FakeShardableScanner(base_scanner.ShardableScanner):
+    """Scanner reporting each odd item, with the pid that scanned it."""
+
+    def run(self):
+        pass
+
+    def _find_violations_in_items(self, items):
+        return [(item, os.getpid()) for item in items if item % 2]
+
+
+class BaseScannerTest(ForsetiTestCase):
+    """Tests for the BaseScanner."""
+
+    def setUp(self):
+        self.scanner = FakeShardableScanner({}, {}, '', '')
+
+    def test_find_sharded_violations_without_shards(self):
+        """Test that a single shard is scanned in the current process."""
+        violations = self.scanner._find_sharded_violations(iter(range(6)))
+
+        self.assertEquals([(1, os.getpid()), (3, os.getpid()),
+                           (5, os.getpid())], violations)
+
+    def test_find_sharded_violations_merges_shards_in_order(self):
+        """Test that shards are scanned in worker processes and merged."""
+        self.scanner.num_shards = 3
+
+        violations = self.scanner._find_sharded_violations(iter(range(10)))
+
+        self.assertEquals([1, 3, 5, 7, 9], [v[0] for v in violations])
+        self.assertNotIn(os.getpid(), [v[1] for v in violations])
+        self.assertEquals({}, base_scanner._SHARDED_RUN)
+
+    def test_shardable_scanner_must_scan_items(self):
+        """Test that shardable scanners must implement the per-shard scan."""
+        class FakeScanner(base_scanner.ShardableScanner):
+            def run(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            FakeScanner({}, {}, '', '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -135,17 +135,40 @@ DDDDD_GROUP_MEMBERS = (
      'member_type': 'GROUP'}
 )
 
-# The order of these groups will be determined by the nesting structure
-# and by how the get_recursive_members() will return them.
-ALL_GROUP_MEMBERS = [
-    AAAAA_GROUP_MEMBERS,
-    BBBBB_GROUP_MEMBERS,
-    CCCCC_GROUP_MEMBERS,
-    CCCCC_GROUP_MEMBERS,
-    DDDDD_GROUP_MEMBERS,
-    BBBBB_GROUP_MEMBERS,
-    CCCCC_GROUP_MEMBERS
-]
+# All the rows of the group_members table.
+ALL_GROUP_MEMBERS = (AAAAA_GROUP_MEMBERS + BBBBB_GROUP_MEMBERS +
+                     CCCCC_GROUP_MEMBERS + DDDDD_GROUP_MEMBERS)
+
+CYCLIC_GROUPS = (
+    {'group_email': 'eeeee@mycompany.com',
+     'group_id': 'eeeee'},
+)
+
+CYCLIC_GROUP_MEMBERS = (
+    {'group_id': 'eeeee',
+     'member_email': 'fffff@mycompany.com',
+     'member_id': 'fffff',
+     'member_role': 'MEMBER',
+     'member_type': 'GROUP'},
+    {'group_id': 'fffff',
+     'member_email': 'frank@mycompany.com',
+     'member_id': 'frank',
+     'member_role': 'MEMBER',
+     'member_type': 'USER'},
+    {'group_id': 'fffff',
+     'member_email': 'eeeee@mycompany.com',
+     'member_id': 'eeeee',
+     'member_role': 'MEMBER',
+     'member_type': 'GROUP'},
+)
+
+EXPECTED_CYCLIC_MEMBERS_IN_TREE = (
+"""my_customer
++-- eeeee@mycompany.com
+    +-- fffff@mycompany.com
+        |-- frank@mycompany.com
+        +-- eeeee@mycompany.com"""
+)
 
 EXPECTED_MEMBERS_IN_TREE = (
 """my_customer